@@ -0,0 +1,153 @@
+"""
+Benchmark do lambda_handler sequencial vs. concorrente (MAX_CONCURRENCY).
+
+Substitui S3, CoinGecko e Telegram por stubs locais com latência fixa e
+confere que a saída do modo concorrente é idêntica à do sequencial.
+
+Uso:
+    python src/benchmarks/bench_concurrency.py --symbols 60 --latency-ms 20
+"""
+import argparse
+import contextlib
+import copy
+import io
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services.history_window import HistoryWindow
+
+BASE_TS = 1_700_000_000.0
+
+
+def _setup_env(symbols):
+    os.environ.setdefault("S3_BUCKET", "bench-bucket")
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+    os.environ.setdefault("TELEGRAM_CHAT_ID", "bench-chat")
+    os.environ["ENABLE_S3"] = "false"
+    os.environ["TELEGRAM_RATE_PER_SEC"] = "0"
+    os.environ["SYMBOLS"] = ",".join(symbols)
+
+
+class StubBackend:
+    """Substitui S3, APIs HTTP e Telegram por dicionários em memória com latência."""
+
+    def __init__(self, symbols, latency):
+        self.latency = latency
+        self.history = {}
+        self.states = {}
+        self.messages = []
+        rng = random.Random(42)
+        for symbol in symbols:
+            price = rng.uniform(1, 1000)
+            window = HistoryWindow()
+            for i in range(288):
+                price *= 1 + rng.gauss(0, 0.004)
+                window.append(price, rng.uniform(1e6, 1e7), BASE_TS - (288 - i) * 300)
+            self.history[symbol] = window
+            self.states[symbol] = {"last_price": {"price": price, "timestamp": BASE_TS - 300}}
+
+    def _io(self):
+        time.sleep(self.latency)
+
+    def get_market_snapshot(self, symbols):
+        self._io()
+        return {s: {"price": self.history[s].prices[-1] * 1.03, "volume": 2e7} for s in symbols}
+
+    def prefetch_symbols(self, bucket, symbols, hours=None, now=None):
+        pass
+
+    def get_price_window(self, bucket, symbol, hours=None, now=None):
+        self._io()
+        window = self.history[symbol].since(now - hours * 3600)[:]
+        window.start_ts = now - hours * 3600
+        return window
+
+    def save_price_to_history(self, bucket, symbol, price, volume, ts, window=None):
+        self._io()
+        self.history[symbol] = self.history[symbol][:]
+        self.history[symbol].append(price, volume, ts)
+        if window is not None:
+            window.append(price, volume, ts)
+
+    def load_symbol_state(self, bucket, symbol):
+        from src.config.services.s3_service import _merge_defaults
+        self._io()
+        return _merge_defaults(copy.deepcopy(self.states.get(symbol, {})))
+
+    def save_symbol_state(self, bucket, symbol, state):
+        self._io()
+        self.states[symbol] = copy.deepcopy(state)
+        return {"conflicts": 0, "suppressed": set()}
+
+    def get_sentiment_data(self, symbol, previous_volume=None, current_volume=None):
+        self._io()
+        return {"menções_30min": 100, "menções_5min": 15, "percent_aumento": 10,
+                "lista_kols": [], "sentimento_atual": 70, "posts_virais": "stub",
+                "twitter_followers": 0}
+
+    def send_message(self, bot_token, chat_id, text):
+        self._io()
+        self.messages.append(text)
+
+
+def _install(price_monitor, backend):
+    for name in ("get_market_snapshot", "prefetch_symbols", "get_price_window", "save_price_to_history",
+                 "load_symbol_state", "save_symbol_state", "get_sentiment_data", "send_message"):
+        setattr(price_monitor, name, getattr(backend, name))
+    price_monitor.time = types.SimpleNamespace(time=lambda: BASE_TS, strftime=time.strftime)
+
+
+def _run(price_monitor, symbols, latency, concurrency):
+    backend = StubBackend(symbols, latency)
+    _install(price_monitor, backend)
+    price_monitor.MAX_CONCURRENCY = concurrency
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        result = price_monitor.lambda_handler({}, {})
+    elapsed = time.perf_counter() - start
+
+    # Horário e latências de envio (e as durações da linha EMF e do evento
+    # 'invocation' do log) variam entre execuções
+    lines = [l for l in output.getvalue().splitlines()
+             if not l.startswith(("Monitor de Criptomoedas", "📨 Telegram", '{"_aws"', "event=invocation"))
+             and '"event":"invocation"' not in l]
+    result["telegram"] = {k: v for k, v in result["telegram"].items()
+                          if not k.startswith("latency_") and k != "throttled_s"}
+    return elapsed, result, lines, backend.messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+
+    symbols = [f"C{i:03d}USDT" for i in range(args.symbols)]
+    _setup_env(symbols)
+    from src.handlers import price_monitor
+    price_monitor.SYMBOLS = symbols
+
+    latency = args.latency_ms / 1000
+    base_time, base_result, base_lines, base_messages = _run(price_monitor, symbols, latency, 1)
+    print(f"{args.symbols} símbolos, latência stub {args.latency_ms:.0f}ms")
+    print(f"  sequencial          {base_time:8.3f}s  ({len(base_messages)} mensagens)")
+
+    for concurrency in args.concurrency:
+        elapsed, result, lines, messages = _run(price_monitor, symbols, latency, concurrency)
+        identical = result == base_result and lines == base_lines and messages == base_messages
+        print(f"  concorrência {concurrency:<6} {elapsed:8.3f}s  "
+              f"speedup {base_time / elapsed:5.1f}x  saída idêntica: {'sim' if identical else 'NÃO'}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
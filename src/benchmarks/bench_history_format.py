@@ -0,0 +1,80 @@
+"""
+Benchmark de tamanho e tempo de carga do histórico: JSON vs. colunar (CPH1).
+
+Uso:
+    python src/benchmarks/bench_history_format.py --sizes 2000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services.history_codec import (
+    columns_from_records, decode_columns, decode_numpy, encode_columns
+)
+
+
+def _synthetic_history(n, seed=42):
+    rng = random.Random(seed)
+    price = 95000.0
+    ts = 1_700_000_000.0
+    records = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.002)
+        ts += 300
+        records.append({"price": price, "volume": rng.uniform(2e10, 4e10), "timestamp": ts})
+    return records
+
+
+def _best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+
+    print(f"{'amostras':>10} {'formato':<18} {'bytes':>14} {'carga (ms)':>12}")
+    for n in args.sizes:
+        records = _synthetic_history(n)
+        blobs = {
+            "json indent=2": json.dumps(records, indent=2).encode(),
+            "json compacto": json.dumps(records).encode(),
+            "colunar (array)": encode_columns(columns_from_records(records)),
+        }
+        loaders = {
+            "json indent=2": json.loads,
+            "json compacto": json.loads,
+            "colunar (array)": decode_columns,
+        }
+        if has_numpy:
+            blobs["colunar (numpy)"] = blobs["colunar (array)"]
+            loaders["colunar (numpy)"] = decode_numpy
+
+        for name, blob in blobs.items():
+            elapsed = _best_of(lambda: loaders[name](blob), args.repeat)
+            print(f"{n:>10} {name:<18} {len(blob):>14,} {elapsed:>12.2f}")
+
+    if not has_numpy:
+        print("\n(numpy não instalado: leitura via numpy.frombuffer omitida)")
+
+
+if __name__ == "__main__":
+    main()
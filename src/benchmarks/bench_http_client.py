@@ -0,0 +1,120 @@
+"""
+Benchmark do cliente HTTP compartilhado contra um servidor HTTPS local.
+
+Compara urllib.request.urlopen (conexão nova por chamada: TCP + TLS) com
+http_client.get_json (conexão keep-alive reaproveitada) e mostra a latência
+economizada por chamada. O certificado autoassinado é gerado com `openssl`.
+
+Uso:
+    python src/benchmarks/bench_http_client.py --calls 200
+"""
+import argparse
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services import http_client
+
+PAYLOAD = json.dumps([{"id": "bitcoin", "current_price": 95000.0, "total_volume": 3.2e10}]).encode()
+
+
+class _MarketsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def _make_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+def _start_server(cert, key):
+    server = ThreadingHTTPServer(("localhost", 0), _MarketsHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure(call, calls):
+    call()
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {name:<28} média {statistics.mean(samples):7.2f}ms  p50 {statistics.median(samples):7.2f}ms  p95 {p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _make_certificate(tmp)
+        server = _start_server(cert, key)
+        url = f"https://localhost:{server.server_address[1]}/api/v3/coins/markets?vs_currency=usd&ids=bitcoin"
+
+        def urllib_call():
+            # Como no código antigo, cada urlopen monta um contexto TLS novo.
+            context = ssl.create_default_context(cafile=cert)
+            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; CryptoMonitor/1.0)'})
+            with urllib.request.urlopen(req, timeout=10, context=context) as response:
+                json.loads(response.read().decode("utf-8"))
+
+        session = http_client.get_session()
+        session.trust_env = False
+        session.verify = cert
+
+        def pooled_call():
+            http_client.get_json(url)
+
+        print(f"{args.calls} chamadas HTTPS para {url}")
+        baseline = _measure(urllib_call, args.calls)
+        pooled = _measure(pooled_call, args.calls)
+        _report("urlopen (conexão nova)", baseline)
+        _report("http_client (keep-alive)", pooled)
+        saved = statistics.mean(baseline) - statistics.mean(pooled)
+        print(f"  economia por chamada: {saved:.2f}ms ({saved / statistics.mean(baseline) * 100:.0f}%)")
+
+        http_client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark do motor de indicadores: 'python' (statistics.py) vs. 'numpy'.
+
+A janela de tendência/lateralização cobre a série inteira, então cada
+tamanho mede o custo de todos os indicadores sobre N amostras.
+
+Uso:
+    python src/benchmarks/bench_indicator_engine.py --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.indicator_engine import compute_indicators, numpy_available
+
+
+def _synthetic_window(n, seed=42):
+    rng = random.Random(seed)
+    price = 95000.0
+    ts = 1_700_000_000.0
+    timestamps, prices, volumes = array('d'), array('d'), array('d')
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.002)
+        ts += 300
+        timestamps.append(ts)
+        prices.append(price)
+        volumes.append(rng.uniform(2e10, 4e10))
+    return HistoryWindow(timestamps, prices, volumes)
+
+
+def _best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("numpy não instalado: pip install numpy")
+        return
+
+    print(f"{'amostras':>10} {'python (ms)':>12} {'numpy (ms)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        window = _synthetic_window(n)
+        hours = n * 300 / 3600
+
+        def run(engine):
+            return compute_indicators(window, recent_hours=hours, minutes=hours * 60, engine=engine)
+
+        if run('python') != run('numpy'):
+            raise SystemExit(f"❌ Resultados divergentes com {n} amostras")
+
+        python_ms = _best_of(lambda: run('python'), args.repeat)
+        numpy_ms = _best_of(lambda: run('numpy'), args.repeat)
+        print(f"{n:>10} {python_ms:>12.2f} {numpy_ms:>12.2f} {python_ms / numpy_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
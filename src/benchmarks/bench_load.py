@@ -0,0 +1,521 @@
+"""
+Teste de carga ponta a ponta do lambda_handler com substitutos locais.
+
+O handler real roda contra:
+- servidores HTTP locais no lugar do CoinGecko (coins/markets e coins/{id}),
+  do CryptoCompare (pricemultifull) e do Telegram (sendMessage, só conta),
+  com latência e taxa de erro (HTTP 500) configuráveis;
+- um cliente S3 em memória (storage.s3) com ETag, If-Match/If-None-Match,
+  304 e latência por operação.
+
+O histórico de cada símbolo é pré-gravado (uma amostra a cada 5 min) e o
+relógio do handler avança 5 min por tick. A escala sobe sozinha: para cada
+profundidade de --history-days, o número de símbolos dobra a partir de
+--start-symbols até --max-symbols ou até o tick mediano passar de --budget-s.
+
+Para cada passo imprime vazão (símbolos/s), percentis p50/p95/p99 de cada
+etapa (mercado, prefetch, símbolo, leitura de histórico, indicadores,
+sentimento, flush, Telegram) e requisições por tick a cada serviço.
+
+Uso:
+    python src/benchmarks/bench_load.py
+    python src/benchmarks/bench_load.py --start-symbols 50 --max-symbols 800 --history-days 1 7 \\
+        --api-latency-ms 150 --api-error-rate 0.05 --s3-latency-ms 20 --concurrency 8 --json load.json
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+BASE_TS = 1_700_000_000.0
+INTERVAL_S = 300
+PERCENTILES = (50, 95, 99)
+STAGES = ['tick', 'market', 'prefetch', 'symbol', 'state', 'history', 'indicators',
+          'sentiment', 'flush', 'telegram']
+
+
+def _setup_env(args):
+    os.environ.setdefault("S3_BUCKET", "load-bucket")
+    os.environ["TELEGRAM_BOT_TOKEN"] = "load-token"
+    os.environ.setdefault("TELEGRAM_CHAT_ID", "load-chat")
+    os.environ["ENABLE_S3"] = "true"
+    os.environ["LOCAL_MODE"] = "false"
+    os.environ["TELEGRAM_RATE_PER_SEC"] = str(args.telegram_rate)
+    os.environ["API_RATE_LIMITS"] = args.api_rate_limits
+    if args.concurrency:
+        os.environ["MAX_CONCURRENCY"] = str(args.concurrency)
+
+
+class FakeService:
+    """
+    Servidor HTTP local que conta requisições por rota e responde
+    route(method, path, query, body) -> (status, payload), depois da latência
+    sorteada (±50% de latency_s) e com error_rate de respostas 500.
+    """
+
+    def __init__(self, name, route, latency_s=0.0, error_rate=0.0, seed=0):
+        self.name = name
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def _respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                parts = urlsplit(self.path)
+                status, payload = service.handle(method, parts.path, parse_qs(parts.query), body, route)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.netloc = f"127.0.0.1:{self.server.server_address[1]}"
+        self.base = f"http://{self.netloc}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, method, path, query, body, route):
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            delay = self.latency_s * self._rng.uniform(0.5, 1.5)
+        time.sleep(delay)
+        label = path
+        if path.startswith("/api/v3/coins/") and not path.endswith("/markets"):
+            label = "/api/v3/coins/{id}"
+        elif path.endswith("/sendMessage"):
+            label = "/bot{token}/sendMessage"
+        if failed:
+            self._count(f"{label} (500)")
+            return 500, {"error": "falha simulada"}
+        self._count(label)
+        return route(method, path, query, body)
+
+    def _count(self, label):
+        with self._lock:
+            self.requests[label] += 1
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeMarket:
+    """Preço e volume de cada moeda sintética; advance() anda um tick."""
+
+    def __init__(self, seed=42):
+        self._rng = random.Random(seed)
+        self.coins = {}
+        self.sent = Counter()
+
+    def add(self, coin_id, fsym):
+        if coin_id not in self.coins:
+            self.coins[coin_id] = {'fsym': fsym, 'price': self._rng.uniform(0.1, 50000), 'volume': 0.0,
+                                   'base_volume': self._rng.uniform(1e6, 1e10)}
+
+    def advance(self):
+        for coin in self.coins.values():
+            coin['price'] *= 1 + self._rng.gauss(0, 0.004)
+            coin['volume'] = coin['base_volume'] * self._rng.uniform(0.8, 1.2)
+            # Picos ocasionais disparam alertas, sentimento e mensagens
+            if self._rng.random() < 0.03:
+                coin['price'] *= 1 + self._rng.choice((1, -1)) * self._rng.uniform(0.02, 0.06)
+                coin['volume'] *= self._rng.uniform(3, 6)
+
+    def coingecko(self, method, path, query, body):
+        if path.endswith("/coins/markets"):
+            ids = query.get("ids", [""])[0].split(",")
+            per_page = int(query.get("per_page", ["100"])[0])
+            page = int(query.get("page", ["1"])[0])
+            rows = [{"id": coin_id, "current_price": self.coins[coin_id]['price'],
+                     "total_volume": self.coins[coin_id]['volume']}
+                    for coin_id in ids if coin_id in self.coins]
+            return 200, rows[(page - 1) * per_page:page * per_page]
+        coin_id = path.rsplit("/", 1)[-1]
+        coin = self.coins.get(coin_id)
+        if coin is None:
+            return 404, {"error": "coin not found"}
+        return 200, {
+            "id": coin_id,
+            "sentiment_votes_up_percentage": 40 + int(hashlib.md5(coin_id.encode()).hexdigest(), 16) % 50,
+            "public_interest_score": 0.5,
+            "market_data": {"total_volume": {"usd": coin['volume']}},
+            "community_data": {"twitter_followers": 150000, "reddit_subscribers": 40000}
+        }
+
+    def cryptocompare(self, method, path, query, body):
+        wanted = set(query.get("fsyms", [""])[0].split(","))
+        raw = {coin['fsym']: {"USD": {"PRICE": coin['price'], "TOTALVOLUME24H": coin['volume']}}
+               for coin in self.coins.values() if coin['fsym'] in wanted}
+        return 200, {"RAW": raw}
+
+    def telegram(self, method, path, query, body):
+        self.sent['messages'] += 1
+        self.sent['bytes'] += len(body)
+        return 200, {"ok": True, "result": {}}
+
+
+class FakeS3:
+    """
+    Cliente S3 em memória com a interface que storage.py usa: get_object
+    (IfNoneMatch -> 304), put_object (IfMatch/IfNoneMatch='*' -> 412),
+    delete_object e o paginador de list_objects_v2.
+    """
+
+    def __init__(self, latency_s=0.0):
+        from botocore.exceptions import ClientError
+
+        class NoSuchKey(ClientError):
+            pass
+
+        self.exceptions = types.SimpleNamespace(ClientError=ClientError, NoSuchKey=NoSuchKey)
+        self.latency_s = latency_s
+        self.objects = {}
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def _error(self, cls, status, code, operation):
+        return cls({'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, operation)
+
+    def _call(self, name):
+        time.sleep(self.latency_s)
+        with self._lock:
+            self.requests[name] += 1
+
+    def seed(self, key, body):
+        self.objects[key] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self._call("GET")
+        with self._lock:
+            stored = self.objects.get(Key)
+        if stored is None:
+            raise self._error(self.exceptions.NoSuchKey, 404, 'NoSuchKey', 'GetObject')
+        body, etag = stored
+        if IfNoneMatch is not None and IfNoneMatch == etag:
+            with self._lock:
+                self.requests["GET (304)"] += 1
+            raise self._error(self.exceptions.ClientError, 304, '304', 'GetObject')
+        return {'Body': io.BytesIO(body), 'ETag': etag}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, IfMatch=None, IfNoneMatch=None):
+        self._call("PUT")
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        with self._lock:
+            current = self.objects.get(Key)
+            if (IfNoneMatch == '*' and current is not None) or (IfMatch is not None and (current or (None, None))[1] != IfMatch):
+                self.requests["PUT (412)"] += 1
+                raise self._error(self.exceptions.ClientError, 412, 'PreconditionFailed', 'PutObject')
+            self.objects[Key] = (Body, etag)
+        return {'ETag': etag}
+
+    def delete_object(self, Bucket, Key):
+        self._call("DELETE")
+        with self._lock:
+            self.objects.pop(Key, None)
+        return {}
+
+    def get_paginator(self, operation):
+        s3 = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix=""):
+                s3._call("LIST")
+                with s3._lock:
+                    keys = sorted(key for key in s3.objects if key.startswith(Prefix))
+                for i in range(0, max(len(keys), 1), 1000):
+                    yield {'Contents': [{'Key': key} for key in keys[i:i + 1000]]}
+
+        return Paginator()
+
+
+class StageTimer:
+    """Junta as durações (s) de cada etapa; wrap() cronometra uma função."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        """{etapa: {'n', 'p50_ms', 'p95_ms', 'p99_ms'}}."""
+        result = {}
+        for stage in STAGES:
+            values = sorted(self.samples.get(stage, []))
+            if not values:
+                continue
+            result[stage] = {'n': len(values)}
+            for pct in PERCENTILES:
+                index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+                result[stage][f'p{pct}_ms'] = values[index] * 1000
+        return result
+
+
+def _symbols(n):
+    """Símbolos sintéticos LD0001USDT... registrados no mapa do CoinGecko."""
+    from src.config import coin_mappings
+
+    symbols = []
+    for i in range(n):
+        fsym = f"LD{i:04d}"
+        coin_mappings.COINGECKO_ID_MAP[fsym] = f"load-coin-{i:04d}"
+        symbols.append(f"{fsym}USDT")
+    return symbols
+
+
+def _seed_history(s3, symbols, days, market):
+    """Grava `days` dias de segmentos (uma amostra a cada INTERVAL_S) até o tick anterior a BASE_TS."""
+    from src.config.coin_mappings import get_coingecko_id
+    from src.config.services import s3_service
+    from src.config.services.history_codec import empty_columns, encode_columns
+
+    rng = random.Random(days)
+    start = BASE_TS - days * 86400
+    for symbol in symbols:
+        coin = market.coins[get_coingecko_id(symbol)]
+        price = coin['price']
+        segments = {}
+        ts = start
+        while ts < BASE_TS:
+            price *= 1 + rng.gauss(0, 0.002)
+            segments.setdefault(s3_service._segment_day(ts), empty_columns()).append(
+                price, coin['base_volume'] * rng.uniform(0.8, 1.2), ts
+            )
+            ts += INTERVAL_S
+        for day, columns in segments.items():
+            s3.seed(s3_service._segment_key(symbol, day), encode_columns(columns))
+
+
+def _patch(modules, services, timer):
+    """Aponta o código para os substitutos e cronometra as etapas. Retorna a função que desfaz."""
+    price_monitor, storage, binance_service, sentiment_service, telegram_service, http_client = modules
+    coingecko, cryptocompare, telegram = services
+
+    for service, provider in ((coingecko, "CoinGecko"), (cryptocompare, "CryptoCompare"), (telegram, "Telegram")):
+        http_client.PROVIDER_HOSTS[service.netloc] = provider
+
+    patches = [
+        (binance_service, 'COINGECKO_MARKETS_URL', f"{coingecko.base}/api/v3/coins/markets"),
+        (binance_service, 'CRYPTOCOMPARE_PRICEMULTI_URL', f"{cryptocompare.base}/data/pricemultifull"),
+        (sentiment_service, 'COINGECKO_COIN_URL', f"{coingecko.base}/api/v3/coins/{{coin_id}}"),
+        (telegram_service, 'TELEGRAM_API_URL', telegram.base),
+        (storage, 'flush', timer.wrap('flush', storage.flush)),
+    ]
+    for name, stage in (('get_market_snapshot', 'market'), ('prefetch_symbols', 'prefetch'),
+                        ('process_symbol', 'symbol'), ('load_symbol_state', 'state'),
+                        ('save_symbol_state', 'state'), ('get_price_window', 'history'),
+                        ('compute_indicators', 'indicators'), ('get_sentiment_data', 'sentiment'),
+                        ('send_message', 'telegram')):
+        patches.append((price_monitor, name, timer.wrap(stage, getattr(price_monitor, name))))
+
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+
+    def restore():
+        for module, name, value in originals:
+            setattr(module, name, value)
+    return restore
+
+
+def run_step(n_symbols, days, args, services, market):
+    """Roda args.ticks invocações com n_symbols e `days` dias de histórico."""
+    from src.handlers import price_monitor
+    from src.config.services import (
+        storage, binance_service, sentiment_service, telegram_service, http_client,
+        s3_service, circuit_breaker, rate_limiter
+    )
+    from src.config.services.ttl_cache import TTLCache
+
+    symbols = _symbols(n_symbols)
+    market.coins.clear()
+    for i, symbol in enumerate(symbols):
+        market.add(f"load-coin-{i:04d}", symbol.replace("USDT", ""))
+    market.advance()
+
+    s3 = FakeS3(args.s3_latency_ms / 1000)
+    _seed_history(s3, symbols, days, market)
+    storage.s3 = s3
+    storage.clear_cache()
+    circuit_breaker._breakers.clear()
+    rate_limiter._limiters.clear()
+    for service in services:
+        service.requests.clear()
+    market.sent.clear()
+
+    # A profundidade do histórico vira a janela lida a cada tick e a retenção
+    slack = price_monitor.ALERT_PARAMS['ROLLING_SLACK_HOURS']
+    params = {'MOVING_AVERAGE_HOURS': max(1, int(days * 24 - slack))}
+    saved_params = {name: price_monitor.ALERT_PARAMS[name] for name in params}
+    saved_history_days = s3_service.HISTORY_DAYS
+    price_monitor.ALERT_PARAMS.update(params)
+    s3_service.HISTORY_DAYS = days
+    price_monitor.SYMBOLS = symbols
+
+    timer = StageTimer()
+    clock = {"now": BASE_TS}
+    saved_time = price_monitor.time
+    price_monitor.time = types.SimpleNamespace(time=lambda: clock["now"], strftime=time.strftime)
+    modules = (price_monitor, storage, binance_service, sentiment_service, telegram_service, http_client)
+    restore = _patch(modules, services, timer)
+    saved_cache = sentiment_service._cache
+
+    errors = 0
+    ticks = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            sentiment_service._cache = TTLCache(os.path.join(tmp, "sentiment_cache.json"))
+            for tick in range(args.ticks):
+                clock["now"] = BASE_TS + tick * INTERVAL_S
+                if tick:
+                    market.advance()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = price_monitor.lambda_handler({}, {})
+                elapsed = time.perf_counter() - start
+                timer.add('tick', elapsed)
+                ticks.append(elapsed)
+                errors += len(result['errors'])
+    finally:
+        restore()
+        price_monitor.time = saved_time
+        price_monitor.ALERT_PARAMS.update(saved_params)
+        s3_service.HISTORY_DAYS = saved_history_days
+        sentiment_service._cache = saved_cache
+
+    requests = Counter()
+    for service in services:
+        for route, count in service.requests.items():
+            requests[f"{service.name} {route}"] += count
+    for operation, count in s3.requests.items():
+        requests[f"S3 {operation}"] += count
+
+    ticks.sort()
+    tick_p50 = ticks[len(ticks) // 2]
+    return {
+        'symbols': n_symbols,
+        'history_days': days,
+        'ticks': args.ticks,
+        'tick_p50_s': tick_p50,
+        'tick_max_s': ticks[-1],
+        'symbols_per_s': n_symbols / tick_p50 if tick_p50 else 0.0,
+        'symbol_errors': errors,
+        'telegram_messages': market.sent['messages'],
+        'stages': timer.summary(),
+        'requests_per_tick': {route: count / args.ticks for route, count in sorted(requests.items())}
+    }
+
+
+def _print_step(step):
+    print(f"\n▶ {step['symbols']} símbolos × {step['history_days']} dias de histórico ({step['ticks']} ticks)")
+    print(f"   tick p50 {step['tick_p50_s']:.2f}s (máx {step['tick_max_s']:.2f}s) → "
+          f"{step['symbols_per_s']:.0f} símbolos/s, {step['symbol_errors']} símbolos com erro, "
+          f"{step['telegram_messages']} mensagens no Telegram")
+    print(f"   {'etapa':<12} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, values in step['stages'].items():
+        print(f"   {stage:<12} {values['n']:>6} {values['p50_ms']:>9.1f} {values['p95_ms']:>9.1f} {values['p99_ms']:>9.1f}")
+    print("   requisições por tick:")
+    for route, count in step['requests_per_tick'].items():
+        print(f"      {route:<40} {count:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-symbols", type=int, default=25)
+    parser.add_argument("--max-symbols", type=int, default=400)
+    parser.add_argument("--history-days", type=int, nargs="+", default=[1, 7])
+    parser.add_argument("--ticks", type=int, default=3, help="Invocações por passo (a primeira com cache frio)")
+    parser.add_argument("--budget-s", type=float, default=60.0, help="Para de dobrar quando o tick p50 passa disto")
+    parser.add_argument("--api-latency-ms", type=float, default=80.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--telegram-latency-ms", type=float, default=40.0)
+    parser.add_argument("--s3-latency-ms", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=None, help="MAX_CONCURRENCY (default: o de settings)")
+    parser.add_argument("--telegram-rate", type=float, default=0.0, help="TELEGRAM_RATE_PER_SEC (0 = sem limite)")
+    parser.add_argument("--api-rate-limits", default="", help="API_RATE_LIMITS (default: sem limite no cliente)")
+    parser.add_argument("--json", help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    _setup_env(args)
+    market = FakeMarket()
+    latency = args.api_latency_ms / 1000
+    services = [
+        FakeService("CoinGecko", market.coingecko, latency, args.api_error_rate, seed=1),
+        FakeService("CryptoCompare", market.cryptocompare, latency, args.api_error_rate, seed=2),
+        FakeService("Telegram", market.telegram, args.telegram_latency_ms / 1000, seed=3)
+    ]
+
+    steps = []
+    try:
+        for days in args.history_days:
+            n = args.start_symbols
+            while n <= args.max_symbols:
+                step = run_step(n, days, args, services, market)
+                steps.append(step)
+                _print_step(step)
+                if step['tick_p50_s'] > args.budget_s:
+                    print(f"   ⏱️ tick p50 acima de {args.budget_s:.0f}s, parando a escala em {n} símbolos")
+                    break
+                n *= 2
+    finally:
+        for service in services:
+            service.close()
+
+    print(f"\n{'símbolos':>9} {'dias':>5} {'tick p50':>9} {'símb/s':>8} {'símbolo p95':>12} {'erros':>6}")
+    for step in steps:
+        symbol_p95 = step['stages'].get('symbol', {}).get('p95_ms', 0.0)
+        print(f"{step['symbols']:>9} {step['history_days']:>5} {step['tick_p50_s']:>8.2f}s "
+              f"{step['symbols_per_s']:>8.0f} {symbol_p95:>10.1f}ms {step['symbol_errors']:>6}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'args': vars(args), 'steps': steps}, f, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark do RSI por tick: calculate_rsi (lista inteira a cada chamada) vs.
+WilderRSI incremental (períodos 6/14/24, estado persistido em JSON).
+
+Cada tick acrescenta uma amostra à janela e recalcula o RSI, como o handler.
+
+Uso:
+    python src/benchmarks/bench_rsi.py --windows 288 8640 --ticks 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.incremental import WilderRSI
+from src.config.services.statistics import calculate_rsi
+
+PERIODS = (6, 14, 24)
+
+
+def _prices(n, seed=42):
+    rng = random.Random(seed)
+    price = 95000.0
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.002)
+        yield price
+
+
+def _run_list(size, ticks):
+    prices = list(_prices(size + ticks))
+    start = time.perf_counter()
+    for i in range(ticks):
+        window = prices[i + 1:size + i + 1]
+        for period in PERIODS:
+            calculate_rsi(window, period)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def _run_incremental(size, ticks):
+    prices = list(_prices(size + ticks))
+    window = HistoryWindow()
+    for i, price in enumerate(prices[:size]):
+        window.append(price, 1.0, float(i))
+
+    state = WilderRSI(PERIODS)
+    state.sync(window)
+    state = state.to_dict()
+
+    start = time.perf_counter()
+    for i in range(size, size + ticks):
+        window.append(prices[i], 1.0, float(i))
+        rsi = WilderRSI.from_dict(json.loads(json.dumps(state)), periods=PERIODS)
+        rsi.sync(window)
+        rsi.values()
+        state = rsi.to_dict()
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, nargs="+", default=[288, 8640])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'janela':>8} {'lista (µs/tick)':>16} {'incremental (µs/tick)':>22} {'speedup':>8}")
+    for size in args.windows:
+        list_us = _run_list(size, args.ticks)
+        incremental_us = _run_incremental(size, args.ticks)
+        print(f"{size:>8} {list_us:>16.1f} {incremental_us:>22.1f} {list_us / incremental_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
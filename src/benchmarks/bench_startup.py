@@ -0,0 +1,140 @@
+"""
+Benchmark de cold start: tempo de import do handler (python -X importtime)
+e da primeira chamada do lambda_handler contra stubs, cada um num processo
+Python novo.
+
+Falha (código de saída 1) se a mediana passar do orçamento ou se o import
+do handler carregar boto3, requests ou numpy, que só devem ser importados
+no primeiro uso.
+
+Uso:
+    python src/benchmarks/bench_startup.py --runs 5 --import-budget-ms 150 --first-call-budget-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+HANDLER_MODULE = "src.handlers.price_monitor"
+LAZY_MODULES = ("boto3", "botocore", "requests", "numpy")
+
+# Roda num processo novo: importa o handler e faz a primeira chamada com
+# mercado e Telegram substituídos (S3 no modo local, diretório temporário)
+CHILD = """
+import json, sys, time, contextlib, io
+start = time.perf_counter()
+from src.handlers import price_monitor
+imported = time.perf_counter()
+loaded = [m for m in %(lazy)r if m in sys.modules]
+price_monitor.get_market_snapshot = lambda symbols: {s: {"price": 100.0, "volume": 1e9} for s in symbols}
+price_monitor.send_message = lambda *args: None
+with contextlib.redirect_stdout(io.StringIO()):
+    price_monitor.lambda_handler({}, {})
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_call_ms": (done - imported) * 1000,
+                  "loaded": loaded}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("S3_BUCKET", "bench-bucket")
+    env.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+    env.setdefault("TELEGRAM_CHAT_ID", "bench-chat")
+    env["ENABLE_S3"] = "false"
+    # Sem limite de taxa no Telegram: mede o handler, não a espera por token
+    env["TELEGRAM_RATE_PER_SEC"] = "0"
+    env["PYTHONPATH"] = ROOT
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _importtime(env):
+    """Roda python -X importtime e retorna [(profundidade, módulo, cumulativo_ms)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {HANDLER_MODULE}"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            name = name[1:].rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((depth, name.strip(), int(cumulative) / 1000))
+    return rows
+
+
+def _direct_imports(rows, module):
+    """Imports feitos diretamente por module (a saída do importtime vem em pós-ordem)."""
+    index = max(i for i, (depth, name, _) in enumerate(rows) if depth == 0 and name == module)
+    direct = []
+    for depth, name, ms in reversed(rows[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, ms))
+    return direct
+
+
+def _first_call(env, cwd):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD % {"lazy": LAZY_MODULES}],
+        env=env, cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Imports mais caros a listar")
+    parser.add_argument("--import-budget-ms", type=float, default=150.0)
+    parser.add_argument("--first-call-budget-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    env = _env()
+    _importtime(env)  # aquece o cache de bytecode
+
+    rows = _importtime(env)
+    direct = _direct_imports(rows, HANDLER_MODULE)
+    print(f"python -X importtime {HANDLER_MODULE} (imports diretos mais caros, cumulativo):")
+    for name, ms in sorted(direct, key=lambda row: -row[1])[:args.top]:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    imports, first_calls, loaded = [], [], set()
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            run = _first_call(env, tmp)
+        imports.append(run["import_ms"])
+        first_calls.append(run["first_call_ms"])
+        loaded.update(run["loaded"])
+
+    import_ms = statistics.median(imports)
+    first_call_ms = statistics.median(first_calls)
+    print(f"\nMediana de {args.runs} processos:")
+    print(f"  import do handler   {import_ms:8.1f}ms  (orçamento {args.import_budget_ms:.0f}ms)")
+    print(f"  primeira chamada    {first_call_ms:8.1f}ms  (orçamento {args.first_call_budget_ms:.0f}ms)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import do handler {import_ms:.1f}ms > {args.import_budget_ms:.0f}ms")
+    if first_call_ms > args.first_call_budget_ms:
+        failures.append(f"primeira chamada {first_call_ms:.1f}ms > {args.first_call_budget_ms:.0f}ms")
+    if loaded:
+        failures.append(f"módulos carregados no import: {', '.join(sorted(loaded))}")
+    if failures:
+        raise SystemExit("❌ Orçamento de cold start estourado: " + "; ".join(failures))
+    print("✅ Dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
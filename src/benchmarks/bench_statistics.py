@@ -0,0 +1,172 @@
+"""
+Micro-benchmarks de statistics.py em escala de produção e de estresse.
+
+Cada função roda sobre séries sintéticas reprodutíveis (seed fixa) de
+2k (~7 dias a cada 5 min), 50k e 1M amostras, em três regimes: passeio
+aleatório ('walk'), lateralização ('sideways') e picos de preço/volume
+('spike'). As janelas de tendência/padrão/momentum/lateralização/VWAP
+cobrem a série inteira, então o custo cresce com N. O tempo é o melhor de
+--repeat medições do tempo médio por chamada.
+
+--save grava os resultados como baseline JSON; --compare compara com uma
+baseline e sai com código 1 se alguma função ficou mais de --threshold
+mais lenta (diferenças menores que --min-delta-us são ignoradas como ruído).
+Compare só baselines da mesma máquina.
+
+Uso:
+    python src/benchmarks/bench_statistics.py --save baseline_statistics.json
+    python src/benchmarks/bench_statistics.py --sizes 2000 50000 --compare baseline_statistics.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.statistics import (
+    get_price_statistics, filter_recent_history, calculate_trend_score, detect_higher_lows,
+    calculate_momentum, detect_sideways_movement, calculate_rsi, calculate_vwap,
+    evaluate_combined_anomaly
+)
+
+SIZES = [2000, 50000, 1000000]
+REGIMES = ['walk', 'sideways', 'spike']
+INTERVAL_S = 300
+
+
+def _series(n, regime, seed=42):
+    rng = random.Random(f"{regime}-{n}-{seed}")
+    price, base_volume = 95000.0, 3e10
+    ts = 1_700_000_000.0
+    timestamps, prices, volumes = array('d'), array('d'), array('d')
+    for i in range(n):
+        volume = base_volume * rng.uniform(0.7, 1.3)
+        if regime == 'sideways':
+            price += (95000.0 - price) * 0.05 + rng.gauss(0, 95000.0 * 0.0008)
+        elif regime == 'spike' and rng.random() < 0.01:
+            price *= 1 + rng.choice((1, -1)) * rng.uniform(0.03, 0.08)
+            volume *= rng.uniform(3, 8)
+        else:
+            price *= 1 + rng.gauss(0, 0.002)
+        ts += INTERVAL_S
+        timestamps.append(ts)
+        prices.append(price)
+        volumes.append(volume)
+    return HistoryWindow(timestamps, prices, volumes)
+
+
+def _cases(window):
+    """{nome: chamada} sobre a janela inteira."""
+    minutes = len(window) * INTERVAL_S / 60
+    stats = get_price_statistics(window)
+    z = (window.prices[-1] - stats['mean']) / stats['std_dev'] if stats['std_dev'] else 0.0
+    alert_state = {'last_alert_ts': 0, 'last_price_z': 0.0, 'last_volume_z': 0.0}
+    return {
+        'get_price_statistics': lambda: get_price_statistics(window),
+        'filter_recent_history': lambda: filter_recent_history(window, 24),
+        'calculate_trend_score': lambda: calculate_trend_score(window, minutes=minutes),
+        'detect_higher_lows': lambda: detect_higher_lows(window, minutes=minutes),
+        'calculate_momentum': lambda: calculate_momentum(window, minutes=minutes),
+        'detect_sideways_movement': lambda: detect_sideways_movement(window, minutes=minutes, threshold_pct=1.0),
+        'calculate_rsi': lambda: calculate_rsi(window, period=14),
+        'calculate_vwap': lambda: calculate_vwap(window, period_hours=minutes / 60),
+        'evaluate_combined_anomaly': lambda: evaluate_combined_anomaly(
+            price_z=z, volume_z=2.5, current_price=window.prices[-1], current_volume=window.volumes[-1],
+            mean_price=stats['mean'], mean_volume=3e10, std_price=stats['std_dev'], std_volume=3e9,
+            alert_state=alert_state, current_timestamp=window.timestamps[-1]
+        )
+    }
+
+
+def _seconds_per_call(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(sizes, regimes, functions, repeat):
+    """Retorna {"função/regime/N": segundos por chamada}."""
+    results = {}
+    for n in sizes:
+        for regime in regimes:
+            window = _series(n, regime)
+            for name, fn in _cases(window).items():
+                if functions and name not in functions:
+                    continue
+                key = f"{name}/{regime}/{n}"
+                results[key] = _seconds_per_call(fn, repeat)
+                print(f"{key:<48} {_format(results[key]):>12}")
+    return results
+
+
+def compare(current, baseline, threshold, min_delta_us):
+    """Lista de (chave, antes, depois) que ficaram mais de threshold mais lentas."""
+    regressions = []
+    print(f"\n{'caso':<48} {'baseline':>12} {'atual':>12} {'variação':>9}")
+    for key in sorted(current):
+        if key not in baseline:
+            continue
+        before, after = baseline[key], current[key]
+        change = after / before - 1 if before else 0.0
+        slower = change > threshold and (after - before) * 1e6 > min_delta_us
+        flag = "  ⚠️ REGRESSÃO" if slower else ""
+        print(f"{key:<48} {_format(before):>12} {_format(after):>12} {change:>+8.1%}{flag}")
+        if slower:
+            regressions.append((key, before, after))
+    return regressions
+
+
+def _format(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--regimes", nargs="+", default=REGIMES, choices=REGIMES)
+    parser.add_argument("--functions", nargs="+", default=None, help="Só estas funções")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Grava os resultados como baseline JSON")
+    parser.add_argument("--compare", help="Baseline JSON para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Lentidão relativa tolerada (0.2 = 20%%)")
+    parser.add_argument("--min-delta-us", type=float, default=1.0, help="Diferença absoluta mínima (µs) para acusar")
+    args = parser.parse_args()
+
+    print(f"{'caso':<48} {'por chamada':>12}")
+    results = run(args.sizes, args.regimes, args.functions, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'processor': platform.processor(),
+                    'created': time.strftime('%Y-%m-%d %H:%M:%S')
+                },
+                'results': results
+            }, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline gravada em {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold, args.min_delta_us)
+        if regressions:
+            print(f"\n❌ {len(regressions)} casos mais de {args.threshold:.0%} mais lentos que a baseline")
+            return 1
+        print(f"\n✅ Nenhuma regressão acima de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Benchmark do acesso ao S3 por execução: leituras/escritas seriais vs.
+prefetch paralelo + write-behind (storage.py).
+
+Usa o backend local (local_data/ num diretório temporário) com latência
+fixa por operação simulando o S3, e imprime tempo e contadores.
+
+Uso:
+    python src/benchmarks/bench_storage.py --symbols 30 --latency-ms 25 --ticks 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+BASE_TS = 1_700_000_000.0
+
+
+def _setup_env(symbols):
+    os.environ.setdefault("S3_BUCKET", "bench-bucket")
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+    os.environ.setdefault("TELEGRAM_CHAT_ID", "bench-chat")
+    os.environ["ENABLE_S3"] = "false"
+    os.environ["TELEGRAM_RATE_PER_SEC"] = "0"
+    os.environ["SYMBOLS"] = ",".join(symbols)
+
+
+def _with_latency(fn, latency):
+    def wrapper(*args, **kwargs):
+        time.sleep(latency)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def _run(price_monitor, storage, symbols, ticks, buffered):
+    from src.config.services.s3_service import prefetch_symbols
+
+    rng = random.Random(42)
+    prices = {s: rng.uniform(1, 1000) for s in symbols}
+
+    def snapshot(requested):
+        for s in requested:
+            prices[s] *= 1 + rng.gauss(0, 0.004)
+        return {s: {"price": prices[s], "volume": rng.uniform(1e6, 1e7)} for s in requested}
+
+    clock = {"now": BASE_TS}
+    price_monitor.get_market_snapshot = snapshot
+    price_monitor.send_message = lambda *args: None
+    price_monitor.time = types.SimpleNamespace(time=lambda: clock["now"], strftime=time.strftime)
+
+    price_monitor.storage = storage
+    price_monitor.prefetch_symbols = prefetch_symbols
+    if not buffered:
+        price_monitor.storage = types.SimpleNamespace(begin_invocation=lambda: None, flush=storage.get_counters)
+        price_monitor.prefetch_symbols = lambda *args, **kwargs: None
+
+    elapsed = 0.0
+    totals = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            for tick in range(ticks):
+                clock["now"] = BASE_TS + tick * 300
+                storage._reset_counters()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = price_monitor.lambda_handler({}, {})
+                elapsed += time.perf_counter() - start
+                counters = result["storage"] if buffered else storage.get_counters()
+                for name, value in counters.items():
+                    totals[name] = totals.get(name, 0) + value
+        finally:
+            os.chdir(cwd)
+    return elapsed / ticks, {name: value / ticks for name, value in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    parser.add_argument("--ticks", type=int, default=3)
+    args = parser.parse_args()
+
+    symbols = [f"C{i:03d}USDT" for i in range(args.symbols)]
+    _setup_env(symbols)
+    from src.config.services import storage
+    from src.handlers import price_monitor
+    price_monitor.SYMBOLS = symbols
+
+    latency = args.latency_ms / 1000
+    for name in ("_backend_read", "_backend_write", "_backend_delete", "_backend_list"):
+        setattr(storage, name, _with_latency(getattr(storage, name), latency))
+
+    print(f"{args.symbols} símbolos, latência S3 simulada {args.latency_ms:.0f}ms, média de {args.ticks} execuções")
+    print(f"  {'modo':<26} {'tempo':>8} {'GETs':>6} {'PUTs':>6} {'bytes lidos':>12} {'bytes gravados':>15}")
+    for label, buffered in (("serial", False), ("prefetch + write-behind", True)):
+        elapsed, counters = _run(price_monitor, storage, symbols, args.ticks, buffered)
+        print(f"  {label:<26} {elapsed:7.3f}s {counters['get']:>6.0f} {counters['put']:>6.0f} "
+              f"{counters['bytes_read']:>12,.0f} {counters['bytes_written']:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
-import json
-import urllib.request
 from src.config.coin_mappings import get_coingecko_id
+from src.config.services import http_client
+from src.config.services.providers import Provider, hedged_fetch
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+CRYPTOCOMPARE_PRICEMULTI_URL = "https://min-api.cryptocompare.com/data/pricemultifull"
+
+COINGECKO_PER_PAGE = 250
+CRYPTOCOMPARE_MAX_FSYMS = 50
+
 
 def get_price_and_volume(symbol):
     """
@@ -11,15 +18,7 @@ def get_price_and_volume(symbol):
     """
     coin_id = get_coingecko_id(symbol)
     
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&ids={coin_id}"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (compatible; CryptoMonitor/1.0)'
-    }
-    
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=10) as response:
-        data = json.loads(response.read().decode("utf-8"))
+    data = http_client.get_json(COINGECKO_MARKETS_URL, params={'vs_currency': 'usd', 'ids': coin_id})
     
     if not data or len(data) == 0:
         raise ValueError(f"Nenhum dado retornado para {coin_id}")
@@ -29,4 +28,91 @@ def get_price_and_volume(symbol):
     return {
         'price': float(market_data["current_price"]),
         'volume': float(market_data["total_volume"])
-    }
\ No newline at end of file
+    }
+
+
+def get_market_snapshot(symbols):
+    """
+    Busca preço e volume de todos os símbolos em uma única consulta.
+
+    Resolve cada símbolo com get_coingecko_id e faz uma chamada paginada a
+    coins/markets?ids=a,b,c. Se o CoinGecko demorar mais que o atraso de
+    hedge (p95 da sua latência), o CryptoCompare (pricemultifull?fsyms=A,B,C)
+    é disparado em paralelo e vale a primeira resposta; símbolos que ela não
+    trouxer são completados pelo outro provedor.
+
+    Args:
+        symbols: Lista de símbolos (ex: ['BTCUSDT', 'ETHUSDT'])
+
+    Returns:
+        dict: {symbol: {'price': float, 'volume': float}}. Símbolos sem dados
+        em nenhum provedor ficam de fora.
+    """
+    return hedged_fetch(list(symbols), PROVIDERS)
+
+
+def _fetch_coingecko_snapshot(symbols):
+    """coins/markets para os símbolos, indexado por símbolo."""
+    ids_by_symbol = {symbol: get_coingecko_id(symbol) for symbol in symbols}
+    markets = _fetch_coingecko_markets(sorted(set(ids_by_symbol.values())))
+    return {symbol: markets[coin_id] for symbol, coin_id in ids_by_symbol.items() if coin_id in markets}
+
+
+def _fetch_coingecko_markets(coin_ids):
+    """Busca coins/markets para vários IDs, paginando de COINGECKO_PER_PAGE em COINGECKO_PER_PAGE."""
+    markets = {}
+    page = 1
+
+    while coin_ids:
+        data = http_client.get_json(COINGECKO_MARKETS_URL, params={
+            'vs_currency': 'usd',
+            'ids': ','.join(coin_ids),
+            'per_page': COINGECKO_PER_PAGE,
+            'page': page
+        })
+
+        for market_data in data or []:
+            if market_data.get("current_price") is None:
+                continue
+            markets[market_data["id"]] = {
+                'price': float(market_data["current_price"]),
+                'volume': float(market_data.get("total_volume") or 0)
+            }
+
+        if not data or len(data) < COINGECKO_PER_PAGE:
+            break
+        page += 1
+
+    return markets
+
+
+def _fetch_cryptocompare_prices(symbols):
+    """Busca preço e volume no CryptoCompare para vários símbolos de uma vez."""
+    coins_by_symbol = {symbol: symbol.replace('USDT', '') for symbol in symbols}
+    coins = sorted(set(coins_by_symbol.values()))
+    raw = {}
+
+    for i in range(0, len(coins), CRYPTOCOMPARE_MAX_FSYMS):
+        data = http_client.get_json(CRYPTOCOMPARE_PRICEMULTI_URL, params={
+            'fsyms': ','.join(coins[i:i + CRYPTOCOMPARE_MAX_FSYMS]),
+            'tsyms': 'USD'
+        })
+        raw.update(data.get("RAW", {}))
+
+    prices = {}
+    for symbol, coin in coins_by_symbol.items():
+        usd = raw.get(coin, {}).get("USD")
+        if not usd:
+            continue
+        prices[symbol] = {
+            'price': float(usd["PRICE"]),
+            'volume': float(usd["TOTALVOLUME24H"])
+        }
+    return prices
+
+
+# Ordem de preferência: o primeiro é o principal, os seguintes entram por hedge
+PROVIDERS = [
+    Provider("CoinGecko", _fetch_coingecko_snapshot),
+    Provider("CryptoCompare", _fetch_cryptocompare_prices)
+]
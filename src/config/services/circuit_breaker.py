@@ -0,0 +1,116 @@
+"""
+Circuit breaker por provedor externo (CoinGecko, CryptoCompare, Telegram).
+
+- closed:    chamadas passam; BREAKER_FAILURE_THRESHOLD falhas seguidas abrem o circuito
+- open:      chamadas falham na hora (CircuitOpenError) por BREAKER_RESET_TIMEOUT segundos
+- half_open: passado o timeout, uma chamada de teste passa; sucesso fecha, falha reabre
+
+Os breakers ficam num registro do módulo, compartilhado entre threads e
+mantido entre invocações quentes da Lambda.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from src.config.services import logger
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "60"))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """O circuito do provedor está aberto: a chamada nem foi feita."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """
+        Reserva a passagem de uma chamada.
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto (ou já houver um teste em half-open)
+        """
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial_running = False
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_in = max(self.reset_timeout - (self._clock() - self._opened_at), 0)
+        raise CircuitOpenError(f"circuito de {self.name} aberto (nova tentativa em {retry_in:.0f}s)")
+
+    def release(self):
+        """Devolve a passagem reservada sem resultado (a chamada nem chegou ao provedor)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("🔌 Circuito de {} fechado (provedor respondeu)", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("🔌 Circuito de {} aberto após {} falhas seguidas", self.name, self._failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def breaker_for(name: str) -> CircuitBreaker:
+    """Breaker compartilhado do provedor (criado no primeiro uso)."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def states() -> Dict[str, str]:
+    """Estado atual de cada breaker já usado: {provedor: closed|open|half_open}."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
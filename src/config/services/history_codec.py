@@ -0,0 +1,129 @@
+"""
+Formato colunar binário para o histórico de preço/volume.
+
+Layout (little-endian):
+    cabeçalho: magic b"CPH1" | versão (uint16) | reservado (uint16) | n (uint32)
+    corpo:     n × float64 timestamp | n × float64 price | n × float64 volume
+
+Carrega com array.frombytes (ou numpy.frombuffer, sem cópia) sem criar um
+objeto Python por registro. Blobs JSON do formato antigo ([{price, volume,
+timestamp}, ...]) também são aceitos por decode_columns.
+"""
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple
+
+MAGIC = b"CPH1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+
+
+class HistoryColumns(NamedTuple):
+    """Colunas paralelas do histórico, ordenadas por timestamp."""
+    timestamps: array
+    prices: array
+    volumes: array
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def since(self, start_ts: float) -> "HistoryColumns":
+        """Registros com timestamp >= start_ts (busca binária)."""
+        i = bisect_left(self.timestamps, start_ts)
+        if i == 0:
+            return self
+        return HistoryColumns(self.timestamps[i:], self.prices[i:], self.volumes[i:])
+
+    def append(self, price: float, volume: float, ts: float):
+        self.timestamps.append(ts)
+        self.prices.append(price)
+        self.volumes.append(volume)
+
+    def extend(self, other: "HistoryColumns"):
+        self.timestamps.extend(other.timestamps)
+        self.prices.extend(other.prices)
+        self.volumes.extend(other.volumes)
+
+
+def empty_columns() -> HistoryColumns:
+    return HistoryColumns(array('d'), array('d'), array('d'))
+
+
+def is_columnar(blob: bytes) -> bool:
+    return blob[:len(MAGIC)] == MAGIC
+
+
+def encode_columns(columns: HistoryColumns) -> bytes:
+    """Serializa as colunas no formato binário CPH1."""
+    n = len(columns.timestamps)
+    parts = [HEADER.pack(MAGIC, VERSION, 0, n)]
+    for column in columns:
+        if sys.byteorder != 'little':
+            column = array('d', column)
+            column.byteswap()
+        parts.append(column.tobytes())
+    return b"".join(parts)
+
+
+def decode_columns(blob: bytes) -> HistoryColumns:
+    """
+    Lê um segmento binário (CPH1) ou JSON do formato antigo.
+
+    Raises:
+        ValueError: Se o blob binário estiver truncado ou com versão desconhecida
+    """
+    if not is_columnar(blob):
+        return columns_from_records(json.loads(blob))
+
+    _, version, _, n = HEADER.unpack_from(blob)
+    if version != VERSION:
+        raise ValueError(f"Versão de histórico desconhecida: {version}")
+    if len(blob) < HEADER.size + 3 * 8 * n:
+        raise ValueError("Segmento de histórico truncado")
+
+    columns = []
+    offset = HEADER.size
+    for _ in range(3):
+        column = array('d')
+        column.frombytes(blob[offset:offset + 8 * n])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        columns.append(column)
+        offset += 8 * n
+    return HistoryColumns(*columns)
+
+
+def decode_numpy(blob: bytes):
+    """
+    Lê um segmento CPH1 como três arrays NumPy sem copiar o buffer.
+
+    Returns:
+        (timestamps, prices, volumes) como numpy.ndarray float64 somente leitura
+    """
+    import numpy as np
+
+    _, version, _, n = HEADER.unpack_from(blob)
+    if version != VERSION:
+        raise ValueError(f"Versão de histórico desconhecida: {version}")
+    data = np.frombuffer(blob, dtype='<f8', count=3 * n, offset=HEADER.size)
+    return data[:n], data[n:2 * n], data[2 * n:]
+
+
+def columns_from_records(records: List[Dict]) -> HistoryColumns:
+    """Converte a lista de dicts do formato JSON em colunas."""
+    return HistoryColumns(
+        array('d', (h['timestamp'] for h in records)),
+        array('d', (h['price'] for h in records)),
+        array('d', (h.get('volume', 0) for h in records))
+    )
+
+
+def records_from_columns(columns: HistoryColumns) -> List[Dict]:
+    """Converte colunas de volta na lista de dicts {price, volume, timestamp}."""
+    return [
+        {"price": p, "volume": v, "timestamp": t}
+        for t, p, v in zip(columns.timestamps, columns.prices, columns.volumes)
+    ]
@@ -0,0 +1,129 @@
+"""
+Janela de histórico em memória, carregada uma vez por símbolo por execução.
+
+Mantém as colunas (timestamps, prices, volumes) ordenadas por timestamp e
+recorta sub-janelas com busca binária, então os indicadores de
+statistics.py não precisam refiltrar com max() nem reordenar a lista.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional
+
+from src.config.services.history_codec import HistoryColumns
+
+
+class HistoryWindow:
+    """
+    Histórico ordenado por timestamp.
+
+    Itera como a lista de dicts {price, volume, timestamp} usada antes, mas
+    os indicadores leem direto das colunas.
+
+    Attributes:
+        timestamps, prices, volumes: Colunas float64 paralelas
+        start_ts: Início da janela carregada (None se desconhecido)
+        segment_keys: {dia: chave} dos segmentos lidos do storage
+    """
+
+    __slots__ = ('timestamps', 'prices', 'volumes', 'start_ts', 'segment_keys')
+
+    def __init__(self, timestamps=None, prices=None, volumes=None, start_ts: Optional[float] = None):
+        self.timestamps = timestamps if timestamps is not None else array('d')
+        self.prices = prices if prices is not None else array('d')
+        self.volumes = volumes if volumes is not None else array('d')
+        self.start_ts = start_ts
+        self.segment_keys = {}
+
+    @classmethod
+    def from_columns(cls, columns: HistoryColumns, start_ts: Optional[float] = None) -> "HistoryWindow":
+        """Cria a janela a partir de colunas; só ordena se vierem fora de ordem."""
+        ts = columns.timestamps
+        if all(ts[i] <= ts[i + 1] for i in range(len(ts) - 1)):
+            return cls(columns.timestamps, columns.prices, columns.volumes, start_ts)
+        order = sorted(range(len(ts)), key=ts.__getitem__)
+        return cls(
+            array('d', (ts[i] for i in order)),
+            array('d', (columns.prices[i] for i in order)),
+            array('d', (columns.volumes[i] for i in order)),
+            start_ts
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict], start_ts: Optional[float] = None) -> "HistoryWindow":
+        """Cria a janela a partir da lista de dicts (ordenação estável por timestamp)."""
+        ordered = sorted(records, key=lambda h: h['timestamp'])
+        return cls(
+            array('d', (h['timestamp'] for h in ordered)),
+            array('d', (h['price'] for h in ordered)),
+            array('d', (h.get('volume', 0) for h in ordered)),
+            start_ts
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for t, p, v in zip(self.timestamps, self.prices, self.volumes):
+            yield {"price": p, "volume": v, "timestamp": t}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryWindow(self.timestamps[index], self.prices[index], self.volumes[index])
+        return {"price": self.prices[index], "volume": self.volumes[index], "timestamp": self.timestamps[index]}
+
+    @property
+    def latest_ts(self) -> Optional[float]:
+        return self.timestamps[-1] if self.timestamps else None
+
+    def since(self, start_ts: float) -> "HistoryWindow":
+        """Sub-janela com timestamp >= start_ts."""
+        i = bisect_left(self.timestamps, start_ts)
+        if i == 0:
+            return self
+        return self[i:]
+
+    def last_hours(self, hours: float) -> "HistoryWindow":
+        """Sub-janela das últimas N horas, contadas a partir do registro mais recente."""
+        if not self.timestamps:
+            return self
+        return self.since(self.timestamps[-1] - (hours * 3600))
+
+    def last_minutes(self, minutes: float) -> "HistoryWindow":
+        return self.last_hours(minutes / 60)
+
+    def append(self, price: float, volume: float, ts: float):
+        """Adiciona um registro mantendo a ordem (O(1) quando ts é o mais recente)."""
+        if not self.timestamps or ts >= self.timestamps[-1]:
+            self.timestamps.append(ts)
+            self.prices.append(price)
+            self.volumes.append(volume)
+            return
+        i = bisect_right(self.timestamps, ts)
+        self.timestamps.insert(i, ts)
+        self.prices.insert(i, price)
+        self.volumes.insert(i, volume)
+
+    def drop_before(self, start_ts: float, min_batch: int = 1) -> int:
+        """
+        Remove no lugar os registros com timestamp < start_ts, mas só quando
+        forem pelo menos min_batch: quem acrescenta uma amostra por tick e
+        recorta a cada tick paga um deslocamento das colunas a cada
+        min_batch amostras, em vez de uma cópia da janela por amostra.
+
+        Returns:
+            Quantos registros foram removidos
+        """
+        i = bisect_left(self.timestamps, start_ts)
+        if i < max(min_batch, 1):
+            return 0
+        del self.timestamps[:i]
+        del self.prices[:i]
+        del self.volumes[:i]
+        self.start_ts = start_ts
+        return i
+
+    def to_columns(self) -> HistoryColumns:
+        return HistoryColumns(array('d', self.timestamps), array('d', self.prices), array('d', self.volumes))
+
+    def records(self) -> List[Dict]:
+        return list(self)
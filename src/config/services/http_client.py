@@ -0,0 +1,154 @@
+"""
+Cliente HTTP compartilhado (CoinGecko, CryptoCompare, Telegram).
+
+Uma única requests.Session por container, com pool de conexões keep-alive
+por host: chamadas seguintes para o mesmo host reaproveitam a conexão TCP/TLS
+já aberta, inclusive entre invocações quentes da Lambda.
+
+requests só é importado ao criar a sessão, na primeira chamada HTTP.
+
+Cada chamada passa pelo circuit breaker e pelo token bucket do provedor
+(identificado pelo host): com o circuito aberto ou o limite esgotado, falha
+na hora em vez de esperar o timeout, e quem chamou cai no seu fallback.
+Erros de conexão, timeouts e respostas 5xx contam como falha do provedor;
+uma resposta 429 suspende o bucket pelo Retry-After.
+"""
+import os
+import threading
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from src.config.services.circuit_breaker import breaker_for
+from src.config.services.rate_limiter import limiter_for
+
+if TYPE_CHECKING:
+    import requests
+
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RATE_MAX_WAIT = float(os.getenv("HTTP_RATE_MAX_WAIT", "2"))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; CryptoMonitor/1.0)',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+# host (ou host:porta, para servidores locais) -> provedor
+PROVIDER_HOSTS = {
+    'api.coingecko.com': 'CoinGecko',
+    'min-api.cryptocompare.com': 'CryptoCompare',
+    'api.telegram.org': 'Telegram'
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Retorna a sessão compartilhada, criando-a no primeiro uso."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_HOSTS,
+                    pool_maxsize=HTTP_POOL_PER_HOST,
+                    pool_block=True
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get(url, params=None, headers=None, timeout=None) -> "requests.Response":
+    """
+    GET pela sessão compartilhada. Não levanta erro para status != 2xx.
+
+    Raises:
+        CircuitOpenError / RateLimited: Sem chamar o provedor (ver módulo)
+    """
+    return _guarded(url, lambda: get_session().get(
+        url, params=params, headers=headers, timeout=timeout or _default_timeout()
+    ))
+
+
+def get_json(url, params=None, headers=None, timeout=None):
+    """GET que levanta HTTPError para status != 2xx e retorna o JSON decodificado."""
+    response = get(url, params=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def post(url, data=None, json=None, headers=None, timeout=None) -> "requests.Response":
+    """POST pela sessão compartilhada. Levanta HTTPError para status != 2xx."""
+    response = _guarded(url, lambda: get_session().post(
+        url, data=data, json=json, headers=headers, timeout=timeout or _default_timeout()
+    ))
+    response.raise_for_status()
+    return response
+
+
+def close():
+    """Fecha as conexões abertas (a próxima chamada cria uma sessão nova)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def provider_for(url) -> str:
+    """Nome do provedor de uma URL (o próprio host, se não for conhecido)."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    return PROVIDER_HOSTS.get(parts.netloc) or PROVIDER_HOSTS.get(host, host)
+
+
+def _guarded(url, request):
+    provider = provider_for(url)
+    breaker = breaker_for(provider)
+    breaker.before_call()
+    try:
+        limiter_for(provider).acquire(max_wait=HTTP_RATE_MAX_WAIT)
+    except Exception:
+        breaker.release()
+        raise
+
+    try:
+        response = request()
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if response.status_code == 429:
+        limiter_for(provider).pause(retry_after(response))
+    return response
+
+
+def retry_after(response) -> float:
+    """Segundos de espera de uma resposta 429 (parameters.retry_after do corpo ou cabeçalho Retry-After)."""
+    try:
+        return float(response.json()['parameters']['retry_after'])
+    except Exception:
+        pass
+    try:
+        return float(response.headers.get('Retry-After', 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _default_timeout():
+    return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
@@ -0,0 +1,540 @@
+"""
+Indicadores incrementais com estado persistível entre execuções.
+
+Em vez de recalcular tudo sobre a janela a cada execução, cada estrutura
+processa só as amostras que entraram e saíram desde a última vez e guarda
+o próprio estado (to_dict/from_dict) junto do estado do símbolo.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.config.services.history_window import HistoryWindow
+
+# Reinicia os acumuladores a partir da janela a cada N atualizações para
+# descartar o erro de arredondamento acumulado pelas remoções.
+ROLLING_RESEED_EVERY = 288
+
+# Variância relativa abaixo disso é tratada como zero (janela constante),
+# como statistics.stdev faria com aritmética exata.
+_RELATIVE_VARIANCE_FLOOR = 1e-18
+
+
+class RollingStats:
+    """Média e variância de uma janela deslizante (Welford com remoção)."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(0.0, self.m2 - delta * (x - self.mean))
+
+    @property
+    def variance(self) -> float:
+        """Variância amostral (n-1), como statistics.variance."""
+        if self.count < 2:
+            return 0.0
+        variance = self.m2 / (self.count - 1)
+        if variance <= _RELATIVE_VARIANCE_FLOOR * self.mean * self.mean:
+            return 0.0
+        return variance
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "RollingStats":
+        if not data:
+            return cls()
+        return cls(int(data.get('count', 0)), float(data.get('mean', 0.0)), float(data.get('m2', 0.0)))
+
+
+class RollingWindowStats:
+    """
+    Acumuladores de preço e volume de uma janela de N horas.
+
+    Guarda o timestamp da amostra mais antiga e da mais recente já
+    incluídas; sync() soma as amostras novas e remove as que expiraram,
+    em O(amostras alteradas) em vez de O(janela).
+    """
+
+    __slots__ = ('price', 'volume', 'first_ts', 'last_ts', 'updates')
+
+    def __init__(self, price=None, volume=None, first_ts=None, last_ts=None, updates=0):
+        self.price = price or RollingStats()
+        self.volume = volume or RollingStats()
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.updates = updates
+
+    def sync(self, window: HistoryWindow, hours: float) -> bool:
+        """
+        Atualiza os acumuladores para window.last_hours(hours).
+
+        A janela precisa cobrir desde a amostra mais antiga do estado
+        (window.start_ts <= first_ts); do contrário, ou se o estado estiver
+        inconsistente, os acumuladores são recalculados do zero.
+
+        Returns:
+            True se os acumuladores foram recalculados do zero
+        """
+        if not len(window):
+            self._reseed(window)
+            return True
+
+        ts = window.timestamps
+        latest = ts[-1]
+        cutoff = latest - (hours * 3600)
+        target_start = bisect_left(ts, cutoff)
+
+        stale = (
+            self.first_ts is None or self.last_ts is None or self.last_ts > latest
+            or self.updates >= ROLLING_RESEED_EVERY
+            or (window.start_ts is not None and window.start_ts > self.first_ts)
+        )
+        if stale:
+            self._reseed(window.since(cutoff))
+            return True
+
+        for i in range(bisect_right(ts, self.last_ts), len(ts)):
+            self.price.add(window.prices[i])
+            self.volume.add(window.volumes[i])
+
+        for i in range(bisect_left(ts, self.first_ts), target_start):
+            self.price.remove(window.prices[i])
+            self.volume.remove(window.volumes[i])
+
+        if self.price.count != len(ts) - target_start:
+            self._reseed(window.since(cutoff))
+            return True
+
+        self.first_ts = ts[target_start] if target_start < len(ts) else None
+        self.last_ts = latest
+        self.updates += 1
+        return False
+
+    def _reseed(self, window: HistoryWindow):
+        self.price, self.volume = RollingStats(), RollingStats()
+        for p, v in zip(window.prices, window.volumes):
+            self.price.add(p)
+            self.volume.add(v)
+        self.first_ts = window.timestamps[0] if len(window) else None
+        self.last_ts = window.latest_ts
+        self.updates = 0
+
+    def price_statistics(self) -> Dict:
+        """Mesmas chaves de mean/std_dev/count de get_price_statistics."""
+        return {'mean': self.price.mean, 'std_dev': self.price.std_dev, 'count': self.price.count}
+
+    def volume_statistics(self) -> Dict:
+        """Mesmas chaves de mean/std_dev/count de get_volume_statistics."""
+        return {'mean': self.volume.mean, 'std_dev': self.volume.std_dev, 'count': self.volume.count}
+
+    def to_dict(self) -> Dict:
+        return {
+            'price': self.price.to_dict(),
+            'volume': self.volume.to_dict(),
+            'first_ts': self.first_ts,
+            'last_ts': self.last_ts,
+            'updates': self.updates
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "RollingWindowStats":
+        if not data:
+            return cls()
+        return cls(
+            RollingStats.from_dict(data.get('price')),
+            RollingStats.from_dict(data.get('volume')),
+            data.get('first_ts'),
+            data.get('last_ts'),
+            int(data.get('updates', 0))
+        )
+
+
+class SlidingExtremes:
+    """
+    Mínimo, máximo e média de um intervalo deslizante [lo, hi) da janela.
+
+    Duas filas monotônicas de (timestamp, preço): lows com preços crescentes
+    e highs com preços decrescentes. Cada amostra entra e sai uma vez, então
+    o custo por amostra é O(1) amortizado enquanto as duas pontas do
+    intervalo só avançam; se alguma recuar, o intervalo é recalculado.
+    """
+
+    __slots__ = ('lows', 'highs', 'price', 'first_ts', 'last_ts', 'updates')
+
+    def __init__(self, lows=None, highs=None, price=None, first_ts=None, last_ts=None, updates=0):
+        self.lows = lows if lows is not None else deque()
+        self.highs = highs if highs is not None else deque()
+        self.price = price or RollingStats()
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.updates = updates
+
+    @property
+    def min(self) -> Optional[float]:
+        return self.lows[0][1] if self.lows else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self.highs[0][1] if self.highs else None
+
+    @property
+    def count(self) -> int:
+        return self.price.count
+
+    def update(self, window: HistoryWindow, lo: int, hi: int) -> bool:
+        """
+        Avança o intervalo para window[lo:hi].
+
+        Returns:
+            True se o intervalo foi recalculado do zero
+        """
+        if lo >= hi:
+            self._reseed(window, lo, hi)
+            return True
+
+        ts = window.timestamps
+        # Timestamps repetidos na fronteira não distinguem as amostras
+        # dentro e fora do intervalo: recalcula.
+        split_tie = (lo > 0 and ts[lo - 1] == ts[lo]) or (hi < len(ts) and ts[hi] == ts[hi - 1])
+        stale = (
+            split_tie or self.first_ts is None or self.last_ts is None
+            or ts[lo] < self.first_ts or ts[hi - 1] < self.last_ts
+            or self.updates >= ROLLING_RESEED_EVERY
+            or (window.start_ts is not None and window.start_ts > self.first_ts)
+        )
+        if stale:
+            self._reseed(window, lo, hi)
+            return True
+
+        prices = window.prices
+        added = bisect_right(ts, self.last_ts)
+        for i in range(max(added, lo), hi):
+            self._push(ts[i], prices[i])
+        for i in range(bisect_left(ts, self.first_ts), min(added, lo)):
+            self.price.remove(prices[i])
+
+        cutoff = ts[lo]
+        while self.lows and self.lows[0][0] < cutoff:
+            self.lows.popleft()
+        while self.highs and self.highs[0][0] < cutoff:
+            self.highs.popleft()
+
+        if self.price.count != hi - lo:
+            self._reseed(window, lo, hi)
+            return True
+
+        self.first_ts = cutoff
+        self.last_ts = ts[hi - 1]
+        self.updates += 1
+        return False
+
+    def _push(self, t: float, p: float):
+        while self.lows and self.lows[-1][1] >= p:
+            self.lows.pop()
+        self.lows.append((t, p))
+        while self.highs and self.highs[-1][1] <= p:
+            self.highs.pop()
+        self.highs.append((t, p))
+        self.price.add(p)
+
+    def _reseed(self, window: HistoryWindow, lo: int, hi: int):
+        self.lows, self.highs, self.price = deque(), deque(), RollingStats()
+        ts, prices = window.timestamps, window.prices
+        for i in range(lo, hi):
+            self._push(ts[i], prices[i])
+        self.first_ts = ts[lo] if lo < hi else None
+        self.last_ts = ts[hi - 1] if lo < hi else None
+        self.updates = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'lows': [list(item) for item in self.lows],
+            'highs': [list(item) for item in self.highs],
+            'price': self.price.to_dict(),
+            'first_ts': self.first_ts,
+            'last_ts': self.last_ts,
+            'updates': self.updates
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "SlidingExtremes":
+        if not data:
+            return cls()
+        return cls(
+            deque((t, p) for t, p in data.get('lows', [])),
+            deque((t, p) for t, p in data.get('highs', [])),
+            RollingStats.from_dict(data.get('price')),
+            data.get('first_ts'),
+            data.get('last_ts'),
+            int(data.get('updates', 0))
+        )
+
+
+class WindowExtremes:
+    """
+    Extremos dos últimos N minutos para lateralização/breakout e higher lows.
+
+    'whole' cobre a janela inteira (detect_sideways_movement); 'chunks' cobre
+    os mesmos blocos de detect_higher_lows. Os blocos começam no início da
+    janela, então as fronteiras andam junto com ela a cada amostra e cada
+    bloco também é um intervalo deslizante.
+    """
+
+    __slots__ = ('whole', 'chunks', 'min_points', '_total', '_duration')
+
+    def __init__(self, whole=None, chunks=None, min_points: int = 3):
+        self.whole = whole or SlidingExtremes()
+        self.chunks: List[SlidingExtremes] = chunks or []
+        self.min_points = min_points
+        self._total = 0
+        self._duration = 0.0
+
+    def sync(self, window: HistoryWindow, minutes: float):
+        """Atualiza os intervalos para window.last_minutes(minutes)."""
+        n = len(window)
+        self._total = n
+        if not n:
+            self.whole, self.chunks, self._duration = SlidingExtremes(), [], 0.0
+            return
+
+        ts = window.timestamps
+        lo = bisect_left(ts, ts[-1] - (minutes * 60))
+        self.whole.update(window, lo, n)
+        self._duration = (ts[-1] - ts[lo]) / 60
+
+        size = n - lo
+        if size < self.min_points * 2:
+            self.chunks = []
+            return
+
+        chunk_size = max(3, size // self.min_points)
+        bounds = [(start, min(start + chunk_size, n)) for start in range(lo, n, chunk_size)]
+        del self.chunks[len(bounds):]
+        while len(self.chunks) < len(bounds):
+            self.chunks.append(SlidingExtremes())
+        for chunk, (start, end) in zip(self.chunks, bounds):
+            chunk.update(window, start, end)
+
+    def sideways(self, threshold_pct: float = 1.0) -> Dict:
+        """Mesmo resultado de detect_sideways_movement sobre a janela sincronizada."""
+        count = self.whole.count
+        if self._total < 2 or count < 6:
+            return {
+                'is_sideways': False,
+                'volatility_pct': 0.0,
+                'price_min': 0.0,
+                'price_max': 0.0,
+                'price_range': 0.0,
+                'duration_minutes': 0.0,
+                'sample_count': count if self._total >= 2 else 0
+            }
+
+        price_min = self.whole.min
+        price_max = self.whole.max
+        price_avg = self.whole.price.mean
+        price_range = price_max - price_min
+
+        volatility_pct = (price_range / price_avg * 100) if price_avg > 0 else 0.0
+
+        return {
+            'is_sideways': volatility_pct < threshold_pct,
+            'volatility_pct': volatility_pct,
+            'price_min': price_min,
+            'price_max': price_max,
+            'price_range': price_range,
+            'duration_minutes': self._duration,
+            'sample_count': count
+        }
+
+    def pattern(self) -> Dict:
+        """Mesmo resultado de detect_higher_lows sobre a janela sincronizada."""
+        if self._total < self.min_points * 2 or not self.chunks:
+            return {
+                'has_higher_lows': False,
+                'has_lower_highs': False,
+                'lows': [],
+                'highs': [],
+                'pattern': 'neutral'
+            }
+
+        lows = [chunk.min for chunk in self.chunks]
+        highs = [chunk.max for chunk in self.chunks]
+
+        has_higher_lows = len(lows) >= self.min_points and all(lows[i] < lows[i + 1] for i in range(len(lows) - 1))
+        has_lower_highs = len(highs) >= self.min_points and all(highs[i] > highs[i + 1] for i in range(len(highs) - 1))
+
+        if has_higher_lows and not has_lower_highs:
+            pattern = 'bullish_reversal'
+        elif has_lower_highs and not has_higher_lows:
+            pattern = 'bearish_continuation'
+        else:
+            pattern = 'neutral'
+
+        return {
+            'has_higher_lows': has_higher_lows,
+            'has_lower_highs': has_lower_highs,
+            'lows': lows[-3:],
+            'highs': highs[-3:],
+            'pattern': pattern
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'whole': self.whole.to_dict(),
+            'chunks': [chunk.to_dict() for chunk in self.chunks]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], min_points: int = 3) -> "WindowExtremes":
+        if not data:
+            return cls(min_points=min_points)
+        return cls(
+            SlidingExtremes.from_dict(data.get('whole')),
+            [SlidingExtremes.from_dict(chunk) for chunk in data.get('chunks', [])],
+            min_points
+        )
+
+
+class WilderRSI:
+    """
+    RSI de Wilder para vários períodos, atualizado em O(1) por amostra.
+
+    Guarda por período as médias suavizadas de ganho e perda e, em comum, o
+    último preço/timestamp processado. Até completar 'period' variações a
+    média é simples (semente de Wilder); depois:
+        média = (média × (period - 1) + valor) / period
+    """
+
+    __slots__ = ('periods', 'avg_gain', 'avg_loss', 'count', 'last_price', 'last_ts')
+
+    def __init__(self, periods=(14,)):
+        self.periods = tuple(int(p) for p in periods)
+        self.avg_gain: Dict[int, float] = {}
+        self.avg_loss: Dict[int, float] = {}
+        self.count: Dict[int, int] = {}
+        self.last_price: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self._reset()
+
+    def _reset(self):
+        for period in self.periods:
+            self.avg_gain[period] = 0.0
+            self.avg_loss[period] = 0.0
+            self.count[period] = 0
+        self.last_price = None
+        self.last_ts = None
+
+    def update(self, price: float, ts: Optional[float] = None):
+        """Processa uma amostra nova."""
+        if self.last_price is not None:
+            delta = price - self.last_price
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            for period in self.periods:
+                count = self.count[period]
+                if count < period:
+                    count += 1
+                    self.count[period] = count
+                    self.avg_gain[period] += (gain - self.avg_gain[period]) / count
+                    self.avg_loss[period] += (loss - self.avg_loss[period]) / count
+                else:
+                    self.avg_gain[period] = (self.avg_gain[period] * (period - 1) + gain) / period
+                    self.avg_loss[period] = (self.avg_loss[period] * (period - 1) + loss) / period
+        self.last_price = price
+        self.last_ts = ts
+
+    def sync(self, window: HistoryWindow) -> bool:
+        """
+        Processa as amostras da janela posteriores a last_ts.
+
+        Sem estado, com períodos novos, com last_ts fora da janela carregada
+        ou à frente dela, semeia a partir da janela inteira.
+
+        Returns:
+            True se o estado foi semeado do zero
+        """
+        ts = window.timestamps
+        stale = (
+            self.last_ts is None or not ts or self.last_ts > ts[-1]
+            or self.last_ts < ts[0]
+            or (window.start_ts is not None and window.start_ts > self.last_ts)
+        )
+        if stale:
+            self._reset()
+            start = 0
+        else:
+            start = bisect_right(ts, self.last_ts)
+
+        prices = window.prices
+        for i in range(start, len(ts)):
+            self.update(prices[i], ts[i])
+        return stale
+
+    def value(self, period: int = 14) -> Optional[float]:
+        """RSI (0-100) do período, ou None antes de 'period' variações."""
+        if self.count.get(period, 0) < period:
+            return None
+        avg_loss = self.avg_loss[period]
+        if avg_loss == 0:
+            return 100.0
+        rs = self.avg_gain[period] / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def values(self) -> Dict[int, Optional[float]]:
+        return {period: self.value(period) for period in self.periods}
+
+    def to_dict(self) -> Dict:
+        return {
+            'last_price': self.last_price,
+            'last_ts': self.last_ts,
+            'periods': {
+                str(period): {
+                    'avg_gain': self.avg_gain[period],
+                    'avg_loss': self.avg_loss[period],
+                    'count': self.count[period]
+                }
+                for period in self.periods
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], periods=(14,)) -> "WilderRSI":
+        """Carrega o estado; se faltar algum dos períodos pedidos, começa vazio."""
+        rsi = cls(periods)
+        if not data:
+            return rsi
+        stored = data.get('periods', {})
+        if any(str(period) not in stored for period in rsi.periods):
+            return rsi
+        for period in rsi.periods:
+            entry = stored[str(period)]
+            rsi.avg_gain[period] = float(entry.get('avg_gain', 0.0))
+            rsi.avg_loss[period] = float(entry.get('avg_loss', 0.0))
+            rsi.count[period] = int(entry.get('count', 0))
+        rsi.last_price = data.get('last_price')
+        rsi.last_ts = data.get('last_ts')
+        return rsi
@@ -0,0 +1,340 @@
+"""
+Motor de indicadores: calcula tendência, higher lows/lower highs, momentum,
+lateralização, RSI e VWAP de um símbolo de uma vez.
+
+Dois motores com a mesma saída:
+- 'python': chama as funções de statistics.py
+- 'numpy':  uma passada vetorizada sobre as colunas da HistoryWindow
+            (np.diff, reduceat por chunk, searchsorted para as janelas)
+
+Com um WindowExtremes (incremental.py), padrão e lateralização vêm dos
+extremos deslizantes persistidos em vez de reescanear a última hora; com
+um WilderRSI, 'rsi' é o RSI de Wilder incremental em vez de calculate_rsi.
+Sem esses estados (replay, benchmarks), o motor NumPy calcula os três.
+
+As somas do motor NumPy usam np.cumsum(...)[-1], que acumula na ordem da
+série como o sum() de statistics.py (np.sum soma por pares e o resultado
+não bateria bit a bit).
+
+Cada indicador é cronometrado em metrics.py como 'indicator_<nome>'
+('indicator_extremes' para padrão + lateralização incrementais).
+
+numpy só é importado na primeira chamada com engine='numpy'.
+"""
+from typing import Dict, Optional
+
+from src.config.services import metrics
+from src.config.services.history_window import HistoryWindow
+from src.config.services.incremental import WilderRSI, WindowExtremes
+from src.config.services.statistics import (
+    calculate_trend_score, detect_higher_lows, calculate_momentum,
+    detect_sideways_movement, calculate_rsi, calculate_vwap
+)
+
+# Carregado por _load_numpy(); None se ainda não usado ou não instalado
+np = None
+_numpy_loaded = False
+
+ENGINES = ('python', 'numpy')
+
+
+def numpy_available() -> bool:
+    """Indica se o motor 'numpy' pode ser usado (importa numpy na primeira vez)."""
+    return _load_numpy() is not None
+
+
+def compute_indicators(
+    history: HistoryWindow,
+    recent_hours: float,
+    minutes: int = 60,
+    sideways_threshold_pct: float = 1.0,
+    rsi_period: int = 14,
+    vwap_hours: float = 1,
+    engine: str = 'python',
+    extremes: Optional[WindowExtremes] = None,
+    rsi_state: Optional[WilderRSI] = None
+) -> Dict:
+    """
+    Calcula todos os indicadores de contexto de um símbolo.
+
+    Args:
+        history: Janela completa do símbolo
+        recent_hours: Janela da média móvel (RSI e VWAP usam só ela)
+        minutes: Janela de tendência/padrão/momentum/lateralização (default: 60)
+        sideways_threshold_pct: % máxima de oscilação para lateralização
+        rsi_period: Período do RSI
+        vwap_hours: Janela do VWAP em horas
+        engine: 'python' ou 'numpy' (cai para 'python' se numpy não estiver instalado)
+        extremes: Estado de extremos deslizantes; sincronizado com a janela e usado
+            para 'pattern' e 'sideways'
+        rsi_state: Estado do RSI de Wilder; sincronizado com a janela e usado
+            para 'rsi' (período rsi_period)
+
+    Returns:
+        Dict com 'trend', 'pattern', 'momentum', 'sideways' (mesmos dicts de
+        statistics.py), 'rsi' e 'vwap' (float ou None)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de indicadores desconhecido: {engine}")
+
+    # O que vem dos estados incrementais não é recalculado sobre a janela
+    skip = set()
+    if extremes is not None:
+        skip.update(('pattern', 'sideways'))
+    if rsi_state is not None:
+        skip.add('rsi')
+
+    if engine == 'numpy' and _load_numpy() is not None:
+        indicators = _compute_numpy(history, recent_hours, minutes, sideways_threshold_pct, rsi_period, vwap_hours, skip)
+    else:
+        indicators = _compute_python(history, recent_hours, minutes, sideways_threshold_pct, rsi_period, vwap_hours, skip)
+
+    if extremes is not None:
+        with metrics.timer('indicator_extremes'):
+            extremes.sync(history, minutes)
+            indicators['pattern'] = extremes.pattern()
+            indicators['sideways'] = extremes.sideways(sideways_threshold_pct)
+
+    if rsi_state is not None:
+        with metrics.timer('indicator_rsi'):
+            rsi_state.sync(history)
+            indicators['rsi'] = rsi_state.value(rsi_period)
+
+    return indicators
+
+
+def _load_numpy():
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_loaded = True
+    return np
+
+
+def _compute_python(history, recent_hours, minutes, sideways_threshold_pct, rsi_period, vwap_hours, skip=()):
+    recent = history.last_hours(recent_hours)
+    indicators = {}
+    with metrics.timer('indicator_trend'):
+        indicators['trend'] = calculate_trend_score(history, minutes=minutes)
+    with metrics.timer('indicator_momentum'):
+        indicators['momentum'] = calculate_momentum(history, minutes=minutes)
+    with metrics.timer('indicator_vwap'):
+        indicators['vwap'] = calculate_vwap(recent, period_hours=vwap_hours)
+    if 'pattern' not in skip:
+        with metrics.timer('indicator_pattern'):
+            indicators['pattern'] = detect_higher_lows(history, minutes=minutes)
+    if 'sideways' not in skip:
+        with metrics.timer('indicator_sideways'):
+            indicators['sideways'] = detect_sideways_movement(history, minutes=minutes, threshold_pct=sideways_threshold_pct)
+    if 'rsi' not in skip:
+        with metrics.timer('indicator_rsi'):
+            indicators['rsi'] = calculate_rsi(recent, period=rsi_period)
+    return indicators
+
+
+def _compute_numpy(history, recent_hours, minutes, sideways_threshold_pct, rsi_period, vwap_hours, skip=()):
+    ts = np.frombuffer(history.timestamps, dtype=np.float64)
+    prices = np.frombuffer(history.prices, dtype=np.float64)
+    volumes = np.frombuffer(history.volumes, dtype=np.float64)
+    n = len(ts)
+
+    def tail_start(hours):
+        if n == 0:
+            return 0
+        return int(np.searchsorted(ts, ts[-1] - (hours * 3600), side='left'))
+
+    start = tail_start(minutes / 60)
+    window_prices = prices[start:]
+
+    recent_start = tail_start(recent_hours)
+
+    # VWAP sobre a janela recente, como calculate_vwap(recent)
+    vwap_start = max(recent_start, tail_start(vwap_hours))
+
+    indicators = {}
+    with metrics.timer('indicator_trend'):
+        indicators['trend'] = _trend_numpy(n, window_prices)
+    with metrics.timer('indicator_momentum'):
+        indicators['momentum'] = _momentum_numpy(n, window_prices)
+    with metrics.timer('indicator_vwap'):
+        indicators['vwap'] = _vwap_numpy(prices, volumes, vwap_start)
+    if 'pattern' not in skip:
+        with metrics.timer('indicator_pattern'):
+            indicators['pattern'] = _pattern_numpy(n, window_prices)
+    if 'sideways' not in skip:
+        with metrics.timer('indicator_sideways'):
+            indicators['sideways'] = _sideways_numpy(n, ts[start:], window_prices, sideways_threshold_pct)
+    if 'rsi' not in skip:
+        with metrics.timer('indicator_rsi'):
+            indicators['rsi'] = _rsi_numpy(prices[recent_start:], rsi_period)
+    return indicators
+
+
+def _trend_numpy(n, prices):
+    if n < 2 or len(prices) < 2:
+        return {
+            'positive_count': 0,
+            'negative_count': 0,
+            'neutral_count': 0,
+            'total_count': 0,
+            'positive_percentage': 0.0,
+            'trend_direction': 'neutral'
+        }
+
+    deltas = np.diff(prices)
+    positive = int(np.count_nonzero(deltas > 0))
+    negative = int(np.count_nonzero(deltas < 0))
+    neutral = len(deltas) - positive - negative
+
+    total = positive + negative + neutral
+    positive_pct = (positive / total * 100) if total > 0 else 0.0
+
+    if positive_pct >= 60:
+        direction = 'bullish'
+    elif positive_pct <= 40:
+        direction = 'bearish'
+    else:
+        direction = 'neutral'
+
+    return {
+        'positive_count': positive,
+        'negative_count': negative,
+        'neutral_count': neutral,
+        'total_count': total,
+        'positive_percentage': positive_pct,
+        'trend_direction': direction
+    }
+
+
+def _pattern_numpy(n, prices, min_points=3):
+    if n < min_points * 2 or len(prices) < min_points * 2:
+        return {
+            'has_higher_lows': False,
+            'has_lower_highs': False,
+            'lows': [],
+            'highs': [],
+            'pattern': 'neutral'
+        }
+
+    chunk_size = max(3, len(prices) // min_points)
+    starts = np.arange(0, len(prices), chunk_size)
+    lows = np.minimum.reduceat(prices, starts)
+    highs = np.maximum.reduceat(prices, starts)
+
+    has_higher_lows = len(lows) >= min_points and bool(np.all(np.diff(lows) > 0))
+    has_lower_highs = len(highs) >= min_points and bool(np.all(np.diff(highs) < 0))
+
+    if has_higher_lows and not has_lower_highs:
+        pattern = 'bullish_reversal'
+    elif has_lower_highs and not has_higher_lows:
+        pattern = 'bearish_continuation'
+    else:
+        pattern = 'neutral'
+
+    return {
+        'has_higher_lows': has_higher_lows,
+        'has_lower_highs': has_lower_highs,
+        'lows': lows[-3:].tolist(),
+        'highs': highs[-3:].tolist(),
+        'pattern': pattern
+    }
+
+
+def _momentum_numpy(n, prices):
+    if n < 2 or len(prices) < 2:
+        return {
+            'rate_of_change': 0.0,
+            'direction': 'neutral',
+            'strength': 'weak',
+            'price_start': 0.0,
+            'price_end': 0.0
+        }
+
+    price_start = float(prices[0])
+    price_end = float(prices[-1])
+
+    rate = ((price_end - price_start) / price_start * 100) if price_start > 0 else 0.0
+
+    if rate > 1:
+        direction = 'positive'
+        strength = 'strong' if rate > 3 else 'moderate'
+    elif rate < -1:
+        direction = 'negative'
+        strength = 'strong' if rate < -3 else 'moderate'
+    else:
+        direction = 'neutral'
+        strength = 'weak'
+
+    return {
+        'rate_of_change': rate,
+        'direction': direction,
+        'strength': strength,
+        'price_start': price_start,
+        'price_end': price_end
+    }
+
+
+def _sideways_numpy(n, ts, prices, threshold_pct):
+    if n < 2 or len(prices) < 6:
+        return {
+            'is_sideways': False,
+            'volatility_pct': 0.0,
+            'price_min': 0.0,
+            'price_max': 0.0,
+            'price_range': 0.0,
+            'duration_minutes': 0.0,
+            'sample_count': len(prices) if n >= 2 else 0
+        }
+
+    price_min = float(prices.min())
+    price_max = float(prices.max())
+    price_avg = float(np.cumsum(prices)[-1]) / len(prices)
+    price_range = price_max - price_min
+
+    volatility_pct = (price_range / price_avg * 100) if price_avg > 0 else 0.0
+
+    return {
+        'is_sideways': volatility_pct < threshold_pct,
+        'volatility_pct': volatility_pct,
+        'price_min': price_min,
+        'price_max': price_max,
+        'price_range': price_range,
+        'duration_minutes': float(ts[-1] - ts[0]) / 60,
+        'sample_count': len(prices)
+    }
+
+
+def _rsi_numpy(prices, period):
+    if len(prices) < period + 1:
+        return None
+
+    deltas = np.diff(prices)
+    gains = deltas[deltas > 0]
+    losses = -deltas[deltas < 0]
+
+    avg_gain = float(np.cumsum(gains)[-1]) / period if gains.size else 0
+    avg_loss = float(np.cumsum(losses)[-1]) / period if losses.size else 0
+
+    if avg_loss == 0:
+        return 100.0
+
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def _vwap_numpy(prices, volumes, start):
+    """VWAP de prices[start:] pelas somas acumuladas de preço*volume e de volume."""
+    if start >= len(prices):
+        return None
+
+    total_pv = float(np.cumsum(prices[start:] * volumes[start:])[-1])
+    total_volume = float(np.cumsum(volumes[start:])[-1])
+
+    if total_volume == 0:
+        return None
+
+    return total_pv / total_volume
@@ -0,0 +1,98 @@
+"""
+Log estruturado com nível, no lugar dos prints por símbolo.
+
+LOG_LEVEL (DEBUG, INFO, WARNING, ERROR; default INFO) decide o que sai. A
+mensagem só é formatada (msg.format(*args)) se o nível estiver ativo: uma
+linha de DEBUG desligada custa uma comparação, não um f-string.
+
+Cada linha é um JSON compacto {"level", "msg", ...campos}, com os campos
+de context() da thread (ex: o símbolo). event(nome, **campos) grava um
+registro sem mensagem; no nível INFO o resumo de cada símbolo por tick é
+um evento só, e a narrativa (médias, z-scores, tendência...) fica no DEBUG.
+LOG_FORMAT=text imprime a mensagem legível (e os campos, inclusive os do
+contexto, como chave=valor).
+
+As linhas vão para o sys.stdout do momento da chamada: o run_per_symbol
+redireciona o stdout por thread para manter a saída na ordem dos símbolos.
+"""
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+LOG_LEVEL = LEVELS.get(os.getenv("LOG_LEVEL", "INFO").upper(), INFO)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+_local = threading.local()
+
+
+def enabled(level: int) -> bool:
+    """Se linhas deste nível saem (para não montar argumentos caros à toa)."""
+    return level >= LOG_LEVEL
+
+
+def debug(msg: str, *args, **fields):
+    if DEBUG >= LOG_LEVEL:
+        _write(DEBUG, msg, args, fields)
+
+
+def info(msg: str, *args, **fields):
+    if INFO >= LOG_LEVEL:
+        _write(INFO, msg, args, fields)
+
+
+def warning(msg: str, *args, **fields):
+    if WARNING >= LOG_LEVEL:
+        _write(WARNING, msg, args, fields)
+
+
+def error(msg: str, *args, **fields):
+    if ERROR >= LOG_LEVEL:
+        _write(ERROR, msg, args, fields)
+
+
+def event(name: str, level: int = INFO, **fields):
+    """Registro estruturado {"level", "event": name, ...campos}, sem mensagem."""
+    if level >= LOG_LEVEL:
+        _write(level, None, (), dict(event=name, **fields))
+
+
+@contextmanager
+def context(**fields):
+    """Acrescenta os campos a toda linha gravada por esta thread dentro do bloco."""
+    previous = getattr(_local, 'fields', None)
+    _local.fields = {**(previous or {}), **fields}
+    try:
+        yield
+    finally:
+        _local.fields = previous
+
+
+def _write(level, msg, args, fields):
+    if args:
+        msg = msg.format(*args)
+    context_fields = getattr(_local, 'fields', None)
+
+    if LOG_FORMAT == "text":
+        if context_fields:
+            fields = {**context_fields, **fields}
+        pairs = " ".join(f"{key}={value}" for key, value in fields.items())
+        line = " ".join(part for part in (msg, pairs) if part)
+    else:
+        record = {'level': LEVEL_NAMES[level]}
+        if msg:
+            record['msg'] = msg
+        if context_fields:
+            record.update(context_fields)
+        record.update(fields)
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    sys.stdout.write(line + "\n")
@@ -0,0 +1,201 @@
+"""
+Cronômetros e contadores por etapa da execução, emitidos no CloudWatch
+Embedded Metric Format (EMF).
+
+Entre begin_invocation() e emit(), timer(etapa) mede cada trecho e count()
+soma contadores. O que roda dentro de symbol_scope(símbolo) (na thread do
+símbolo) também é agregado por símbolo. emit() grava uma linha JSON por
+invocação: no stdout (o CloudWatch Logs extrai as métricas do EMF) ou, com
+LOCAL_MODE=true, em METRICS_FILE.
+
+Cada etapa vira uma métrica em milissegundos com a lista das durações da
+invocação, para o CloudWatch calcular p50/p99. O EMF aceita até 100 valores
+por métrica: com mais, vão 100 estatísticas de ordem igualmente espaçadas
+(mínimo e máximo inclusos).
+
+Fora de uma invocação (replay, testes), timer() não mede nada.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.services import logger
+
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "CryptoMonitor")
+METRICS_FILE = Path(os.getenv("METRICS_FILE", "local_data/metrics.jsonl"))
+EMF_MAX_VALUES = 100
+
+clock = time.perf_counter
+
+_lock = threading.Lock()
+_local = threading.local()
+_active = False
+_timings: Dict[str, List[float]] = {}
+_counters: Dict[str, float] = {}
+_symbols: Dict[str, Dict[str, float]] = {}
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, clock() - self.start)
+        return False
+
+
+def begin_invocation():
+    """Zera os dados e passa a medir."""
+    global _active
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+        _symbols.clear()
+        _active = True
+
+
+def timer(stage: str):
+    """Context manager que soma a duração do bloco à etapa (e ao símbolo da thread)."""
+    if not _active:
+        return _NULL_TIMER
+    return _Timer(stage)
+
+
+@contextmanager
+def symbol_scope(symbol: str):
+    """Atribui ao símbolo o que for medido nesta thread dentro do bloco."""
+    previous = getattr(_local, 'symbol', None)
+    _local.symbol = symbol
+    try:
+        yield
+    finally:
+        _local.symbol = previous
+
+
+def record(stage: str, seconds: float):
+    if not _active:
+        return
+    symbol = getattr(_local, 'symbol', None)
+    with _lock:
+        _timings.setdefault(stage, []).append(seconds)
+        if symbol is not None:
+            stages = _symbols.setdefault(symbol, {})
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def count(name: str, amount: float = 1):
+    if not _active:
+        return
+    symbol = getattr(_local, 'symbol', None)
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+        if symbol is not None:
+            stages = _symbols.setdefault(symbol, {})
+            stages[name] = stages.get(name, 0) + amount
+
+
+def summary() -> Dict:
+    """{etapa: {'n', 'total_ms', 'p50_ms', 'p99_ms', 'max_ms'}} da invocação atual."""
+    with _lock:
+        timings = {stage: sorted(values) for stage, values in _timings.items()}
+    return {
+        stage: {
+            'n': len(values),
+            'total_ms': round(sum(values) * 1000, 3),
+            'p50_ms': round(_percentile(values, 50) * 1000, 3),
+            'p99_ms': round(_percentile(values, 99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3)
+        }
+        for stage, values in timings.items()
+    }
+
+
+def emit(dimensions: Optional[Dict[str, str]] = None, timestamp: Optional[float] = None) -> Dict:
+    """
+    Monta o documento EMF da invocação, grava uma linha e para de medir.
+
+    Args:
+        dimensions: Dimensões das métricas (default: {'Service': nome da função})
+        timestamp: Horário da invocação (default: agora)
+
+    Returns:
+        O documento EMF gravado
+    """
+    global _active
+    dimensions = dimensions or {'Service': os.getenv("AWS_LAMBDA_FUNCTION_NAME", "crypto-monitor")}
+    stages = summary()
+    with _lock:
+        timings = {stage: sorted(values) for stage, values in _timings.items()}
+        counters = dict(_counters)
+        symbols = {
+            symbol: {name: round(value * 1000, 3) if name in timings else value for name, value in values.items()}
+            for symbol, values in _symbols.items()
+        }
+        _active = False
+
+    metrics = [{'Name': stage, 'Unit': 'Milliseconds'} for stage in timings]
+    metrics += [{'Name': name, 'Unit': 'Count'} for name in counters]
+    document = {
+        '_aws': {
+            'Timestamp': int((timestamp if timestamp is not None else time.time()) * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [sorted(dimensions)],
+                'Metrics': metrics
+            }]
+        },
+        **dimensions,
+        'stages': stages,
+        'symbols': symbols
+    }
+    for stage, values in timings.items():
+        document[stage] = [round(value * 1000, 3) for value in _downsample(values, EMF_MAX_VALUES)]
+    document.update(counters)
+
+    line = json.dumps(document, separators=(',', ':'), ensure_ascii=False)
+    if os.getenv("LOCAL_MODE", "false").lower() == "true":
+        try:
+            METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(METRICS_FILE, "a") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            logger.warning("⚠️  Erro ao gravar métricas em {}: {}", METRICS_FILE, e)
+    else:
+        print(line)
+    return document
+
+
+def _downsample(values, limit):
+    """values ordenados; até limit estatísticas de ordem igualmente espaçadas."""
+    if len(values) <= limit:
+        return values
+    step = (len(values) - 1) / (limit - 1)
+    return [values[round(i * step)] for i in range(limit)]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
@@ -0,0 +1,229 @@
+"""
+Provedores de dados de mercado com requisições "hedged".
+
+O primeiro provedor da lista é chamado; se não responder dentro do atraso de
+hedge, o próximo é disparado em paralelo e vale a primeira resposta válida.
+Um erro ou resposta vazia dispara o próximo na hora. O atraso de cada
+provedor é o percentil HEDGE_PERCENTILE do seu histograma de latência
+(limitado a [HEDGE_MIN_DELAY, HEDGE_MAX_DELAY]); até juntar
+HEDGE_MIN_SAMPLES amostras, usa HEDGE_DEFAULT_DELAY. Os histogramas são do
+container e acumulam entre invocações quentes.
+
+Um provedor com o circuito aberto (ou sem token no rate limiter) falha na
+hora, então o próximo é disparado sem esperar; essas recusas não entram no
+histograma de latência.
+
+Um provedor disparado que não responde em PROVIDER_TIMEOUT (por padrão, os
+timeouts HTTP de conexão e leitura mais a espera máxima do rate limiter)
+conta como erro e deixa de ser aguardado; a resposta que chegar depois é
+descartada.
+"""
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional
+
+from src.config.services import logger
+from src.config.services.http_client import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RATE_MAX_WAIT
+from src.config.services.circuit_breaker import CircuitOpenError
+from src.config.services.rate_limiter import RateLimited
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.2"))
+HEDGE_MAX_DELAY = float(os.getenv("HEDGE_MAX_DELAY", "3"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "1"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", str(HTTP_CONNECT_TIMEOUT + HTTP_READ_TIMEOUT + HTTP_RATE_MAX_WAIT)))
+
+# Limites superiores dos buckets: 1ms a ~87s, crescendo 25% por bucket
+_BUCKET_BOUNDS = [0.001 * 1.25 ** i for i in range(52)]
+
+
+class LatencyHistogram:
+    """Histograma de latências em buckets logarítmicos (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._counts[bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+            self.count += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Limite superior do bucket que contém o percentil (None sem amostras)."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = pct / 100 * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= target and bucket_count:
+                    return _BUCKET_BOUNDS[min(index, len(_BUCKET_BOUNDS) - 1)]
+            return _BUCKET_BOUNDS[-1]
+
+
+class Provider:
+    """Fonte de preço/volume: fetch(symbols) -> {symbol: {'price', 'volume'}}."""
+
+    def __init__(self, name: str, fetch: Callable[[List[str]], Dict[str, Dict]]):
+        self.name = name
+        self.fetch = fetch
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record_error(self):
+        """Conta uma falha (chamado das threads de hedge, daí o lock)."""
+        with self._lock:
+            self.errors += 1
+
+    def hedge_delay(self) -> float:
+        """Quanto esperar por este provedor antes de disparar o próximo."""
+        if self.latency.count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(self.latency.percentile(HEDGE_PERCENTILE), HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    def stats(self) -> Dict:
+        return {
+            'calls': self.latency.count,
+            'errors': self.errors,
+            'p50_ms': (self.latency.percentile(50) or 0) * 1000,
+            'p95_ms': (self.latency.percentile(95) or 0) * 1000
+        }
+
+
+def hedged_fetch(symbols: List[str], providers: List[Provider]) -> Dict[str, Dict]:
+    """
+    Busca os símbolos no primeiro provedor, com hedge para os seguintes.
+
+    A primeira resposta válida (não vazia) vence. Símbolos que ela não trouxer
+    são completados pelos outros provedores, na ordem da lista: o resultado
+    de um provedor já disparado é aguardado; os demais são chamados só com o
+    que falta.
+
+    Returns:
+        {symbol: {'price', 'volume'}}; símbolos sem dados em nenhum provedor ficam de fora
+    """
+    results = queue.Queue()
+    launched = []
+    started = {}
+    done = {}
+
+    def launch(index):
+        launched.append(index)
+        started[index] = time.monotonic()
+        provider = providers[index]
+        threading.Thread(
+            target=_call, args=(provider, symbols, index, results),
+            name=f"provider-{provider.name}", daemon=True
+        ).start()
+
+    def expires():
+        """Momento em que o primeiro provedor ainda aguardado estoura PROVIDER_TIMEOUT."""
+        return min(started[index] + PROVIDER_TIMEOUT for index in launched if index not in done)
+
+    def receive(until):
+        """
+        Próxima resposta até o instante until. Provedores que estouraram
+        PROVIDER_TIMEOUT contam como erro e saem da espera.
+
+        Returns:
+            (index, dados, erro), ou None se until passou sem resposta
+        """
+        while True:
+            try:
+                index, data, error = results.get(timeout=max(min(until, expires()) - time.monotonic(), 0))
+            except queue.Empty:
+                now = time.monotonic()
+                for index in launched:
+                    if index not in done and now >= started[index] + PROVIDER_TIMEOUT:
+                        done[index] = None
+                        providers[index].record_error()
+                        logger.warning("⚠️ Erro {}: sem resposta em {:g}s", providers[index].name, PROVIDER_TIMEOUT)
+                if now >= until or len(done) == len(launched):
+                    return None
+                continue
+            if index in done:
+                continue
+            if error is not None and not isinstance(error, (CircuitOpenError, RateLimited)):
+                providers[index].record_error()
+            return index, data, error
+
+    launch(0)
+    deadline = time.monotonic() + providers[0].hedge_delay()
+    winner = None
+    while winner is None and len(done) < len(providers):
+        can_hedge = len(launched) < len(providers)
+        if len(done) == len(launched) and can_hedge:
+            launch(len(launched))
+            deadline = time.monotonic() + providers[launched[-1]].hedge_delay()
+            continue
+        if len(done) == len(launched):
+            break
+
+        received = receive(deadline if can_hedge else float('inf'))
+        if received is None:
+            if can_hedge and len(done) < len(launched):
+                slow = providers[launched[-1]]
+                logger.info("⏱️ {} sem resposta em {:.0f}ms — disparando {}",
+                            slow.name, slow.hedge_delay() * 1000, providers[len(launched)].name)
+                launch(len(launched))
+                deadline = time.monotonic() + providers[launched[-1]].hedge_delay()
+            continue
+
+        index, data, error = received
+        done[index] = data
+        if error is not None:
+            logger.warning("⚠️ Erro {}: {}", providers[index].name, error)
+        elif data:
+            winner = index
+
+    snapshot = dict(done.get(winner) or {})
+    for index, provider in enumerate(providers):
+        missing = [symbol for symbol in symbols if symbol not in snapshot]
+        if not missing:
+            break
+        if index == winner:
+            continue
+        if index in launched:
+            while index not in done:
+                received = receive(float('inf'))
+                if received is not None:
+                    done[received[0]] = received[1]
+            data = done[index] or {}
+        else:
+            logger.warning("⚠️ Sem dados para {} — tentando {}...", ', '.join(missing), provider.name)
+            data = _call(provider, missing) or {}
+        snapshot.update({symbol: data[symbol] for symbol in missing if symbol in data})
+
+    return snapshot
+
+
+def _call(provider, symbols, index=None, results=None):
+    """Chama o provedor, registrando a latência; publica (index, dados, erro) em results."""
+    start = time.monotonic()
+    data, error = None, None
+    try:
+        data = provider.fetch(symbols)
+        provider.latency.record(time.monotonic() - start)
+    except (CircuitOpenError, RateLimited) as e:
+        error = e
+    except Exception as e:
+        error = e
+        provider.latency.record(time.monotonic() - start)
+
+    # Nas chamadas de hedge, o erro é contado por quem recebe a resposta
+    # (uma resposta que chega depois de PROVIDER_TIMEOUT já contou como erro)
+    if results is None:
+        if error is not None:
+            if not isinstance(error, (CircuitOpenError, RateLimited)):
+                provider.record_error()
+            logger.warning("❌ Erro {}: {}", provider.name, error)
+        return data
+    results.put((index, data, error))
@@ -0,0 +1,107 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre threads.
+
+O bucket acumula até `capacity` tokens, repostos a `rate` por segundo;
+acquire() espera o próximo token livre. pause() suspende a reposição até um
+instante futuro (ex: retry_after de uma resposta 429). Instâncias de módulo
+sobrevivem entre invocações quentes da Lambda.
+
+limiter_for(provedor) devolve o bucket compartilhado de cada API externa,
+configurado por API_RATE_LIMITS ("provedor=taxa:rajada,...").
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+API_RATE_LIMITS = os.getenv("API_RATE_LIMITS", "CoinGecko=0.5:5,CryptoCompare=5:10")
+
+
+class RateLimited(Exception):
+    """O próximo token demoraria mais que o máximo aceito pelo chamador."""
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens/s, rajadas de até `capacity`. rate <= 0 desliga o limite."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: float = 1, max_wait: Optional[float] = None) -> float:
+        """
+        Reserva tokens, esperando se necessário.
+
+        Args:
+            max_wait: Se a espera passar disso, não reserva nada e levanta RateLimited
+
+        Returns:
+            Segundos esperados
+        """
+        if self.rate <= 0 and not self._paused_until:
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate > 0 and self._tokens < tokens:
+                wait += (tokens - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                raise RateLimited(f"próximo token em {wait:.1f}s")
+            if self.rate > 0:
+                self._tokens -= tokens
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """Nenhum token é liberado nos próximos `seconds` segundos."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 1.0)
+
+    def _refill(self, now):
+        start = max(self._updated, self._paused_until)
+        if self.rate > 0 and now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = max(now, self._updated)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def limiter_for(name: str) -> TokenBucket:
+    """Bucket compartilhado do provedor; sem entrada em API_RATE_LIMITS, não limita (só pause())."""
+    with _registry_lock:
+        if name not in _limiters:
+            rate, capacity = _configured_limits().get(name, (0.0, 1))
+            _limiters[name] = TokenBucket(rate, capacity)
+        return _limiters[name]
+
+
+def _configured_limits():
+    limits = {}
+    for item in API_RATE_LIMITS.split(","):
+        if "=" not in item:
+            continue
+        name, spec = item.split("=", 1)
+        rate, _, capacity = spec.partition(":")
+        limits[name.strip()] = (float(rate), float(capacity or 1))
+    return limits
@@ -1,156 +1,533 @@
 import json
 import datetime
-import boto3
 import os
+import time
 from pathlib import Path
+from src.config.services.history_codec import (
+    HistoryColumns, empty_columns, encode_columns, decode_columns, is_columnar,
+    columns_from_records, records_from_columns
+)
+from src.config.services.history_window import HistoryWindow
+from src.config.services import storage, logger
+from src.config.services.storage import ENABLE_S3
 
-ENABLE_S3 = os.getenv("ENABLE_S3", "true").lower() == "true"
 HISTORY_DAYS = int(os.getenv("HISTORY_DAYS", "7"))
+HISTORY_FORMAT = os.getenv("HISTORY_FORMAT", "columnar")
 
-if ENABLE_S3:
-    s3 = boto3.client("s3")
-else:
-    s3 = None
+# Cache de último preço anterior ao estado consolidado (lido só na migração)
+LEGACY_LAST_PRICES_FILE = Path("/tmp/last_prices.json") if ENABLE_S3 else Path("local_data/last_prices.json")
 
-LOCAL_CACHE_FILE = Path("/tmp/last_prices.json") if ENABLE_S3 else Path("local_data/last_prices.json")
-LOCAL_HISTORY_DIR = Path("/tmp") if ENABLE_S3 else Path("local_data")
-
-def save_price_to_history(bucket, symbol, price, volume, ts):
+def save_price_to_history(bucket, symbol, price, volume, ts, window=None):
     """
     Salva preço E volume no histórico móvel (janela de N dias).
     
+    O histórico é segmentado por dia (history/{symbol}/{YYYY-MM-DD}.bin no
+    formato colunar, ou .json): cada execução reescreve apenas o segmento do
+    dia atual. Ao abrir um segmento novo, os segmentos que saíram da janela
+    são apagados inteiros.
+    
     Args:
         bucket: Nome do bucket S3
         symbol: Símbolo da moeda
         price: Preço atual
         volume: Volume atual
         ts: Timestamp
+        window: HistoryWindow já carregada por get_price_window (opcional).
+            Se ela cobre o dia atual, o segmento não é relido, e o novo
+            registro também é adicionado a ela.
     """
-    key = f"history/{symbol}.json"
+    day = _segment_day(ts)
+    day_start = _day_start_ts(ts)
     
-    history = get_price_history(bucket, symbol)
+    if window is not None and day in window.segment_keys and window.start_ts is not None and window.start_ts <= day_start:
+        found_key = window.segment_keys[day]
+        segment = window.since(day_start).to_columns() if found_key else None
+    else:
+        segment, found_key = _read_segment(bucket, symbol, day)
+    is_new_segment = segment is None
     
-    history.append({
-        "price": price,
-        "volume": volume,
-        "timestamp": ts
-    })
+    if is_new_segment:
+        segment = _migrate_legacy_history(bucket, symbol, ts).get(day) or empty_columns()
     
-    cutoff_ts = ts - (HISTORY_DAYS * 24 * 3600)
-    history = [h for h in history if h['timestamp'] >= cutoff_ts]
+    segment.append(price, volume, ts)
+    if window is not None:
+        window.append(price, volume, ts)
+    
+    key = _write_segment(bucket, symbol, day, segment)
+    if found_key and found_key != key:
+        storage.delete_object(bucket, found_key)
+    if window is not None:
+        window.segment_keys[day] = key
     
     if not ENABLE_S3:
-        local_file = LOCAL_HISTORY_DIR / f"{symbol}_history.json"
-        LOCAL_HISTORY_DIR.mkdir(parents=True, exist_ok=True)
-        local_file.write_text(json.dumps(history, indent=2))
-        print(f"💾 [LOCAL] Histórico salvo: {len(history)} registros")
+        logger.debug("💾 [LOCAL] Segmento {} salvo: {} registros", day, len(segment))
     else:
-        s3.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json.dumps(history),
-            ContentType="application/json",
-        )
-        print(f"💾 Histórico S3 atualizado: {len(history)} registros")
+        logger.debug("💾 Segmento S3 {} atualizado: {} registros", day, len(segment))
     
-    _save_to_local_cache(symbol, price, ts)
+    if is_new_segment:
+        _expire_segments(bucket, symbol, ts)
 
-def get_price_history(bucket, symbol):
-    """Recupera histórico completo de preços (últimos N dias)."""
-    if not ENABLE_S3:
-        local_file = LOCAL_HISTORY_DIR / f"{symbol}_history.json"
-        if local_file.exists():
-            try:
-                return json.loads(local_file.read_text())
-            except:
-                return []
-        return []
+def append_prices_to_history(bucket, symbol, samples):
+    """
+    Acrescenta várias amostras ao histórico, lendo e gravando cada segmento
+    de dia uma vez (checkpoint do daemon, que acumula os ticks em memória).
+
+    Amostras que não são mais novas que o fim do segmento são ignoradas,
+    então repetir um checkpoint que falhou no meio não duplica registros.
+
+    Args:
+        bucket: Nome do bucket S3
+        symbol: Símbolo da moeda
+        samples: Lista de (price, volume, ts) em ordem de timestamp
+    """
+    by_day = {}
+    for price, volume, ts in samples:
+        by_day.setdefault(_segment_day(ts), []).append((price, volume, ts))
+
+    for day, day_samples in by_day.items():
+        segment, found_key = _read_segment(bucket, symbol, day)
+        is_new_segment = segment is None
+        if is_new_segment:
+            segment = _migrate_legacy_history(bucket, symbol, day_samples[0][2]).get(day) or empty_columns()
+
+        for price, volume, ts in day_samples:
+            if not len(segment.timestamps) or ts > segment.timestamps[-1]:
+                segment.append(price, volume, ts)
+
+        key = _write_segment(bucket, symbol, day, segment)
+        if found_key and found_key != key:
+            storage.delete_object(bucket, found_key)
+        logger.debug("💾 Segmento {} de {}: {} registros", day, symbol, len(segment))
+
+        if is_new_segment:
+            _expire_segments(bucket, symbol, day_samples[-1][2])
+
+def get_price_history(bucket, symbol, hours=None, now=None):
+    """
+    Recupera histórico de preços, lendo só os segmentos que cobrem a janela.
+    
+    Args:
+        bucket: Nome do bucket S3
+        symbol: Símbolo da moeda
+        hours: Janela em horas (default: HISTORY_DAYS dias)
+        now: Fim da janela (default: time.time())
+    
+    Returns:
+        Lista de {price, volume, timestamp} em ordem cronológica
+    """
+    return records_from_columns(get_price_columns(bucket, symbol, hours, now))
+
+def get_price_columns(bucket, symbol, hours=None, now=None) -> HistoryColumns:
+    """
+    Igual a get_price_history, mas retorna colunas (timestamps, prices, volumes)
+    sem criar um dict por registro.
+    """
+    return get_price_window(bucket, symbol, hours, now).to_columns()
+
+def get_price_window(bucket, symbol, hours=None, now=None) -> HistoryWindow:
+    """
+    Carrega a janela de histórico uma única vez para a execução do símbolo.
+    
+    A janela volta ordenada por timestamp e pode ser passada para
+    save_price_to_history (evita reler o segmento do dia) e para todas as
+    funções de statistics.py.
+    """
+    now = time.time() if now is None else now
+    start_ts = now - (hours * 3600 if hours else HISTORY_DAYS * 24 * 3600)
+    
+    history = empty_columns()
+    segment_keys = {}
+    for day in _segment_days(start_ts, now):
+        try:
+            segment, key = _read_segment(bucket, symbol, day)
+        except Exception as e:
+            logger.warning("⚠️  Erro ao buscar histórico ({}): {}", day, e)
+            continue
+        segment_keys[day] = key
+        if segment is not None:
+            history.extend(segment.since(start_ts))
+    
+    if not any(segment_keys.values()):
+        legacy = _read_legacy_history(bucket, symbol)
+        if legacy is None:
+            logger.debug("ℹ️  Nenhum histórico para {} (primeira execução)", symbol)
+        else:
+            history = columns_from_records(legacy).since(start_ts)
+    
+    if len(history):
+        logger.debug("📂 Histórico recuperado: {} registros", len(history))
+    
+    window = HistoryWindow.from_columns(history, start_ts=start_ts)
+    window.segment_keys = segment_keys
+    return window
+
+def prefetch_symbols(bucket, symbols, hours=None, now=None):
+    """
+    Baixa em paralelo, no início da execução, o estado e os segmentos de
+    histórico que cada símbolo vai ler (ver storage.prefetch).
+    
+    Args:
+        bucket: Nome do bucket S3
+        symbols: Lista de símbolos
+        hours: Janela de histórico lida pelo handler (None: só o segmento do dia)
+        now: Timestamp da execução
+    """
+    now = time.time() if now is None else now
+    days = _segment_days(now - hours * 3600, now) if hours else [_segment_day(now)]
+    keys = []
+    for symbol in symbols:
+        keys.append(_symbol_state_key(symbol))
+        keys.extend(_segment_key(symbol, day) for day in days)
+    storage.prefetch(bucket, keys)
+
+def migrate_history_format(bucket, symbol):
+    """
+    Converte todos os segmentos de um símbolo para HISTORY_FORMAT.
+    
+    Sem isso a conversão acontece aos poucos: o segmento do dia é regravado
+    no formato novo a cada execução e os antigos continuam legíveis até expirar.
+    
+    Returns:
+        Número de segmentos convertidos
+    """
+    prefix = f"history/{symbol}/"
+    target_ext = _segment_ext(HISTORY_FORMAT)
+    converted = 0
+    for key in storage.list_keys(bucket, prefix):
+        if key.endswith(target_ext):
+            continue
+        day = key[len(prefix):].split('.')[0]
+        _write_segment(bucket, symbol, day, decode_columns(storage.read_object(bucket, key)))
+        storage.delete_object(bucket, key)
+        converted += 1
+    logger.info("🔀 {}: {} segmentos convertidos para {}", symbol, converted, HISTORY_FORMAT)
+    return converted
+
+def load_symbol_state(bucket, symbol):
+    """
+    Lê o estado consolidado do símbolo (state/{symbol}.json) numa única leitura.
     
-    key = f"history/{symbol}.json"
+    Na primeira execução após a atualização, o estado é montado a partir dos
+    arquivos antigos (stats/, alert_state/ e o cache de último preço), gravado
+    no formato novo e os antigos são apagados.
     
+    Returns:
+        Dict com:
+            'last_price': {price, timestamp} ou None
+            'stats': {all_time_high, all_time_low, last_ath_timestamp, last_atl_timestamp}
+            'alert': {last_alert_ts, last_price_z, last_volume_z,
+                      sideways_start_ts, last_sideways_alert_ts, was_sideways}
+            'indicators': acumuladores incrementais (rolling, extremes, rsi)
+    """
     try:
-        obj = s3.get_object(Bucket=bucket, Key=key)
-        history = json.loads(obj['Body'].read().decode('utf-8'))
-        print(f"📂 Histórico recuperado: {len(history)} registros")
-        return history
-    except s3.exceptions.NoSuchKey:
-        print(f"ℹ️  Nenhum histórico para {symbol} (primeira execução)")
-        return []
+        body = storage.read_object(bucket, _symbol_state_key(symbol))
     except Exception as e:
-        print(f"⚠️  Erro ao buscar histórico: {e}")
-        return []
+        logger.warning("⚠️  Erro ao buscar estado de {}: {}", symbol, e)
+        return _default_symbol_state()
+    
+    if body is None:
+        return _migrate_legacy_state(bucket, symbol)
+    
+    try:
+        stored = json.loads(body)
+    except ValueError as e:
+        logger.warning("⚠️  Estado de {} corrompido, recomeçando: {}", symbol, e)
+        return _default_symbol_state()
+    
+    return _merge_defaults(stored)
 
-def get_last_price(bucket, symbol):
-    """Recupera o último preço salvo (cache rápido)."""
-    return _get_from_local_cache(symbol)
+def save_symbol_state(bucket, symbol, state):
+    """
+    Grava o estado consolidado do símbolo (uma escrita por execução).
+    
+    Se outra execução gravar o estado entre a nossa leitura e o flush, as
+    duas versões são juntadas por merge_symbol_state.
+    
+    Returns:
+        Dict {'conflicts': int, 'suppressed': set} preenchido durante o
+        flush: quantas vezes o estado foi juntado e os tipos de alerta que
+        a outra execução já enviou (não devem ser enviados de novo)
+    """
+    report = {'conflicts': 0, 'suppressed': set()}
+    
+    def merge(base, ours, theirs):
+        merged, suppressed = merge_symbol_state(
+            _decode_state(base), json.loads(ours), _decode_state(theirs)
+        )
+        report['conflicts'] += 1
+        report['suppressed'] |= suppressed
+        logger.info("🔀 Estado de {} alterado por outra execução; versões juntadas", symbol)
+        return _encode_state(merged).encode('utf-8')
+    
+    try:
+        storage.write_object(bucket, _symbol_state_key(symbol), _encode_state(state), merge=merge)
+    except Exception as e:
+        logger.warning("⚠️  Erro ao salvar estado de {}: {}", symbol, e)
+    return report
 
-def save_stats(bucket, symbol, stats):
-    """Salva estatísticas de topos/fundos históricos."""
-    key = f"stats/{symbol}.json"
+def merge_symbol_state(base, ours, theirs):
+    """
+    Junta duas versões do estado gravadas a partir da mesma base.
     
-    if not ENABLE_S3:
-        local_file = LOCAL_HISTORY_DIR / f"{symbol}_stats.json"
-        LOCAL_HISTORY_DIR.mkdir(parents=True, exist_ok=True)
-        local_file.write_text(json.dumps(stats, indent=2))
-    else:
-        s3.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json.dumps(stats),
-            ContentType="application/json",
+    - last_price, indicadores e lateralização: da versão com preço mais novo
+    - recordes: maior topo e menor fundo das duas
+    - cooldown do alerta combinado: da versão que alertou por último
+    
+    Returns:
+        (estado juntado, set de tipos de alerta já enviados pela outra versão)
+    """
+    base, ours, theirs = _merge_defaults(base), _merge_defaults(ours), _merge_defaults(theirs)
+    
+    def price_ts(state):
+        return (state['last_price'] or {}).get('timestamp', 0)
+    
+    newer = ours if price_ts(ours) >= price_ts(theirs) else theirs
+    merged = _merge_defaults({
+        'last_price': newer['last_price'],
+        'indicators': newer['indicators'],
+        'alert': dict(newer['alert'])
+    })
+    
+    # Mesmo tick avaliado pelas duas execuções: não repete os alertas do tick
+    suppressed = {'variation', 'extreme', 'sentiment'}
+    
+    stats = merged['stats']
+    for field, ts_field, pick, kind in (
+        ('all_time_high', 'last_ath_timestamp', max, 'record_high'),
+        ('all_time_low', 'last_atl_timestamp', min, 'record_low')
+    ):
+        winner = pick((ours, theirs), key=lambda state: state['stats'][field])
+        stats[field] = winner['stats'][field]
+        if ts_field in winner['stats']:
+            stats[ts_field] = winner['stats'][ts_field]
+        if pick(ours['stats'][field], theirs['stats'][field]) == theirs['stats'][field]:
+            suppressed.add(kind)
+    
+    alert, base_alert, their_alert = merged['alert'], base['alert'], theirs['alert']
+    last_alerted = max((ours, theirs), key=lambda state: state['alert']['last_alert_ts'])
+    for field in ('last_alert_ts', 'last_price_z', 'last_volume_z'):
+        alert[field] = last_alerted['alert'][field]
+    if their_alert['last_alert_ts'] > base_alert['last_alert_ts']:
+        suppressed.add('combined')
+    
+    if their_alert['last_sideways_alert_ts'] > base_alert['last_sideways_alert_ts']:
+        suppressed.add('sideways')
+    if alert['was_sideways'] and ours['alert']['was_sideways']:
+        alert['last_sideways_alert_ts'] = max(
+            ours['alert']['last_sideways_alert_ts'], their_alert['last_sideways_alert_ts']
         )
+    if base_alert['was_sideways'] and not their_alert['was_sideways']:
+        suppressed.add('breakout')
+    
+    return merged, suppressed
+
+def _symbol_state_key(symbol):
+    return f"state/{symbol}.json"
 
-def get_stats(bucket, symbol):
-    """Recupera estatísticas de topos/fundos históricos."""
+def _default_symbol_state():
+    return {
+        'last_price': None,
+        'stats': {'all_time_high': 0.0, 'all_time_low': float('inf')},
+        'alert': {
+            'last_alert_ts': 0,
+            'last_price_z': 0.0,
+            'last_volume_z': 0.0,
+            'sideways_start_ts': 0,
+            'last_sideways_alert_ts': 0,
+            'was_sideways': False
+        },
+        'indicators': {}
+    }
+
+def _merge_defaults(stored):
+    state = _default_symbol_state()
+    for section, default in state.items():
+        value = stored.get(section)
+        if isinstance(default, dict) and isinstance(value, dict):
+            default.update(value)
+        elif value is not None:
+            state[section] = value
+    return state
+
+def _decode_state(body):
+    return json.loads(body) if body else {}
+
+def _encode_state(state):
     if not ENABLE_S3:
-        local_file = LOCAL_HISTORY_DIR / f"{symbol}_stats.json"
-        if local_file.exists():
-            try:
-                return json.loads(local_file.read_text())
-            except:
-                return {'all_time_high': 0.0, 'all_time_low': float('inf')}
-        return {'all_time_high': 0.0, 'all_time_low': float('inf')}
+        return json.dumps(state, indent=2)
+    return json.dumps(state)
+
+def _legacy_state_keys(symbol):
+    """Chaves antigas de stats e alert_state (no modo local, arquivos soltos em local_data)."""
+    if not ENABLE_S3:
+        return f"{symbol}_stats.json", f"{symbol}_alert_state.json"
+    return f"stats/{symbol}.json", f"alert_state/{symbol}.json"
+
+def _migrate_legacy_state(bucket, symbol):
+    """Monta o estado consolidado a partir dos arquivos antigos, se existirem."""
+    stats_key, alert_key = _legacy_state_keys(symbol)
+    legacy = {}
+    found = []
+    for section, key in (('stats', stats_key), ('alert', alert_key)):
+        try:
+            body = storage.read_object(bucket, key)
+            if body is not None:
+                legacy[section] = json.loads(body)
+                found.append(key)
+        except Exception as e:
+            logger.warning("⚠️  Erro ao ler {}: {}", key, e)
+    
+    legacy['last_price'] = _read_legacy_last_price(symbol)
+    
+    # Acumuladores que já estavam junto do alert_state
+    alert = legacy.get('alert') or {}
+    indicators = {name: alert.pop(name) for name in ('rolling', 'extremes', 'rsi') if name in alert}
+    if indicators:
+        legacy['indicators'] = indicators
     
-    key = f"stats/{symbol}.json"
+    state = _merge_defaults(legacy)
+    if not found:
+        return state
     
     try:
-        obj = s3.get_object(Bucket=bucket, Key=key)
-        return json.loads(obj['Body'].read().decode('utf-8'))
-    except s3.exceptions.NoSuchKey:
-        return {'all_time_high': 0.0, 'all_time_low': float('inf')}
+        storage.write_object(bucket, _symbol_state_key(symbol), _encode_state(state))
+        for key in found:
+            storage.delete_object(bucket, key)
+        logger.info("🔀 Estado de {} migrado para {}", symbol, _symbol_state_key(symbol))
     except Exception as e:
-        print(f"⚠️  Erro ao buscar stats: {e}")
-        return {'all_time_high': 0.0, 'all_time_low': float('inf')}
+        logger.warning("⚠️  Erro ao migrar estado de {}: {}", symbol, e)
+    return state
 
-def _save_to_local_cache(symbol, price, ts):
-    """Salva preço no cache local (/tmp na Lambda, local_data localmente)."""
+def _read_legacy_last_price(symbol):
+    """Último preço do cache antigo (/tmp/last_prices.json na Lambda)."""
+    if not LEGACY_LAST_PRICES_FILE.exists():
+        return None
     try:
-        if not ENABLE_S3:
-            LOCAL_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        
-        cache = {}
-        if LOCAL_CACHE_FILE.exists():
-            try:
-                cache = json.loads(LOCAL_CACHE_FILE.read_text())
-            except:
-                pass
-        
-        cache[symbol] = {
-            'price': price,
-            'timestamp': ts
-        }
-        
-        LOCAL_CACHE_FILE.write_text(json.dumps(cache, indent=2))
-    except Exception as e:
-        print(f"⚠️  Erro ao salvar cache local: {e}")
-
-def _get_from_local_cache(symbol):
-    """Recupera preço do cache local."""
-    if not LOCAL_CACHE_FILE.exists():
+        return json.loads(LEGACY_LAST_PRICES_FILE.read_text()).get(symbol)
+    except Exception:
         return None
+
+def _segment_day(ts):
+    """Dia UTC (YYYY-MM-DD) do segmento que contém o timestamp."""
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+def _day_start_ts(ts):
+    """Timestamp da meia-noite UTC do dia que contém ts."""
+    return ts - (ts % 86400)
+
+def _segment_days(start_ts, end_ts):
+    """Dias UTC de todos os segmentos que se sobrepõem a [start_ts, end_ts]."""
+    day = datetime.datetime.fromtimestamp(start_ts, datetime.timezone.utc).date()
+    last = datetime.datetime.fromtimestamp(end_ts, datetime.timezone.utc).date()
+    days = []
+    while day <= last:
+        days.append(day.isoformat())
+        day += datetime.timedelta(days=1)
+    return days
+
+def _segment_ext(fmt):
+    return ".bin" if fmt == "columnar" else ".json"
+
+def _segment_key(symbol, day, fmt=None):
+    return f"history/{symbol}/{day}{_segment_ext(fmt or HISTORY_FORMAT)}"
+
+def _read_segment(bucket, symbol, day):
+    """
+    Lê o segmento de um dia, no formato atual ou no outro (migração).
+    
+    Returns:
+        (HistoryColumns, chave lida) ou (None, None) se o segmento não existir
+    """
+    other_format = "json" if HISTORY_FORMAT == "columnar" else "columnar"
+    for fmt in (HISTORY_FORMAT, other_format):
+        key = _segment_key(symbol, day, fmt)
+        body = storage.read_object(bucket, key)
+        if body is not None:
+            return decode_columns(body), key
+    return None, None
+
+def _write_segment(bucket, symbol, day, columns):
+    """Grava o segmento no formato HISTORY_FORMAT e retorna a chave usada."""
+    key = _segment_key(symbol, day)
+    if HISTORY_FORMAT == "columnar":
+        storage.write_object(bucket, key, encode_columns(columns),
+                             content_type="application/octet-stream", merge=_merge_segment)
+    else:
+        storage.write_object(bucket, key, _encode_segment_json(columns), merge=_merge_segment)
+    return key
+
+def _encode_segment_json(columns):
+    records = records_from_columns(columns)
+    return json.dumps(records, indent=2) if not ENABLE_S3 else json.dumps(records)
+
+def _merge_segment(base, ours, theirs):
+    """
+    Junta um segmento gravado por outra execução: a versão dela mais as
+    amostras que nós adicionamos desde a base, sem duplicatas, ordenadas.
+    """
+    def samples(body):
+        if not body:
+            return []
+        columns = decode_columns(body)
+        return list(zip(columns.timestamps, columns.prices, columns.volumes))
     
+    known = set(samples(base))
+    merged = set(samples(theirs))
+    merged.update(sample for sample in samples(ours) if sample not in known)
+    
+    columns = empty_columns()
+    for ts, price, volume in sorted(merged):
+        columns.append(price, volume, ts)
+    if is_columnar(ours):
+        return encode_columns(columns)
+    return _encode_segment_json(columns).encode('utf-8')
+
+def _expire_segments(bucket, symbol, ts):
+    """Apaga os segmentos cujo dia inteiro ficou fora da janela de HISTORY_DAYS."""
+    cutoff_day = _segment_day(ts - (HISTORY_DAYS * 24 * 3600))
+    prefix = f"history/{symbol}/"
     try:
-        cache = json.loads(LOCAL_CACHE_FILE.read_text())
-        return cache.get(symbol)
-    except:
+        for key in storage.list_keys(bucket, prefix):
+            day = key[len(prefix):].split('.')[0]
+            if day < cutoff_day:
+                storage.delete_object(bucket, key)
+                logger.debug("🗑️  Segmento expirado removido: {}", key)
+    except Exception as e:
+        logger.warning("⚠️  Erro ao expirar segmentos de {}: {}", symbol, e)
+
+def _legacy_history_key(symbol):
+    return f"history/{symbol}.json" if ENABLE_S3 else f"{symbol}_history.json"
+
+def _read_legacy_history(bucket, symbol):
+    """Lê o documento único history/{symbol}.json do formato antigo (None se não existir)."""
+    try:
+        body = storage.read_object(bucket, _legacy_history_key(symbol))
+        return json.loads(body) if body else None
+    except Exception as e:
+        logger.warning("⚠️  Erro ao buscar histórico antigo: {}", e)
         return None
+
+def _migrate_legacy_history(bucket, symbol, ts):
+    """
+    Converte o documento antigo em segmentos diários e o remove.
+    
+    Returns:
+        Dict {dia: HistoryColumns} com os segmentos gravados (vazio se não havia documento antigo)
+    """
+    legacy = _read_legacy_history(bucket, symbol)
+    if legacy is None:
+        return {}
+    
+    cutoff_ts = ts - (HISTORY_DAYS * 24 * 3600)
+    segments = {}
+    for h in legacy:
+        if h['timestamp'] >= cutoff_ts:
+            day = _segment_day(h['timestamp'])
+            segments.setdefault(day, empty_columns()).append(h['price'], h.get('volume', 0), h['timestamp'])
+    
+    for day, columns in segments.items():
+        if day != _segment_day(ts):
+            _write_segment(bucket, symbol, day, columns)
+    storage.delete_object(bucket, _legacy_history_key(symbol))
+    logger.info("🔀 Histórico de {} migrado para {} segmentos diários", symbol, len(segments))
+    return segments
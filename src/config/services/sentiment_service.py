@@ -1,21 +1,58 @@
-import requests
+import os
+from pathlib import Path
+
 from src.config.coin_mappings import get_coingecko_id
+from src.config.services import http_client, logger, metrics
+from src.config.services.storage import ENABLE_S3
+from src.config.services.ttl_cache import TTLCache
+
+# Campos de perfil (votos, seguidores, interesse) mudam devagar; os derivados
+# de volume (menções, aumento) usam o volume do snapshot ou um TTL curto.
+SENTIMENT_TTL = float(os.getenv("SENTIMENT_TTL", "1800"))
+SENTIMENT_VOLUME_TTL = float(os.getenv("SENTIMENT_VOLUME_TTL", "240"))
+SENTIMENT_STALE_MAX_AGE = float(os.getenv("SENTIMENT_STALE_MAX_AGE", "86400"))
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "256"))
+COINGECKO_COIN_URL = "https://api.coingecko.com/api/v3/coins/{coin_id}"
+SENTIMENT_CACHE_FILE = Path("/tmp/sentiment_cache.json") if ENABLE_S3 else Path("local_data/sentiment_cache.json")
+
+_cache = TTLCache(SENTIMENT_CACHE_FILE, max_entries=SENTIMENT_CACHE_MAX_ENTRIES)
 
-def get_sentiment_data(coin_symbol: str, previous_volume: float = None):
+def get_sentiment_data(coin_symbol: str, previous_volume: float = None, current_volume: float = None):
     """
     Busca dados sociais via CoinGecko API (Free, sem Auth).
     Substitui a análise do Twitter para evitar rate limits.
+    
+    O documento /coins/{id} é pesado: os campos de perfil ficam em cache por
+    SENTIMENT_TTL e o volume por SENTIMENT_VOLUME_TTL. Se a API falhar, usa
+    o último dado em cache (até SENTIMENT_STALE_MAX_AGE) antes do mock.
+    
+    Args:
+        coin_symbol: Símbolo da moeda
+        previous_volume: Volume médio de referência (para percent_aumento)
+        current_volume: Volume 24h atual (do snapshot de mercado); com ele,
+            só os campos de perfil precisam estar no cache
     """
     coin_id = get_coingecko_id(coin_symbol)
     
+    profile = _cache.get(f"{coin_id}:profile", max_age=SENTIMENT_TTL)
+    volume = current_volume
+    if volume is None:
+        cached_volume = _cache.get(f"{coin_id}:volume", max_age=SENTIMENT_VOLUME_TTL)
+        volume = cached_volume[0] if cached_volume else None
+    if profile is not None and volume is not None:
+        metrics.count('sentiment_cache_hits')
+        logger.debug("🗃️ Sentimento de {} em cache (há {:.0f}min)", coin_id, profile[1] / 60)
+        return _build_sentiment(profile[0], volume, previous_volume)
+    
     try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}?localization=false&tickers=false&market_data=true&community_data=true&developer_data=false"
+        url = COINGECKO_COIN_URL.format(coin_id=coin_id) + "?localization=false&tickers=false&market_data=true&community_data=true&developer_data=false"
         
-        response = requests.get(url, timeout=10)
+        with metrics.timer('sentiment_fetch'):
+            response = http_client.get(url)
         
         if response.status_code != 200:
-            print(f"⚠️ Erro CoinGecko ({response.status_code}): {response.text}")
-            return _get_mock_sentiment_data(coin_symbol, reason=f"Erro API {response.status_code}")
+            logger.warning("⚠️ Erro CoinGecko ({}): {}", response.status_code, response.text)
+            return _stale_or_mock(coin_id, coin_symbol, current_volume, previous_volume, reason=f"Erro API {response.status_code}")
             
         data = response.json()
         
@@ -23,36 +60,59 @@ def get_sentiment_data(coin_symbol: str, previous_volume: float = None):
         community_data = data.get('community_data', {})
         
         total_volume = market_data.get('total_volume', {}).get('usd', 0)
-        social_proxy_mentions = int(total_volume / 1000000) 
         
         sentiment_votes_up = data.get('sentiment_votes_up_percentage')
         if sentiment_votes_up is None:
             sentiment_votes_up = 50.0 
-            
-        public_interest = data.get('public_interest_score', 0)
-        
-        twitter_followers = community_data.get('twitter_followers', 0)
-        reddit_subscribers = community_data.get('reddit_subscribers', 0)
-        
-        if previous_volume and previous_volume > 0:
-            percent_aumento = ((total_volume - previous_volume) / previous_volume) * 100
-            percent_aumento = max(0, min(100, percent_aumento))
-        else:
-            percent_aumento = 0 
         
-        return {
-            "menções_30min": social_proxy_mentions, 
-            "menções_5min": int(social_proxy_mentions / 6),
-            "percent_aumento": percent_aumento,
-            "lista_kols": ["CoinGecko Community"], 
-            "sentimento_atual": sentiment_votes_up,
-            "posts_virais": f"Score Interesse: {public_interest:.1f}",
-            "twitter_followers": twitter_followers
+        profile = {
+            "sentiment_votes_up": sentiment_votes_up,
+            "public_interest": data.get('public_interest_score', 0),
+            "twitter_followers": community_data.get('twitter_followers', 0),
+            "reddit_subscribers": community_data.get('reddit_subscribers', 0)
         }
+        _cache.put(f"{coin_id}:profile", profile)
+        _cache.put(f"{coin_id}:volume", total_volume)
+        
+        return _build_sentiment(profile, total_volume, previous_volume)
         
     except Exception as e:
-        print(f"❌ Erro na análise CoinGecko: {e}")
-        return _get_mock_sentiment_data(coin_symbol, reason=str(e))
+        logger.warning("❌ Erro na análise CoinGecko: {}", e)
+        return _stale_or_mock(coin_id, coin_symbol, current_volume, previous_volume, reason=str(e))
+
+def _build_sentiment(profile, total_volume, previous_volume):
+    social_proxy_mentions = int(total_volume / 1000000) 
+    
+    public_interest = profile.get('public_interest') or 0
+    
+    if previous_volume and previous_volume > 0:
+        percent_aumento = ((total_volume - previous_volume) / previous_volume) * 100
+        percent_aumento = max(0, min(100, percent_aumento))
+    else:
+        percent_aumento = 0 
+    
+    return {
+        "menções_30min": social_proxy_mentions, 
+        "menções_5min": int(social_proxy_mentions / 6),
+        "percent_aumento": percent_aumento,
+        "lista_kols": ["CoinGecko Community"], 
+        "sentimento_atual": profile['sentiment_votes_up'],
+        "posts_virais": f"Score Interesse: {public_interest:.1f}",
+        "twitter_followers": profile.get('twitter_followers', 0)
+    }
+
+def _stale_or_mock(coin_id, coin_symbol, current_volume, previous_volume, reason):
+    """Último dado em cache, mesmo vencido (até SENTIMENT_STALE_MAX_AGE); senão o mock."""
+    profile = _cache.get(f"{coin_id}:profile", max_age=SENTIMENT_STALE_MAX_AGE)
+    volume = current_volume
+    if volume is None:
+        cached_volume = _cache.get(f"{coin_id}:volume", max_age=SENTIMENT_STALE_MAX_AGE)
+        volume = cached_volume[0] if cached_volume else None
+    if profile is None or volume is None:
+        return _get_mock_sentiment_data(coin_symbol, reason=reason)
+    
+    logger.info("🗃️ Usando sentimento de {} de {:.0f}min atrás ({})", coin_id, profile[1] / 60, reason)
+    return _build_sentiment(profile[0], volume, previous_volume)
 
 def calculate_pump_score(sentiment_data, technical_metrics):
     """
@@ -4,7 +4,18 @@ Implementa média móvel, desvio padrão, detecção de topos/fundos históricos
 e análise de volume para reduzir falsos positivos.
 """
 import statistics
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
+
+from src.config.services.history_window import HistoryWindow
+
+History = Union[List[Dict], HistoryWindow]
+
+
+def _as_window(history: History) -> HistoryWindow:
+    """Aceita a lista de dicts antiga ou uma HistoryWindow (que não é reordenada)."""
+    if isinstance(history, HistoryWindow):
+        return history
+    return HistoryWindow.from_records(history or [])
 
 
 def calculate_moving_average(values: List[float]) -> float:
@@ -21,12 +32,12 @@ def calculate_std_deviation(values: List[float]) -> float:
     return statistics.stdev(values)
 
 
-def get_price_statistics(history: List[Dict]) -> Dict:
+def get_price_statistics(history: History) -> Dict:
     """
     Calcula estatísticas completas do histórico de preços.
     
     Args:
-        history: Lista de dicts com 'price' e 'timestamp'
+        history: Lista de dicts com 'price' e 'timestamp' (ou HistoryWindow)
     
     Returns:
         Dict com média, std_dev, min, max, count
@@ -40,7 +51,7 @@ def get_price_statistics(history: List[Dict]) -> Dict:
             'count': 0
         }
     
-    prices = [h['price'] for h in history]
+    prices = history.prices if isinstance(history, HistoryWindow) else [h['price'] for h in history]
     
     return {
         'mean': calculate_moving_average(prices),
@@ -51,12 +62,12 @@ def get_price_statistics(history: List[Dict]) -> Dict:
     }
 
 
-def get_volume_statistics(history: List[Dict]) -> Dict:
+def get_volume_statistics(history: History) -> Dict:
     """
     Calcula estatísticas completas do histórico de volumes.
     
     Args:
-        history: Lista de dicts com 'volume' e 'timestamp'
+        history: Lista de dicts com 'volume' e 'timestamp' (ou HistoryWindow)
     
     Returns:
         Dict com mean, std_dev, min, max, count
@@ -70,7 +81,10 @@ def get_volume_statistics(history: List[Dict]) -> Dict:
             'count': 0
         }
     
-    volumes = [h.get('volume', 0) for h in history if 'volume' in h]
+    if isinstance(history, HistoryWindow):
+        volumes = history.volumes
+    else:
+        volumes = [h.get('volume', 0) for h in history if 'volume' in h]
     
     if not volumes:
         return {
@@ -140,7 +154,8 @@ def evaluate_combined_anomaly(
     alert_state: Dict,
     min_volume_z: float = 1.0,
     extreme_threshold: float = 3.0,
-    cooldown_minutes: int = 30
+    cooldown_minutes: int = 30,
+    current_timestamp: float = None
 ) -> Tuple[bool, str, Dict]:
     """
     Avalia anomalia combinada de preço + volume para reduzir falsos positivos.
@@ -164,6 +179,7 @@ def evaluate_combined_anomaly(
         min_volume_z: Mínimo z-score de volume para confirmar (default: 1.0)
         extreme_threshold: Threshold para eventos extremos (default: 3.0σ)
         cooldown_minutes: Minutos de cooldown entre alertas (default: 30)
+        current_timestamp: Timestamp atual (opcional, usa time.time() se None)
     
     Returns:
         (should_alert, message, new_state)
@@ -172,7 +188,7 @@ def evaluate_combined_anomaly(
     
     should_alert = False
     alert_message = ""
-    current_ts = time.time()
+    current_ts = time.time() if current_timestamp is None else current_timestamp
     
     last_alert_ts = alert_state.get('last_alert_ts', 0)
     time_since_last = (current_ts - last_alert_ts) / 60 
@@ -258,17 +274,20 @@ def update_records(stats: Dict, current_price: float, current_timestamp: float =
     return stats, is_new_high, is_new_low
 
 
-def filter_recent_history(history: List[Dict], hours: int) -> List[Dict]:
+def filter_recent_history(history: History, hours: int) -> History:
     """
     Filtra histórico para manter apenas últimas N horas.
     
     Args:
-        history: Lista completa de registros
+        history: Lista completa de registros (ou HistoryWindow)
         hours: Número de horas a manter
     
     Returns:
-        Lista filtrada
+        Lista filtrada (ou sub-janela, por busca binária, se recebeu HistoryWindow)
     """
+    if isinstance(history, HistoryWindow):
+        return history.last_hours(hours)
+    
     if not history:
         return []
     
@@ -278,12 +297,12 @@ def filter_recent_history(history: List[Dict], hours: int) -> List[Dict]:
     return [h for h in history if h['timestamp'] >= cutoff_ts]
 
 
-def calculate_trend_score(history: List[Dict], minutes: int = 60) -> Dict:
+def calculate_trend_score(history: History, minutes: int = 60) -> Dict:
     """
     Calcula score de tendência baseado em movimentos positivos/negativos.
     
     Args:
-        history: Lista completa de registros
+        history: Lista completa de registros (ou HistoryWindow)
         minutes: Janela de tempo em minutos (default: 60 = última hora)
     
     Returns:
@@ -306,7 +325,7 @@ def calculate_trend_score(history: List[Dict], minutes: int = 60) -> Dict:
             'trend_direction': 'neutral'
         }
     
-    recent = filter_recent_history(history, minutes / 60)
+    recent = _as_window(history).last_minutes(minutes)
     
     if len(recent) < 2:
         return {
@@ -318,15 +337,15 @@ def calculate_trend_score(history: List[Dict], minutes: int = 60) -> Dict:
             'trend_direction': 'neutral'
         }
     
-    sorted_history = sorted(recent, key=lambda x: x['timestamp'])
+    prices = recent.prices
     
     positive = 0
     negative = 0
     neutral = 0
     
-    for i in range(1, len(sorted_history)):
-        prev_price = sorted_history[i-1]['price']
-        curr_price = sorted_history[i]['price']
+    for i in range(1, len(prices)):
+        prev_price = prices[i-1]
+        curr_price = prices[i]
         
         if curr_price > prev_price:
             positive += 1
@@ -391,12 +410,12 @@ def check_record_recency(stats: Dict, current_timestamp: float, window_hours: in
     }
 
 
-def detect_higher_lows(history: List[Dict], minutes: int = 60, min_points: int = 3) -> Dict:
+def detect_higher_lows(history: History, minutes: int = 60, min_points: int = 3) -> Dict:
     """
     Detecta padrão de higher lows (fundos crescentes) ou lower highs (topos decrescentes).
     
     Args:
-        history: Lista completa de registros
+        history: Lista completa de registros (ou HistoryWindow)
         minutes: Janela de tempo (default: 60 min)
         min_points: Mínimo de pontos para análise (default: 3)
     
@@ -418,7 +437,7 @@ def detect_higher_lows(history: List[Dict], minutes: int = 60, min_points: int =
             'pattern': 'neutral'
         }
     
-    recent = filter_recent_history(history, minutes / 60)
+    recent = _as_window(history).last_minutes(minutes)
     
     if len(recent) < min_points * 2:
         return {
@@ -429,8 +448,7 @@ def detect_higher_lows(history: List[Dict], minutes: int = 60, min_points: int =
             'pattern': 'neutral'
         }
     
-    sorted_history = sorted(recent, key=lambda x: x['timestamp'])
-    prices = [h['price'] for h in sorted_history]
+    prices = recent.prices
     
     chunk_size = max(3, len(prices) // min_points)
     lows = []
@@ -461,12 +479,12 @@ def detect_higher_lows(history: List[Dict], minutes: int = 60, min_points: int =
     }
 
 
-def calculate_momentum(history: List[Dict], minutes: int = 60) -> Dict:
+def calculate_momentum(history: History, minutes: int = 60) -> Dict:
     """
     Calcula momentum (taxa de mudança de preço).
     
     Args:
-        history: Lista completa de registros
+        history: Lista completa de registros (ou HistoryWindow)
         minutes: Janela de tempo (default: 60 min = 1 hora)
     
     Returns:
@@ -487,7 +505,7 @@ def calculate_momentum(history: List[Dict], minutes: int = 60) -> Dict:
             'price_end': 0.0
         }
     
-    recent = filter_recent_history(history, minutes / 60)
+    recent = _as_window(history).last_minutes(minutes)
     
     if len(recent) < 2:
         return {
@@ -498,10 +516,8 @@ def calculate_momentum(history: List[Dict], minutes: int = 60) -> Dict:
             'price_end': 0.0
         }
     
-    sorted_history = sorted(recent, key=lambda x: x['timestamp'])
-    
-    price_start = sorted_history[0]['price']
-    price_end = sorted_history[-1]['price']
+    price_start = recent.prices[0]
+    price_end = recent.prices[-1]
     
     rate = ((price_end - price_start) / price_start * 100) if price_start > 0 else 0.0
     
@@ -529,12 +545,16 @@ def calculate_rsi(prices, period=14):
     Calcula o RSI (Relative Strength Index) para uma lista de preços.
     
     Args:
-        prices (list): Lista de preços (float), ordenados do mais antigo para o mais recente.
+        prices (list): Lista de preços (float), ordenados do mais antigo para o mais recente
+            (ou HistoryWindow).
         period (int): Período para cálculo (padrão 14).
         
     Returns:
         float: Valor do RSI (0-100) ou None se dados insuficientes.
     """
+    if isinstance(prices, HistoryWindow):
+        prices = prices.prices
+    
     if len(prices) < period + 1:
         return None
         
@@ -559,7 +579,7 @@ def calculate_vwap(history, period_hours=1):
     Calcula o VWAP (Volume Weighted Average Price).
     
     Args:
-        history (list): Lista de dicts {price, volume, timestamp}.
+        history (list): Lista de dicts {price, volume, timestamp} (ou HistoryWindow).
         period_hours (int): Janela de tempo em horas.
         
     Returns:
@@ -567,6 +587,12 @@ def calculate_vwap(history, period_hours=1):
     """
     if not history:
         return None
+    
+    if isinstance(history, HistoryWindow):
+        relevant = history.last_hours(period_hours)
+        total_pv = sum(p * v for p, v in zip(relevant.prices, relevant.volumes))
+        total_volume = sum(relevant.volumes)
+        return total_pv / total_volume if total_volume != 0 else None
         
     now = history[-1]['timestamp']
     start_time = now - (period_hours * 3600)
@@ -585,12 +611,12 @@ def calculate_vwap(history, period_hours=1):
     return total_pv / total_volume
 
 
-def detect_sideways_movement(history: List[Dict], minutes: int = 60, threshold_pct: float = 1.0) -> Dict:
+def detect_sideways_movement(history: History, minutes: int = 60, threshold_pct: float = 1.0) -> Dict:
     """
     Detecta movimento lateral (baixa volatilidade, preço estável).
     
     Args:
-        history: Lista completa de registros
+        history: Lista completa de registros (ou HistoryWindow)
         minutes: Janela de tempo para análise (default: 60 min)
         threshold_pct: % máxima de oscilação para considerar lateral (default: 1.0%)
     
@@ -616,7 +642,7 @@ def detect_sideways_movement(history: List[Dict], minutes: int = 60, threshold_p
             'sample_count': 0
         }
     
-    recent = filter_recent_history(history, minutes / 60)
+    recent = _as_window(history).last_minutes(minutes)
     
     if len(recent) < 6: 
         return {
@@ -629,8 +655,7 @@ def detect_sideways_movement(history: List[Dict], minutes: int = 60, threshold_p
             'sample_count': len(recent)
         }
     
-    sorted_history = sorted(recent, key=lambda x: x['timestamp'])
-    prices = [h['price'] for h in sorted_history]
+    prices = recent.prices
     
     price_min = min(prices)
     price_max = max(prices)
@@ -639,7 +664,7 @@ def detect_sideways_movement(history: List[Dict], minutes: int = 60, threshold_p
     
     volatility_pct = (price_range / price_avg * 100) if price_avg > 0 else 0.0
     
-    duration_minutes = (sorted_history[-1]['timestamp'] - sorted_history[0]['timestamp']) / 60
+    duration_minutes = (recent.timestamps[-1] - recent.timestamps[0]) / 60
     
     is_sideways = volatility_pct < threshold_pct
     
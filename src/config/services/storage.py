@@ -0,0 +1,513 @@
+"""
+Acesso a objetos do S3 (ou de local_data/) com prefetch e write-behind.
+
+Fora de uma invocação, cada leitura/escrita vai direto ao backend. Entre
+begin_invocation() e flush():
+- prefetch() baixa em paralelo os objetos que a execução vai ler;
+- read_object() responde do buffer (inclusive o que já foi escrito);
+- write_object()/delete_object() só marcam o objeto como sujo;
+- flush() grava tudo em paralelo no fim, pulando objetos que não mudaram.
+
+Entre invocações quentes, o corpo e o ETag de cada objeto ficam num cache
+do container (LRU limitado por S3_CACHE_MAX_BYTES): a leitura seguinte
+revalida com IfNoneMatch e, se nada mudou, o S3 responde 304 sem corpo.
+No modo local o "ETag" é (inode, mtime, tamanho) do arquivo.
+
+As escritas do flush são condicionais à versão lida na invocação (If-Match,
+ou If-None-Match: * se o objeto não existia). Localmente, a versão é
+conferida sob um lock de arquivo e o objeto é trocado por rename atômico.
+Se outra execução gravou antes (conflito), o objeto é relido e a função
+merge(base, nosso, deles) informada em write_object() junta as duas
+versões antes de tentar de novo; sem merge, a nossa versão prevalece.
+PutObject condicional exige boto3/botocore >= 1.36 (requirements.txt);
+com um botocore mais antigo (ex: o embutido no runtime da Lambda), a
+primeira escrita avisa no log e as seguintes são gravadas sem condição.
+
+Os contadores (GETs, PUTs, DELETEs, bytes, hits/misses do cache) são
+zerados a cada invocação.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.config.services import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+ENABLE_S3 = os.getenv("ENABLE_S3", "true").lower() == "true"
+S3_MAX_WORKERS = int(os.getenv("S3_MAX_WORKERS", "16"))
+S3_CACHE_MAX_BYTES = int(os.getenv("S3_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+S3_WRITE_RETRIES = int(os.getenv("S3_WRITE_RETRIES", "5"))
+
+LOCAL_DATA_DIR = Path("/tmp") if ENABLE_S3 else Path("local_data")
+
+# Cliente compartilhado, criado por _client() no primeiro acesso ao S3
+# (boto3 leva ~100ms para importar e não é usado no modo local)
+s3 = None
+_client_lock = threading.Lock()
+
+_lock = threading.Lock()
+_session = None
+_counters = {}
+
+# (bucket, key) -> (etag, corpo); sobrevive entre invocações quentes
+_cache = OrderedDict()
+_cache_bytes = 0
+
+_local_write_lock = threading.Lock()
+
+# Condição de escrita: o objeto não pode existir
+ABSENT = "*"
+
+# False depois que o botocore recusou IfMatch/IfNoneMatch no PutObject
+_conditional_puts = True
+
+
+class WriteConflict(Exception):
+    """O objeto mudou desde a leitura (precondição de escrita falhou)."""
+
+
+class _Session:
+    """Objetos conhecidos na invocação atual e o que falta gravar."""
+
+    __slots__ = ('objects', 'base', 'dirty', 'deleted')
+
+    def __init__(self):
+        self.objects: Dict[tuple, Optional[bytes]] = {}
+        self.base: Dict[tuple, tuple] = {}
+        self.dirty: Dict[tuple, tuple] = {}
+        self.deleted = set()
+
+    def remember(self, ref, body, etag):
+        """Guarda a primeira versão lida do backend (base das escritas condicionais)."""
+        self.base.setdefault(ref, (body, etag))
+        self.objects.setdefault(ref, body)
+        return self.objects[ref]
+
+
+def _reset_counters():
+    global _counters
+    _counters = {
+        'get': 0,
+        'put': 0,
+        'delete': 0,
+        'bytes_read': 0,
+        'bytes_written': 0,
+        'skipped_writes': 0,
+        'errors': 0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+        'conflicts': 0
+    }
+
+
+_reset_counters()
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def get_counters() -> Dict:
+    """Contadores da invocação atual (cópia), com o tamanho atual do cache."""
+    with _lock:
+        return {**_counters, 'cache_bytes': _cache_bytes, 'cache_objects': len(_cache)}
+
+
+def clear_cache():
+    """Esvazia o cache do container."""
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
+
+
+def _cache_get(ref):
+    with _lock:
+        entry = _cache.get(ref)
+        if entry is not None:
+            _cache.move_to_end(ref)
+        return entry
+
+
+def _cache_put(ref, etag, body):
+    global _cache_bytes
+    with _lock:
+        old = _cache.pop(ref, None)
+        if old is not None:
+            _cache_bytes -= len(old[1])
+        if etag is None or body is None or len(body) > S3_CACHE_MAX_BYTES:
+            return
+        _cache[ref] = (etag, body)
+        _cache_bytes += len(body)
+        while _cache_bytes > S3_CACHE_MAX_BYTES:
+            _, (_, evicted) = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def _cache_drop(ref):
+    _cache_put(ref, None, None)
+
+
+def begin_invocation():
+    """Zera os contadores e passa a bufferizar leituras e escritas."""
+    global _session
+    with _lock:
+        _session = _Session()
+        _reset_counters()
+
+
+def prefetch(bucket: str, keys: Iterable[str]):
+    """
+    Baixa em paralelo os objetos ainda não conhecidos na invocação.
+
+    Falhas não são guardadas: a leitura posterior vai ao backend e
+    propaga o erro normalmente.
+    """
+    with _lock:
+        if _session is None:
+            return
+        pending = [key for key in dict.fromkeys(keys) if (bucket, key) not in _session.objects]
+    if not pending:
+        return
+
+    def fetch(key):
+        try:
+            return key, _backend_read(bucket, key), None
+        except Exception as e:
+            return key, (None, None), e
+
+    with ThreadPoolExecutor(max_workers=min(S3_MAX_WORKERS, len(pending))) as pool:
+        results = list(pool.map(fetch, pending))
+
+    with _lock:
+        if _session is None:
+            return
+        for key, (body, etag), error in results:
+            if error is None:
+                _session.remember((bucket, key), body, etag)
+
+
+def read_object(bucket: str, key: str) -> Optional[bytes]:
+    """Lê um objeto como bytes. Retorna None se não existir."""
+    with _lock:
+        if _session is not None and (bucket, key) in _session.objects:
+            return _session.objects[(bucket, key)]
+
+    body, etag = _backend_read(bucket, key)
+
+    with _lock:
+        if _session is not None:
+            return _session.remember((bucket, key), body, etag)
+    return body
+
+
+def write_object(
+    bucket: str,
+    key: str,
+    body,
+    content_type: str = "application/json",
+    merge: Optional[Callable[[Optional[bytes], bytes, Optional[bytes]], bytes]] = None
+):
+    """
+    Grava um objeto (no fim da invocação, se houver uma em andamento).
+
+    Args:
+        merge: merge(base, nosso, deles) -> bytes, chamado se outra execução
+            gravou o objeto depois da nossa leitura. base/deles são None se o
+            objeto não existia.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    with _lock:
+        if _session is not None:
+            ref = (bucket, key)
+            if ref not in _session.dirty and ref not in _session.deleted and _session.objects.get(ref) == body:
+                _counters['skipped_writes'] += 1
+                return
+            _session.objects[ref] = body
+            _session.dirty[ref] = (body, content_type, merge)
+            _session.deleted.discard(ref)
+            return
+
+    _backend_write(bucket, key, body, content_type)
+
+
+def delete_object(bucket: str, key: str):
+    """Apaga um objeto (no fim da invocação, se houver uma em andamento)."""
+    with _lock:
+        if _session is not None:
+            ref = (bucket, key)
+            _session.objects[ref] = None
+            _session.dirty.pop(ref, None)
+            _session.deleted.add(ref)
+            return
+
+    _backend_delete(bucket, key)
+
+
+def list_keys(bucket: str, prefix: str) -> List[str]:
+    """Lista as chaves com o prefixo, já considerando escritas e deleções pendentes."""
+    keys = _backend_list(bucket, prefix)
+
+    with _lock:
+        if _session is None:
+            return keys
+        pending = {key for (b, key) in _session.dirty if b == bucket and key.startswith(prefix)}
+        deleted = {key for (b, key) in _session.deleted if b == bucket}
+    return sorted((set(keys) | pending) - deleted)
+
+
+def flush() -> Dict:
+    """
+    Grava em paralelo os objetos sujos e encerra a invocação.
+
+    Erros de gravação vão para o log e são contados; os demais objetos são
+    gravados mesmo assim.
+
+    Returns:
+        Contadores da invocação
+    """
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is None:
+        return get_counters()
+
+    tasks = [(_commit, bucket, key, body, content_type, merge, session.base.get((bucket, key)))
+             for (bucket, key), (body, content_type, merge) in session.dirty.items()]
+    tasks += [(_backend_delete, bucket, key) for bucket, key in session.deleted]
+
+    def run(task):
+        fn, args = task[0], task[1:]
+        try:
+            fn(*args)
+        except Exception as e:
+            _count('errors')
+            logger.warning("⚠️  Erro ao gravar {}: {}", args[1], e)
+
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(S3_MAX_WORKERS, len(tasks))) as pool:
+            list(pool.map(run, tasks))
+
+    return get_counters()
+
+
+def _commit(bucket, key, body, content_type, merge, base):
+    """
+    Grava condicionado à versão lida (base = (corpo, etag)); em conflito,
+    relê, junta com merge e tenta de novo até S3_WRITE_RETRIES vezes.
+    Objetos que não foram lidos na invocação são gravados sem condição.
+    """
+    if base is None:
+        _backend_write(bucket, key, body, content_type)
+        return
+
+    base_body, etag = base
+    expected = etag if base_body is not None else ABSENT
+    for _ in range(S3_WRITE_RETRIES + 1):
+        try:
+            _backend_write(bucket, key, body, content_type, expected=expected)
+            return
+        except WriteConflict:
+            _count('conflicts')
+            theirs, their_etag = _backend_read(bucket, key)
+            if merge is not None:
+                body = merge(base_body, body, theirs)
+            base_body = theirs
+            expected = their_etag if theirs is not None else ABSENT
+
+    raise WriteConflict(f"{key} mudou {S3_WRITE_RETRIES + 1} vezes durante a gravação")
+
+
+def _backend_read(bucket, key):
+    """Lê do backend, revalidando o cache do container. Retorna (corpo, etag)."""
+    ref = (bucket, key)
+    cached = _cache_get(ref)
+
+    if not ENABLE_S3:
+        local_file = LOCAL_DATA_DIR / key
+        try:
+            etag = _local_etag(local_file)
+        except FileNotFoundError:
+            _count('get')
+            _cache_drop(ref)
+            return None, None
+        if cached is not None and cached[0] == etag:
+            _count('get')
+            _count('cache_hits')
+            return cached[1], etag
+        body = local_file.read_bytes()
+    else:
+        client = _client()
+        try:
+            if cached is not None:
+                obj = client.get_object(Bucket=bucket, Key=key, IfNoneMatch=cached[0])
+            else:
+                obj = client.get_object(Bucket=bucket, Key=key)
+            body = obj['Body'].read()
+            etag = obj.get('ETag')
+        except client.exceptions.NoSuchKey:
+            _count('get')
+            _cache_drop(ref)
+            return None, None
+        except client.exceptions.ClientError as e:
+            if cached is None or not _is_not_modified(e):
+                raise
+            _count('get')
+            _count('cache_hits')
+            return cached[1], cached[0]
+
+    _count('get')
+    _count('bytes_read', len(body))
+    _count('cache_misses')
+    _cache_put(ref, etag, body)
+    return body, etag
+
+
+def _backend_write(bucket, key, body, content_type, expected=None):
+    """
+    Grava o objeto. expected: None (sem condição), ABSENT (não pode existir)
+    ou o ETag que o objeto precisa ter.
+
+    Raises:
+        WriteConflict: Se a condição falhar
+    """
+    if not ENABLE_S3:
+        etag = _local_write(LOCAL_DATA_DIR / key, body, expected)
+    else:
+        conditions = {}
+        if expected == ABSENT:
+            conditions['IfNoneMatch'] = ABSENT
+        elif expected is not None:
+            conditions['IfMatch'] = expected
+        client = _client()
+        try:
+            response = _put_object(client, bucket, key, body, content_type, conditions)
+        except client.exceptions.ClientError as e:
+            if conditions and _is_conflict(e):
+                raise WriteConflict(key) from e
+            raise
+        etag = response.get('ETag')
+
+    _cache_put((bucket, key), etag, body)
+    _count('put')
+    _count('bytes_written', len(body))
+
+
+def _put_object(client, bucket, key, body, content_type, conditions):
+    """
+    PutObject com as condições, ou sem elas se o botocore instalado não
+    conhece IfMatch/IfNoneMatch (detectado uma vez, com um erro no log).
+    """
+    global _conditional_puts
+    if conditions and _conditional_puts:
+        from botocore.exceptions import ParamValidationError
+        try:
+            return client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type, **conditions)
+        except ParamValidationError as e:
+            if not any(name in str(e) for name in conditions):
+                raise
+            with _lock:
+                warn, _conditional_puts = _conditional_puts, False
+            if warn:
+                logger.error("❌ botocore sem PutObject condicional, gravando sem If-Match: "
+                             "execuções concorrentes podem sobrescrever umas às outras (atualize boto3): {}", e)
+    return client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type)
+
+
+def _local_write(path, body, expected):
+    """Confere a versão e troca o arquivo por rename atômico, sob lock."""
+    with _local_write_guard():
+        if expected is not None:
+            try:
+                current = _local_etag(path)
+            except FileNotFoundError:
+                current = ABSENT
+            if current != expected:
+                raise WriteConflict(str(path))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = LOCAL_DATA_DIR / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp = tmp_dir / os.urandom(8).hex()
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        return _local_etag(path)
+
+
+@contextmanager
+def _local_write_guard():
+    """Serializa escritas locais entre threads e, com fcntl, entre processos."""
+    with _local_write_lock:
+        if fcntl is None:
+            yield
+            return
+        LOCAL_DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with open(LOCAL_DATA_DIR / ".storage.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _backend_delete(bucket, key):
+    if not ENABLE_S3:
+        (LOCAL_DATA_DIR / key).unlink(missing_ok=True)
+    else:
+        _client().delete_object(Bucket=bucket, Key=key)
+    _cache_drop((bucket, key))
+    _count('delete')
+
+
+def _client():
+    """Cliente S3 compartilhado (pool de S3_MAX_WORKERS conexões), criado no primeiro uso."""
+    global s3
+    if s3 is None:
+        with _client_lock:
+            if s3 is None:
+                import boto3
+                from botocore.config import Config
+                s3 = boto3.client("s3", config=Config(max_pool_connections=S3_MAX_WORKERS))
+    return s3
+
+
+def _local_etag(path):
+    stat = path.stat()
+    return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _is_conflict(error):
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    code = error.response.get('Error', {}).get('Code')
+    return status in (409, 412) or code in ('PreconditionFailed', 'ConditionalRequestConflict', 'NoSuchKey')
+
+
+def _is_not_modified(error):
+    status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    code = error.response.get('Error', {}).get('Code')
+    return status == 304 or code in ('304', 'NotModified')
+
+
+def _backend_list(bucket, prefix):
+    if not ENABLE_S3:
+        directory = LOCAL_DATA_DIR / prefix
+        if not directory.is_dir():
+            return []
+        return [f"{prefix}{path.name}" for path in sorted(directory.iterdir())]
+
+    keys = []
+    paginator = _client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []))
+    return keys
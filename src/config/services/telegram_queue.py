@@ -0,0 +1,232 @@
+"""
+Fila de envio de alertas para o Telegram.
+
+Os alertas de um símbolo no tick são juntados em uma mensagem (ou os de
+todos os símbolos, com TELEGRAM_COALESCE=tick; 'none' mantém um por
+mensagem), em partes de até 4096 caracteres, o limite do Telegram.
+
+Uma thread envia as mensagens na ordem em que entraram, passando por um
+token bucket (limite por chat) e respeitando o retry_after das respostas
+429. O bucket é do container, então vale também entre invocações quentes.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.config.services.rate_limiter import TokenBucket
+from src.config.services import logger
+from src.config.services.telegram_service import RetryAfter
+
+TELEGRAM_COALESCE = os.getenv("TELEGRAM_COALESCE", "symbol")
+TELEGRAM_RATE_PER_SEC = float(os.getenv("TELEGRAM_RATE_PER_SEC", "1"))
+TELEGRAM_BURST = int(os.getenv("TELEGRAM_BURST", "3"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_DRAIN_TIMEOUT = float(os.getenv("TELEGRAM_DRAIN_TIMEOUT", "30"))
+
+MAX_MESSAGE_CHARS = 4096
+COALESCE_MODES = ('symbol', 'tick', 'none')
+
+SYMBOL_SEPARATOR = "\n\n"
+TICK_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+_limiter = TokenBucket(TELEGRAM_RATE_PER_SEC, TELEGRAM_BURST)
+
+
+class NotificationQueue:
+    """Junta os alertas do tick e os envia em segundo plano."""
+
+    def __init__(
+        self,
+        send: Callable[[str], None],
+        coalesce: str = TELEGRAM_COALESCE,
+        limiter: Optional[TokenBucket] = None,
+        max_retries: int = TELEGRAM_MAX_RETRIES,
+        max_chars: int = MAX_MESSAGE_CHARS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if coalesce not in COALESCE_MODES:
+            raise ValueError(f"Modo de agrupamento desconhecido: {coalesce}")
+        self._send = send
+        self._coalesce = coalesce
+        self._limiter = limiter or _limiter
+        self._max_retries = max_retries
+        self._max_chars = max_chars
+        self._clock = clock
+
+        self._pending = queue.Queue()
+        self._worker = None
+        self._stopped = False
+        self._tick = []
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._counters = {
+            'alerts': 0,
+            'messages': 0,
+            'sent': 0,
+            'dropped': 0,
+            'retries': 0,
+            'throttled_s': 0.0
+        }
+
+    def submit(self, symbol: str, texts: List[str]):
+        """Enfileira os alertas de um símbolo no tick (na ordem de envio)."""
+        if not texts:
+            return
+        with self._lock:
+            self._counters['alerts'] += len(texts)
+        if self._coalesce == 'tick':
+            self._tick.extend(texts)
+        elif self._coalesce == 'symbol':
+            self._enqueue(coalesce_messages(texts, SYMBOL_SEPARATOR, self._max_chars))
+        else:
+            for text in texts:
+                self._enqueue(split_message(text, self._max_chars))
+
+    def end_tick(self):
+        """Enfileira os alertas juntados no tick (TELEGRAM_COALESCE=tick); a fila segue aberta."""
+        if self._tick:
+            self._enqueue(coalesce_messages(self._tick, TICK_SEPARATOR, self._max_chars))
+            self._tick = []
+
+    def close(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Envia o que falta e espera a fila esvaziar (até timeout segundos).
+
+        O timeout padrão é TELEGRAM_DRAIN_TIMEOUT mais o tempo que o limite
+        de taxa exige para as mensagens ainda na fila (a 1 msg/s, 40
+        símbolos com alerta precisam de ~40s só de espera por token).
+        Mensagens ainda não enviadas no timeout são descartadas.
+
+        Returns:
+            Contadores (ver counters())
+        """
+        self.end_tick()
+        if timeout is None:
+            timeout = TELEGRAM_DRAIN_TIMEOUT + self._throttle_budget()
+
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join(timeout)
+            if self._worker.is_alive():
+                with self._lock:
+                    self._stopped = True
+                    late = self._counters['messages'] - self._counters['sent'] - self._counters['dropped']
+                    self._counters['dropped'] += late
+                logger.warning("⚠️  Telegram: {} mensagens descartadas (fila não esvaziou em {:.0f}s)", late, timeout)
+        return self.counters()
+
+    def counters(self) -> Dict:
+        """alerts, messages, sent, dropped, retries, throttled_s e latência (ms) p50/p95/máx."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+        counters['latency_p50_ms'] = _percentile(latencies, 50) * 1000
+        counters['latency_p95_ms'] = _percentile(latencies, 95) * 1000
+        counters['latency_max_ms'] = (latencies[-1] if latencies else 0.0) * 1000
+        return counters
+
+    def _throttle_budget(self) -> float:
+        """Segundos que o token bucket leva para liberar as mensagens pendentes."""
+        rate = getattr(self._limiter, 'rate', 0)
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            pending = self._counters['messages'] - self._counters['sent'] - self._counters['dropped']
+        return pending / rate
+
+    def _enqueue(self, messages):
+        now = self._clock()
+        with self._lock:
+            self._counters['messages'] += len(messages)
+        for text in messages:
+            self._pending.put((now, text))
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="telegram-queue", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            if self._stopped:
+                continue
+            enqueued_at, text = item
+            self._deliver(enqueued_at, text)
+
+    def _deliver(self, enqueued_at, text):
+        for attempt in range(self._max_retries + 1):
+            waited = self._limiter.acquire()
+            try:
+                self._send(text)
+            except RetryAfter as e:
+                self._limiter.pause(e.seconds)
+                with self._lock:
+                    self._counters['retries'] += 1
+                    self._counters['throttled_s'] += waited
+                logger.info("⏳ Telegram pediu {:.0f}s de espera (tentativa {})", e.seconds, attempt + 1)
+                continue
+            except Exception as e:
+                logger.warning("⚠️ Erro ao enviar alerta: {}", e)
+                break
+            with self._lock:
+                if self._stopped:
+                    return
+                self._counters['sent'] += 1
+                self._counters['throttled_s'] += waited
+                self._latencies.append(self._clock() - enqueued_at)
+            return
+
+        with self._lock:
+            if not self._stopped:
+                self._counters['dropped'] += 1
+
+
+def coalesce_messages(texts: List[str], separator: str, max_chars: int = MAX_MESSAGE_CHARS) -> List[str]:
+    """Junta os textos em mensagens de até max_chars, sem cortar um alerta se ele couber inteiro."""
+    messages = []
+    current = None
+    for text in texts:
+        for part in split_message(text, max_chars):
+            if current is not None and len(current) + len(separator) + len(part) <= max_chars:
+                current += separator + part
+                continue
+            if current is not None:
+                messages.append(current)
+            current = part
+    if current is not None:
+        messages.append(current)
+    return messages
+
+
+def split_message(text: str, max_chars: int = MAX_MESSAGE_CHARS) -> List[str]:
+    """Quebra um texto maior que max_chars em fins de linha (ou no limite, se a linha não couber)."""
+    if len(text) <= max_chars:
+        return [text]
+
+    parts = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + 1 + len(line) > max_chars:
+            parts.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
@@ -1,20 +1,41 @@
-import urllib.parse
-import urllib.request
 import os
+from src.config.services import http_client, metrics
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+
+class RetryAfter(Exception):
+    """O Telegram recusou a mensagem por limite de taxa (HTTP 429)."""
+
+    def __init__(self, seconds):
+        super().__init__(f"limite de taxa do Telegram, tentar de novo em {seconds}s")
+        self.seconds = seconds
+
 
 def send_message(bot_token, chat_id, text):
+    """
+    Envia uma mensagem (Markdown) para o chat.
+
+    Raises:
+        RetryAfter: Se o Telegram responder 429; seconds vem de retry_after
+    """
     if not bot_token or os.getenv("LOCAL_MODE", "false").lower() == "true":
         print(f"[TELEGRAM] Para: {chat_id}")
         print(f"[TELEGRAM] Mensagem: {text}")
         return
-    
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
     data = {
         "chat_id": chat_id,
         "text": text,
         "parse_mode": "Markdown"
     }
-    body = urllib.parse.urlencode(data).encode("utf-8")
-    req = urllib.request.Request(url, data=body)
-    with urllib.request.urlopen(req, timeout=10):
-        pass
+    try:
+        with metrics.timer('telegram_send'):
+            http_client.post(url, data=data)
+    except Exception as e:
+        response = getattr(e, 'response', None)
+        if response is not None and response.status_code == 429:
+            raise RetryAfter(http_client.retry_after(response)) from e
+        raise
+
@@ -0,0 +1,75 @@
+"""
+Cache LRU persistido em arquivo JSON, para sobreviver entre invocações
+quentes da Lambda (/tmp) e entre execuções locais.
+
+Cada entrada guarda o valor e o instante em que foi gravada; quem lê decide
+a validade pela idade (get(key, max_age)), então a mesma entrada pode ser
+"fresca" para um uso e servir de dado antigo (stale) para outro.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from src.config.services import logger
+
+
+class TTLCache:
+    """LRU de até max_entries entradas (chave str, valor serializável em JSON)."""
+
+    def __init__(self, path: Path, max_entries: int = 256, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Retorna (valor, idade em segundos) ou None se ausente ou mais velho que max_age.
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            age = max(self._clock() - entry['ts'], 0.0)
+            if max_age is not None and age > max_age:
+                return None
+            entries.move_to_end(key)
+            return entry['value'], age
+
+    def put(self, key: str, value: Any):
+        """Grava a entrada (agora) e persiste o arquivo, descartando as menos usadas."""
+        with self._lock:
+            entries = self._load()
+            entries[key] = {'value': value, 'ts': self._clock()}
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._save(entries)
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = OrderedDict()
+            try:
+                stored = json.loads(self.path.read_text())
+                for key, entry in stored.items():
+                    self._entries[key] = entry
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning("⚠️  Cache {} ilegível, recomeçando: {}", self.path, e)
+        return self._entries
+
+    def _save(self, entries):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entries))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning("⚠️  Erro ao gravar cache {}: {}", self.path, e)
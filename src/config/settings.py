@@ -28,6 +28,18 @@ SIDEWAYS_MIN_DURATION = int(os.environ.get("SIDEWAYS_MIN_DURATION", "30"))
 SIDEWAYS_ALERT_INTERVAL = int(os.environ.get("SIDEWAYS_ALERT_INTERVAL", "120")) 
 BREAKOUT_MIN_PCT = float(os.environ.get("BREAKOUT_MIN_PCT", "1.0")) 
 
+MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", "1"))
+
+# Horas extras carregadas além de MOVING_AVERAGE_HOURS para os acumuladores
+# de média/desvio removerem as amostras que saíram da janela desde a última execução.
+ROLLING_SLACK_HOURS = float(os.environ.get("ROLLING_SLACK_HOURS", "1"))
+
+# "python" (statistics.py) ou "numpy" (vetorizado; requer numpy instalado)
+INDICATOR_ENGINE = os.environ.get("INDICATOR_ENGINE", "python")
+
+# Períodos do RSI de Wilder mantidos no estado; o 14 alimenta o pump score
+RSI_PERIODS = [int(p) for p in os.environ.get("RSI_PERIODS", "6,14,24").split(",") if p.strip()]
+
 def parse_alerts(raw: str):
     if not raw:
         return {}
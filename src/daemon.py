@@ -0,0 +1,48 @@
+"""
+Monitor em modo daemon (processo contínuo, fora da Lambda).
+
+Uso:
+    python src/daemon.py
+    python src/daemon.py --interval 10 --checkpoint-interval 30
+
+SIGTERM ou Ctrl+C encerram com um último checkpoint (ver
+src/handlers/price_daemon.py).
+"""
+import argparse
+import signal
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if __name__ == "__main__":
+    env_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
+    if os.path.exists(env_file):
+        print("📋 Carregando .env...")
+        with open(env_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    os.environ[key] = value
+    else:
+        print("⚠️  Arquivo .env não encontrado!")
+
+from src.handlers.price_daemon import PriceDaemon, DAEMON_INTERVAL_SECONDS, DAEMON_CHECKPOINT_SECONDS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor de criptomoedas em modo daemon")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL_SECONDS,
+                        help="Segundos entre amostras do mercado (default: %(default)s)")
+    parser.add_argument("--checkpoint-interval", type=float, default=DAEMON_CHECKPOINT_SECONDS,
+                        help="Segundos entre checkpoints no storage (default: %(default)s)")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    print("🚀 Iniciando monitor de criptomoedas (daemon)...")
+    PriceDaemon(interval=args.interval, checkpoint_interval=args.checkpoint_interval).run(stop)
+    print("👋 Daemon encerrado")
@@ -0,0 +1,247 @@
+"""
+Modo daemon: processo contínuo que amostra o mercado a cada poucos segundos.
+
+O lambda_handler reconstrói o estado de todos os símbolos a partir do
+storage a cada 5 minutos. Aqui o estado (último preço, recordes, alertas,
+acumuladores incrementais) e a janela de histórico de cada símbolo são
+restaurados do storage uma vez, na partida, e ficam em memória:
+
+- a cada DAEMON_INTERVAL_SECONDS, um snapshot de mercado é avaliado com o
+  mesmo evaluate_symbol do handler (mesmos alertas, cooldowns e indicadores);
+- uma thread grava um checkpoint a cada DAEMON_CHECKPOINT_SECONDS: as
+  amostras novas vão para os segmentos do dia (append_prices_to_history) e
+  o estado de cada símbolo para state/{symbol}.json, no mesmo formato do
+  handler, então a Lambda ou outro daemon continuam de onde este parou;
+- ao receber stop (SIGTERM/SIGINT em src/daemon.py), o tick em andamento
+  termina, é gravado um último checkpoint e a fila do Telegram é esvaziada.
+
+O daemon deve ser o único a gravar os símbolos: com o cron da Lambda ativo
+ao mesmo tempo, as gravações são juntadas (merge_symbol_state), mas o estado
+em memória não vê o que a outra execução gravou.
+"""
+import copy
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.config.settings import SYMBOLS, S3_BUCKET, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ALERT_STRATEGY, MAX_CONCURRENCY
+from src.config.services.binance_service import get_market_snapshot
+from src.config.services.s3_service import (
+    append_prices_to_history, get_price_window, prefetch_symbols,
+    load_symbol_state, save_symbol_state
+)
+from src.config.services import storage, circuit_breaker, metrics, logger
+from src.config.services.telegram_service import send_message
+from src.config.services.telegram_queue import NotificationQueue
+from src.handlers.symbol_runner import run_per_symbol
+from src.handlers.price_monitor import evaluate_symbol, history_hours
+
+DAEMON_INTERVAL_SECONDS = float(os.getenv("DAEMON_INTERVAL_SECONDS", "15"))
+DAEMON_CHECKPOINT_SECONDS = float(os.getenv("DAEMON_CHECKPOINT_SECONDS", "60"))
+
+# Menor lote de amostras vencidas removido de uma vez da janela em memória
+TRIM_MIN_BATCH = 64
+
+
+class PriceDaemon:
+    """Estado em memória dos símbolos, ticks de mercado e checkpoints em segundo plano."""
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        interval: float = DAEMON_INTERVAL_SECONDS,
+        checkpoint_interval: float = DAEMON_CHECKPOINT_SECONDS,
+        notifications: Optional[NotificationQueue] = None
+    ):
+        self.symbols = list(SYMBOLS if symbols is None else symbols)
+        self.interval = interval
+        self.checkpoint_interval = checkpoint_interval
+        self.notifications = notifications or NotificationQueue(
+            lambda text: send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, text)
+        )
+        self.ticks = 0
+
+        # {symbol: {'state', 'window', 'pending' [(price, volume, ts)], 'missing'}}
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._outage = False
+
+    def restore(self, now: Optional[float] = None):
+        """Carrega do storage o estado e a janela de histórico de cada símbolo."""
+        now = time.time() if now is None else now
+        hours = history_hours()
+        started = time.perf_counter()
+
+        storage.begin_invocation()
+        prefetch_symbols(S3_BUCKET, self.symbols, hours=hours, now=now)
+        for symbol in self.symbols:
+            window = None
+            if ALERT_STRATEGY in ['moving_average', 'both']:
+                window = get_price_window(S3_BUCKET, symbol, hours=hours, now=now)
+            self._entries[symbol] = {
+                'state': load_symbol_state(S3_BUCKET, symbol),
+                'window': window,
+                'pending': [],
+                'missing': False
+            }
+        # Migrações de formato antigo lidas acima são gravadas já aqui
+        storage.flush()
+
+        logger.info("♻️  Estado de {} símbolos restaurado em {:.1f}s", len(self.symbols), time.perf_counter() - started)
+
+    def tick(self, ts: Optional[float] = None) -> List:
+        """
+        Busca o mercado e avalia todos os símbolos com o estado em memória.
+
+        Returns:
+            Lista de (symbol, resultado), como run_per_symbol
+        """
+        ts = time.time() if ts is None else ts
+        with metrics.timer('market'):
+            snapshot = get_market_snapshot(self.symbols)
+
+        # Sem nenhum provedor, um aviso quando a falha começa (não a cada tick)
+        outage = bool(self.symbols) and not snapshot
+        if outage and not self._outage:
+            logger.error("❌ Nenhum provedor de mercado respondeu ({})", circuit_breaker.states())
+            self.notifications.submit('*', [f"⚠️ Sem dados de mercado para {len(self.symbols)} símbolos: provedores indisponíveis"])
+        elif self._outage and not outage:
+            logger.info("✅ Dados de mercado de volta")
+        self._outage = outage
+
+        with self._lock:
+            results = run_per_symbol(
+                self.symbols,
+                lambda symbol, notify: self._process_symbol(symbol, snapshot.get(symbol), ts, notify, report_errors=not outage),
+                send=self.notifications.submit,
+                max_workers=MAX_CONCURRENCY
+            )
+        self.notifications.end_tick()
+        self.ticks += 1
+        metrics.count('ticks')
+        return results
+
+    def checkpoint(self) -> Dict:
+        """
+        Grava as amostras acumuladas e o estado dos símbolos que mudaram.
+
+        O estado é copiado sob o lock (o tick espera só a cópia); a gravação
+        roda fora dele. Se alguma gravação falhar, as amostras voltam para
+        a fila do próximo checkpoint.
+
+        Returns:
+            Contadores do storage (ver storage.flush)
+        """
+        with self._lock:
+            batch = {}
+            for symbol, entry in self._entries.items():
+                if entry['pending']:
+                    batch[symbol] = (entry['pending'], copy.deepcopy(entry['state']))
+                    entry['pending'] = []
+        if not batch:
+            return {}
+
+        with metrics.timer('checkpoint'):
+            storage.begin_invocation()
+            now = max(samples[-1][2] for samples, _ in batch.values())
+            prefetch_symbols(S3_BUCKET, list(batch), now=now)
+            failed = []
+            for symbol, (samples, state) in batch.items():
+                try:
+                    append_prices_to_history(S3_BUCKET, symbol, samples)
+                    save_symbol_state(S3_BUCKET, symbol, state)
+                except Exception as e:
+                    logger.warning("⚠️  Erro no checkpoint de {}: {}", symbol, e)
+                    failed.append(symbol)
+            counters = storage.flush()
+
+        retry = list(batch) if counters['errors'] else failed
+        if retry:
+            with self._lock:
+                for symbol in retry:
+                    entry = self._entries[symbol]
+                    entry['pending'] = batch[symbol][0] + entry['pending']
+
+        logger.debug("💾 Checkpoint: {0} símbolos, {1[put]} PUTs, {1[errors]} erros", len(batch), counters)
+        for name in ('get', 'put', 'bytes_written', 'errors'):
+            metrics.count(f's3_{name}', counters.get(name, 0))
+        return counters
+
+    def run(self, stop: threading.Event):
+        """
+        Roda até stop ser acionado: restaura, amostra a cada interval segundos
+        e grava checkpoints em segundo plano; no fim, um último checkpoint.
+        """
+        self.restore()
+        metrics.begin_invocation()
+        checkpointer = threading.Thread(target=self._checkpoint_loop, args=(stop,), name="daemon-checkpoint", daemon=True)
+        checkpointer.start()
+        logger.info("🚀 Daemon: {} símbolos a cada {:.0f}s, checkpoint a cada {:.0f}s",
+                    len(self.symbols), self.interval, self.checkpoint_interval)
+
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                try:
+                    self.tick()
+                except Exception as e:
+                    logger.error("❌ Erro no tick: {}", e)
+                stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            stop.set()
+            checkpointer.join()
+            self.checkpoint()
+            telegram = self.notifications.close()
+            metrics.emit()
+            logger.event('shutdown', ticks=self.ticks,
+                         telegram={name: telegram[name] for name in ('alerts', 'sent', 'dropped')})
+
+    def _checkpoint_loop(self, stop: threading.Event):
+        while not stop.wait(self.checkpoint_interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                logger.error("❌ Erro no checkpoint: {}", e)
+            # Uma linha EMF por intervalo de checkpoint (ticks + gravação)
+            metrics.emit()
+            metrics.begin_invocation()
+
+    def _process_symbol(self, symbol, data, ts, notify, report_errors=True):
+        """
+        Um tick de um símbolo: acrescenta a amostra à janela em memória e
+        roda evaluate_symbol. Sem I/O: o estado vai para o storage no checkpoint.
+
+        O evento 'symbol' do log sai no nível INFO só quando há alerta ou
+        erro (o daemon amostra bem mais vezes que o cron); os demais, no DEBUG.
+        """
+        entry = self._entries[symbol]
+        with metrics.symbol_scope(symbol), metrics.timer('symbol'), logger.context(symbol=symbol):
+            if not data:
+                if report_errors and not entry['missing']:
+                    notify(f"⚠️ Erro ao buscar {symbol}: Nenhum dado de mercado para {symbol}", 'error')
+                entry['missing'] = True
+                logger.event('symbol', level=logger.WARNING, result='error', error="sem dados de mercado")
+                return 'error'
+            entry['missing'] = False
+            price, volume = data['price'], data['volume']
+
+            window = entry['window']
+            if window is not None:
+                window.append(price, volume, ts)
+                # Recorte em lotes: até 1/8 da janela de amostras vencidas
+                # fica no início (os indicadores recortam pelo horário)
+                window.drop_before(ts - history_hours() * 3600, min_batch=max(TRIM_MIN_BATCH, len(window) // 8))
+            entry['pending'].append((price, volume, ts))
+
+            summary = {'price': price, 'volume': volume}
+            alerts = []
+
+            def track(text, kind=None):
+                alerts.append(kind)
+                notify(text, kind)
+
+            result = evaluate_symbol(symbol, price, volume, ts, entry['state'], window, track, summary=summary)
+            logger.event('symbol', level=logger.INFO if alerts else logger.DEBUG,
+                         result=result, alerts=alerts, **summary)
+            return result
@@ -3,363 +3,537 @@ from src.config.settings import (
     SYMBOLS, S3_BUCKET, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, 
     VARIATION_DICT, ALERT_STRATEGY, MOVING_AVERAGE_HOURS, STDDEV_THRESHOLD,
     MIN_VOLUME_Z, ALERT_COOLDOWN_MINUTES, EXTREME_THRESHOLD,
-    SIDEWAYS_THRESHOLD, SIDEWAYS_MIN_DURATION, SIDEWAYS_ALERT_INTERVAL, BREAKOUT_MIN_PCT
+    SIDEWAYS_THRESHOLD, SIDEWAYS_MIN_DURATION, SIDEWAYS_ALERT_INTERVAL, BREAKOUT_MIN_PCT,
+    MAX_CONCURRENCY, ROLLING_SLACK_HOURS, INDICATOR_ENGINE, RSI_PERIODS
 )
-from src.config.services.binance_service import get_price_and_volume
+from src.config.services.binance_service import get_market_snapshot
 from src.config.services.s3_service import (
-    save_price_to_history, get_last_price, get_price_history, 
-    get_stats, save_stats
+    save_price_to_history, get_price_window, prefetch_symbols,
+    load_symbol_state, save_symbol_state
 )
+from src.config.services import storage, circuit_breaker, metrics, logger
 from src.config.services.telegram_service import send_message
+from src.config.services.telegram_queue import NotificationQueue
+from src.handlers.symbol_runner import run_per_symbol
 from src.config.services.statistics import (
-    get_price_statistics, get_volume_statistics, check_anomaly, 
+    check_anomaly, 
     evaluate_combined_anomaly, update_records, filter_recent_history,
-    calculate_trend_score, check_record_recency, detect_higher_lows, calculate_momentum,
-    detect_sideways_movement, detect_breakout,
-    calculate_rsi, calculate_vwap
+    check_record_recency, detect_breakout
 )
-from src.config.services.alert_state import get_alert_state, save_alert_state
+from src.config.services.indicator_engine import compute_indicators
+from src.config.services.incremental import RollingWindowStats, WilderRSI, WindowExtremes
 from src.config.services.sentiment_service import get_sentiment_data, calculate_pump_score
-from src.config.coin_mappings import get_coingecko_id
-import urllib.request
-import json
-
 
+# Parâmetros das estratégias de alerta (settings.py); o replay roda
+# evaluate_symbol com variações deste dict
+ALERT_PARAMS = {
+    'VARIATION_DICT': VARIATION_DICT,
+    'ALERT_STRATEGY': ALERT_STRATEGY,
+    'MOVING_AVERAGE_HOURS': MOVING_AVERAGE_HOURS,
+    'ROLLING_SLACK_HOURS': ROLLING_SLACK_HOURS,
+    'MIN_VOLUME_Z': MIN_VOLUME_Z,
+    'EXTREME_THRESHOLD': EXTREME_THRESHOLD,
+    'ALERT_COOLDOWN_MINUTES': ALERT_COOLDOWN_MINUTES,
+    'SIDEWAYS_THRESHOLD': SIDEWAYS_THRESHOLD,
+    'SIDEWAYS_MIN_DURATION': SIDEWAYS_MIN_DURATION,
+    'SIDEWAYS_ALERT_INTERVAL': SIDEWAYS_ALERT_INTERVAL,
+    'BREAKOUT_MIN_PCT': BREAKOUT_MIN_PCT,
+    'INDICATOR_ENGINE': INDICATOR_ENGINE,
+    'RSI_PERIODS': RSI_PERIODS
+}
 
 
 def lambda_handler(event, context):
     ts = time.time()
-    print(f"\n{'='*60}")
-    print(f"Monitor de Criptomoedas - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*60}\n")
+    metrics.begin_invocation()
+    started = metrics.clock()
+    logger.debug("Monitor de Criptomoedas - {}", time.strftime('%Y-%m-%d %H:%M:%S'))
+    logger.debug("📡 Buscando mercado de {} símbolos...", len(SYMBOLS))
+    with metrics.timer('market'):
+        snapshot = get_market_snapshot(SYMBOLS)
+
+    storage.begin_invocation()
+    with metrics.timer('prefetch'):
+        prefetch_symbols(S3_BUCKET, SYMBOLS, hours=history_hours(), now=ts)
+
+    reports = {}
+    counters = {}
+
+    def commit():
+        with metrics.timer('flush'):
+            counters.update(storage.flush())
+        logger.debug("📦 S3: {0[get]} GETs ({0[bytes_read]:,} bytes), {0[put]} PUTs ({0[bytes_written]:,} bytes), "
+                     "{0[delete]} DELETEs, {0[skipped_writes]} gravações evitadas, "
+                     "cache {0[cache_hits]} hits / {0[cache_misses]} misses, {0[conflicts]} conflitos", counters)
+        return {symbol: report['suppressed'] for symbol, report in reports.items()}
+
+    notifications = NotificationQueue(lambda text: send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, text))
+
+    # Sem nenhum provedor de mercado, um aviso só em vez de um erro por símbolo
+    outage = bool(SYMBOLS) and not snapshot
+    if outage:
+        logger.error("❌ Nenhum provedor de mercado respondeu ({})", _circuit_summary())
+        notifications.submit('*', [f"⚠️ Sem dados de mercado para {len(SYMBOLS)} símbolos: provedores indisponíveis"])
+
+    results = run_per_symbol(
+        SYMBOLS,
+        lambda symbol, notify: process_symbol(
+            symbol, snapshot.get(symbol), ts, notify, reports, report_errors=not outage
+        ),
+        send=notifications.submit,
+        max_workers=MAX_CONCURRENCY,
+        commit=commit
+    )
+
+    errors = [symbol for symbol, result in results if isinstance(result, Exception) or result == 'error']
+
+    # A espera cresce com as mensagens retidas pelo limite de taxa; o que
+    # ainda estiver na fila quando a Lambda atingir o próprio timeout se
+    # perde, então o timeout da função precisa cobrir os piores ticks
+    telegram = notifications.close()
+    if telegram['alerts']:
+        logger.debug("📨 Telegram: {0[alerts]} alertas em {0[messages]} mensagens, {0[sent]} enviadas, "
+                     "{0[dropped]} descartadas, {0[retries]} retries (429), latência p50 {0[latency_p50_ms]:.0f}ms / "
+                     "máx {0[latency_max_ms]:.0f}ms", telegram)
+
+    circuits = circuit_breaker.states()
+    if any(state != circuit_breaker.CLOSED for state in circuits.values()):
+        logger.warning("🔌 Circuitos: {}", _circuit_summary())
+
+    elapsed = metrics.clock() - started
+    metrics.record('invocation', elapsed)
+    for name in ('get', 'put', 'delete', 'bytes_read', 'bytes_written', 'cache_hits', 'conflicts'):
+        metrics.count(f's3_{name}', counters.get(name, 0))
+    for name in ('alerts', 'messages', 'sent', 'dropped', 'retries'):
+        metrics.count(f'telegram_{name}', telegram[name])
+    metrics.count('symbol_errors', len(errors))
+    metrics.emit(timestamp=ts)
+
+    logger.event(
+        'invocation',
+        symbols=len(SYMBOLS),
+        errors=errors,
+        duration_ms=round(elapsed * 1000, 1),
+        s3={name: counters.get(name, 0) for name in ('get', 'put', 'delete', 'cache_hits', 'conflicts')},
+        telegram={name: telegram[name] for name in ('alerts', 'messages', 'sent', 'dropped', 'retries')},
+        circuits=circuits
+    )
+    return {"status": "ok", "errors": errors, "storage": counters, "telegram": telegram,
+            "circuits": circuits}
+
+
+def _circuit_summary():
+    return ", ".join(f"{name} {state}" for name, state in circuit_breaker.states().items()) or "sem chamadas"
+
 
-    for symbol in SYMBOLS:
-        print(f"\n📊 Buscando preço de {symbol}...")
+def history_hours(params=None):
+    """Horas de histórico que process_symbol carrega (None se só grava o dia)."""
+    params = params or ALERT_PARAMS
+    if params['ALERT_STRATEGY'] in ['moving_average', 'both']:
+        return max(params['MOVING_AVERAGE_HOURS'], 1) + params['ROLLING_SLACK_HOURS']
+    return None
+
+
+def process_symbol(symbol, data, ts, notify, reports=None, report_errors=True):
+    """
+    Executa o pipeline completo de um símbolo (histórico, estatísticas, alertas).
+
+    O estado do símbolo (último preço, recordes, alertas e acumuladores) é
+    lido uma vez no início e gravado uma vez no fim.
+
+    Args:
+        symbol: Símbolo da moeda
+        data: Dict {'price', 'volume'} do snapshot de mercado (None se ausente)
+        ts: Timestamp da execução
+        notify: Função notify(text, kind) chamada para cada alerta do Telegram
+        reports: Dict onde guardar o relatório de save_symbol_state do símbolo
+        report_errors: Se False, a falta de dados de mercado não gera alerta
+
+    Grava um evento 'symbol' no log (nível INFO) com o resumo do tick.
+
+    Returns:
+        str: 'ok', 'sideways' (alertas pausados) ou 'error' (sem dados de mercado)
+    """
+    with metrics.symbol_scope(symbol), metrics.timer('symbol'), logger.context(symbol=symbol):
+        logger.debug("📊 Preço de {}...", symbol)
         try:
-            data = get_price_and_volume(symbol)
+            if not data:
+                raise ValueError(f"Nenhum dado de mercado para {symbol}")
             price = data['price']
             volume = data['volume']
-            print(f"   💰 Preço atual: ${price:,.2f}")
-            print(f"   📊 Volume 24h: ${volume:,.0f}")
+            logger.debug("💰 Preço atual: ${:,.2f}", price)
+            logger.debug("📊 Volume 24h: ${:,.0f}", volume)
         except Exception as e:
-            print(f"   ❌ Erro: {e}")
-            send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                         f"⚠️ Erro ao buscar {symbol}: {e}")
-            continue
+            if report_errors:
+                notify(f"⚠️ Erro ao buscar {symbol}: {e}", 'error')
+            logger.event('symbol', result='error', error=str(e))
+            return 'error'
+
+        with metrics.timer('state_read'):
+            state = load_symbol_state(S3_BUCKET, symbol)
+        window = None
+        if ALERT_STRATEGY in ['moving_average', 'both']:
+            with metrics.timer('history_read'):
+                window = get_price_window(S3_BUCKET, symbol, hours=history_hours(), now=ts)
+        with metrics.timer('history_write'):
+            save_price_to_history(S3_BUCKET, symbol, price, volume, ts, window=window)
+
+        summary = {'price': price, 'volume': volume}
+        alerts = []
+
+        def track(text, kind=None):
+            alerts.append(kind)
+            notify(text, kind)
+
+        result = evaluate_symbol(symbol, price, volume, ts, state, window, track, summary=summary)
+        with metrics.timer('state_write'):
+            report = save_symbol_state(S3_BUCKET, symbol, state)
+        if reports is not None:
+            reports[symbol] = report
+        logger.event('symbol', result=result, alerts=alerts, **summary)
+        return result
+
 
-        last_data = get_last_price(S3_BUCKET, symbol)
+def evaluate_symbol(symbol, price, volume, ts, state, window, notify, params=None, sentiment=None, summary=None, live=None):
+    """
+    Avalia as estratégias de alerta de um tick, sem I/O de storage.
+
+    ts é o relógio da avaliação (cooldowns, lateralização, recordes): o
+    handler passa o horário da execução e o replay, o de cada amostra.
+    Atualiza 'state' no lugar; quem chama grava o estado no fim.
+
+    Args:
+        window: HistoryWindow já com o tick atual (None se a estratégia não usa histórico)
+        params: Parâmetros de alerta (default: ALERT_PARAMS)
+        sentiment: Função como get_sentiment_data (default: a própria)
+        summary: Dict onde guardar os números do tick (z-scores, tendência...)
+            para o evento de log do símbolo
+        live: Dict que mantém os acumuladores (RollingWindowStats,
+            WindowExtremes, WilderRSI) como objetos entre chamadas, em vez de
+            recriá-los de state['indicators'] e serializá-los a cada tick.
+            Com ele, state['indicators'] não é atualizado: só para quem não
+            grava o estado (replay)
+    """
+    params = params or ALERT_PARAMS
+    sentiment = sentiment or get_sentiment_data
+    summary = {} if summary is None else summary
+    last_data = state['last_price']
+    state['last_price'] = {'price': price, 'timestamp': ts}
+    
+    if symbol in params['VARIATION_DICT'] and last_data:
+        variation_threshold = params['VARIATION_DICT'][symbol]
+        last_price = last_data['price']
+        variation = ((price - last_price) / last_price) * 100
         
-        save_price_to_history(S3_BUCKET, symbol, price, volume, ts)
+        summary['variation_pct'] = round(variation, 3)
+        logger.debug("📊 Variação desde última: {:+.2f}% (limite: ±{}%)", variation, variation_threshold)
         
-        if symbol in VARIATION_DICT and last_data:
-            variation_threshold = VARIATION_DICT[symbol]
-            last_price = last_data['price']
-            variation = ((price - last_price) / last_price) * 100
-            
-            print(f"   📊 Variação desde última: {variation:+.2f}% (limite: ±{variation_threshold}%)")
-            
-            if abs(variation) >= variation_threshold:
-                emoji = "📈" if variation > 0 else "📉"
-                direction = "subiu" if variation > 0 else "caiu"
-                print(f"   {emoji} VARIAÇÃO SIMPLES detectada!")
-                send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                             f"{emoji} *Variação {symbol}*\n"
-                             f"Preço {direction}: `{variation:+.2f}%`\n"
-                             f"De `${last_price:,.2f}` para `${price:,.2f}`")
+        if abs(variation) >= variation_threshold:
+            emoji = "📈" if variation > 0 else "📉"
+            direction = "subiu" if variation > 0 else "caiu"
+            logger.debug("{} VARIAÇÃO SIMPLES detectada!", emoji)
+            notify(f"{emoji} *Variação {symbol}*\n"
+                   f"Preço {direction}: `{variation:+.2f}%`\n"
+                   f"De `${last_price:,.2f}` para `${price:,.2f}`", 'variation')
+    
+    if params['ALERT_STRATEGY'] in ['moving_average', 'both']:
+        history = window
         
-        if ALERT_STRATEGY in ['moving_average', 'both']:
-            history = get_price_history(S3_BUCKET, symbol)
+        if len(history) >= 10:
+            recent = filter_recent_history(history, params['MOVING_AVERAGE_HOURS'])
             
-            if len(history) >= 10:
-                recent = filter_recent_history(history, MOVING_AVERAGE_HOURS)
+            if len(recent) >= 10:
+                alert_state = state['alert']
+                indicator_state = state['indicators']
                 
-                if len(recent) >= 10:
-                    price_stats = get_price_statistics(recent)
-                    volume_stats = get_volume_statistics(recent)
-                    
-                    _, price_z = check_anomaly(price, price_stats['mean'], price_stats['std_dev'], 2.0)
-                    _, volume_z = check_anomaly(volume, volume_stats['mean'], volume_stats['std_dev'], 1.5)
-                    
-                    print(f"   📈 Média preço {MOVING_AVERAGE_HOURS}h: ${price_stats['mean']:,.2f} (±${price_stats['std_dev']:,.2f})")
-                    print(f"   📊 Preço z-score: {price_z:+.2f}σ | Volume z-score: {volume_z:+.2f}σ")
-                    
-                    trend = calculate_trend_score(history, minutes=60)
-                    print(f"   📊 Tendência 1h: {trend['positive_percentage']:.0f}% positivo ({trend['trend_direction']})")
-                    
-                    stats_data = get_stats(S3_BUCKET, symbol)
-                    recency = check_record_recency(stats_data, ts, window_hours=2)
-                    
-                    pattern = detect_higher_lows(history, minutes=60)
-                    if pattern['pattern'] != 'neutral':
-                        print(f"   🔍 Padrão: {pattern['pattern']}")
-                    
-                    momentum = calculate_momentum(history, minutes=60)
-                    if momentum['strength'] != 'weak':
-                        print(f"   ⚡ Momentum: {momentum['rate_of_change']:+.2f}% ({momentum['strength']})")
+                with metrics.timer('stats'):
+                    rolling = _accumulator(live, 'rolling', lambda: RollingWindowStats.from_dict(indicator_state.get('rolling')))
+                    rolling.sync(history, params['MOVING_AVERAGE_HOURS'])
+                    if live is None:
+                        indicator_state['rolling'] = rolling.to_dict()
                     
-                    sideways = detect_sideways_movement(history, minutes=60, threshold_pct=SIDEWAYS_THRESHOLD)
-                    if sideways['is_sideways']:
-                        print(f"   ⏸️  Lateral: {sideways['volatility_pct']:.2f}% oscilação, {sideways['duration_minutes']:.0f}min")
-                    
-                    breakout = detect_breakout(
-                        current_price=price,
-                        sideways_data=sideways,
-                        volume_z=volume_z,
-                        min_breakout_pct=BREAKOUT_MIN_PCT,
-                        min_volume_z=MIN_VOLUME_Z
-                    )
-                    
-                    alert_state = get_alert_state(S3_BUCKET, symbol)
-                    
-                    current_ts = ts
-                    was_sideways = alert_state.get('was_sideways', False)
-                    sideways_start_ts = alert_state.get('sideways_start_ts', 0)
-                    last_sideways_alert_ts = alert_state.get('last_sideways_alert_ts', 0)
-                    
-                    if sideways['is_sideways'] and not was_sideways:
-                        sideways_start_ts = current_ts
-                        print(f"   🔔 Início de lateralização detectado")
-                    
-                    if was_sideways and not sideways['is_sideways']:
-                        sideways_duration = (current_ts - sideways_start_ts) / 60
-                        
-                        if breakout['is_breakout']:
-                            direction_emoji = "📈" if breakout['direction'] == 'up' else "📉"
-                            direction_text = "ALTA" if breakout['direction'] == 'up' else "BAIXA"
-                            
-                            if breakout['breakout_type'] == 'confirmed':
-                                alert_msg = (
-                                    f"{direction_emoji} *ROMPIMENTO DE {direction_text}!*\n"
-                                    f"Preço rompeu: `${price:,.2f}` ({breakout['breakout_pct']:+.1f}%)\n"
-                                    f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ) - CONFIRMADO\n"
-                                    f"Estava lateral há: {sideways_duration:.0f} minutos\n"
-                                    f"\n✅ *Ação:* ENTRADA VÁLIDA (breakout confirmado)"
-                                )
-                            else: 
-                                alert_msg = (
-                                    f"⚠️ *Rompimento SEM volume*\n"
-                                    f"Preço: `${price:,.2f}` ({breakout['breakout_pct']:+.1f}%)\n"
-                                    f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ) - FRACO\n"
-                                    f"Estava lateral há: {sideways_duration:.0f} minutos\n"
-                                    f"\n💡 *Ação:* NÃO entrar (possível bull/bear trap)"
-                                )
-                            
-                            context_lines = []
-                            if trend['trend_direction'] == 'bullish':
-                                context_lines.append(f"📈 Tendência: {trend['positive_percentage']:.0f}% alta")
-                            elif trend['trend_direction'] == 'bearish':
-                                context_lines.append(f"📉 Tendência: {trend['positive_percentage']:.0f}% baixa")
-                            
-                            if pattern['pattern'] == 'bullish_reversal':
-                                context_lines.append(f"✅ Higher lows confirmados")
-                            elif pattern['pattern'] == 'bearish_continuation':
-                                context_lines.append(f"⚠️ Lower highs confirmados")
-                            
-                            if context_lines:
-                                alert_msg += "\n\n📊 *Contexto:*\n" + "\n".join(context_lines)
-                            
-                            print(f"   🚨 BREAKOUT {direction_text}!")
-                            send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, f"{symbol}\n{alert_msg}")
-                        else:
-                            print(f"   🔄 Fim de lateralização (voltou a oscilar normalmente)")
-                        
-                        alert_state['was_sideways'] = False
-                        alert_state['sideways_start_ts'] = 0
-                        alert_state['last_sideways_alert_ts'] = 0
+                    price_stats = rolling.price_statistics()
+                    volume_stats = rolling.volume_statistics()
+                
+                _, price_z = check_anomaly(price, price_stats['mean'], price_stats['std_dev'], 2.0)
+                _, volume_z = check_anomaly(volume, volume_stats['mean'], volume_stats['std_dev'], 1.5)
+                
+                summary['price_z'] = round(price_z, 3)
+                summary['volume_z'] = round(volume_z, 3)
+                logger.debug("📈 Média preço {}h: ${:,.2f} (±${:,.2f})",
+                             params['MOVING_AVERAGE_HOURS'], price_stats['mean'], price_stats['std_dev'])
+                logger.debug("📊 Preço z-score: {:+.2f}σ | Volume z-score: {:+.2f}σ", price_z, volume_z)
+                
+                extremes = _accumulator(live, 'extremes', lambda: WindowExtremes.from_dict(indicator_state.get('extremes')))
+                rsi_state = _accumulator(live, 'rsi', lambda: WilderRSI.from_dict(indicator_state.get('rsi'), periods=params['RSI_PERIODS']))
+                indicators = compute_indicators(
+                    history,
+                    recent_hours=params['MOVING_AVERAGE_HOURS'],
+                    minutes=60,
+                    sideways_threshold_pct=params['SIDEWAYS_THRESHOLD'],
+                    engine=params['INDICATOR_ENGINE'],
+                    extremes=extremes,
+                    rsi_state=rsi_state
+                )
+                if live is None:
+                    indicator_state['extremes'] = extremes.to_dict()
+                    indicator_state['rsi'] = rsi_state.to_dict()
+                
+                trend = indicators['trend']
+                summary['trend'] = trend['trend_direction']
+                logger.debug("📊 Tendência 1h: {:.0f}% positivo ({})", trend['positive_percentage'], trend['trend_direction'])
+                
+                recency = check_record_recency(state['stats'], ts, window_hours=2)
+                
+                pattern = indicators['pattern']
+                summary['pattern'] = pattern['pattern']
+                if pattern['pattern'] != 'neutral':
+                    logger.debug("🔍 Padrão: {}", pattern['pattern'])
+                
+                if indicators['vwap'] is not None:
+                    summary['vwap'] = indicators['vwap']
+                    logger.debug("⚖️  VWAP 1h: ${:,.2f} (preço {:+.2f}%)",
+                                 indicators['vwap'], (price / indicators['vwap'] - 1) * 100)
+                
+                momentum = indicators['momentum']
+                summary['momentum_pct'] = round(momentum['rate_of_change'], 3)
+                if momentum['strength'] != 'weak':
+                    logger.debug("⚡ Momentum: {:+.2f}% ({})", momentum['rate_of_change'], momentum['strength'])
+                
+                sideways = indicators['sideways']
+                summary['sideways'] = sideways['is_sideways']
+                if sideways['is_sideways']:
+                    logger.debug("⏸️  Lateral: {:.2f}% oscilação, {:.0f}min", sideways['volatility_pct'], sideways['duration_minutes'])
+                
+                breakout = detect_breakout(
+                    current_price=price,
+                    sideways_data=sideways,
+                    volume_z=volume_z,
+                    min_breakout_pct=params['BREAKOUT_MIN_PCT'],
+                    min_volume_z=params['MIN_VOLUME_Z']
+                )
+                
+                current_ts = ts
+                was_sideways = alert_state.get('was_sideways', False)
+                sideways_start_ts = alert_state.get('sideways_start_ts', 0)
+                last_sideways_alert_ts = alert_state.get('last_sideways_alert_ts', 0)
+                
+                if sideways['is_sideways'] and not was_sideways:
+                    sideways_start_ts = current_ts
+                    logger.debug("🔔 Início de lateralização detectado")
+                
+                if was_sideways and not sideways['is_sideways']:
+                    sideways_duration = (current_ts - sideways_start_ts) / 60
                     
-                    elif sideways['is_sideways']:
-                        sideways_duration = (current_ts - sideways_start_ts) / 60 if sideways_start_ts > 0 else 0
-                        time_since_last_sideways_alert = (current_ts - last_sideways_alert_ts) / 60 if last_sideways_alert_ts > 0 else 999
+                    if breakout['is_breakout']:
+                        direction_emoji = "📈" if breakout['direction'] == 'up' else "📉"
+                        direction_text = "ALTA" if breakout['direction'] == 'up' else "BAIXA"
                         
-                        if sideways_duration >= SIDEWAYS_MIN_DURATION and time_since_last_sideways_alert >= SIDEWAYS_ALERT_INTERVAL:
+                        if breakout['breakout_type'] == 'confirmed':
                             alert_msg = (
-                                f"⏸️ *LATERALIZAÇÃO DETECTADA*\n"
-                                f"Preço oscilando: `${sideways['price_min']:,.2f}` - `${sideways['price_max']:,.2f}` ({sideways['volatility_pct']:.1f}%)\n"
-                                f"Duração: {sideways_duration:.0f} minutos\n"
-                                f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ)\n"
-                                f"\n💡 *Ação:* AGUARDAR rompimento com volume"
+                                f"{direction_emoji} *ROMPIMENTO DE {direction_text}!*\n"
+                                f"Preço rompeu: `${price:,.2f}` ({breakout['breakout_pct']:+.1f}%)\n"
+                                f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ) - CONFIRMADO\n"
+                                f"Estava lateral há: {sideways_duration:.0f} minutos\n"
+                                f"\n✅ *Ação:* ENTRADA VÁLIDA (breakout confirmado)"
+                            )
+                        else: 
+                            alert_msg = (
+                                f"⚠️ *Rompimento SEM volume*\n"
+                                f"Preço: `${price:,.2f}` ({breakout['breakout_pct']:+.1f}%)\n"
+                                f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ) - FRACO\n"
+                                f"Estava lateral há: {sideways_duration:.0f} minutos\n"
+                                f"\n💡 *Ação:* NÃO entrar (possível bull/bear trap)"
                             )
-                            
-                            print(f"   ⏸️  ALERTA DE LATERALIZAÇÃO ({sideways_duration:.0f}min)")
-                            send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, f"{symbol}\n{alert_msg}")
-                            
-                            alert_state['last_sideways_alert_ts'] = current_ts
-                        
-                        alert_state['was_sideways'] = True
-                        if sideways_start_ts == 0:
-                            alert_state['sideways_start_ts'] = current_ts
-                        
-                        save_alert_state(S3_BUCKET, symbol, alert_state)
-                        
-                        print(f"   ⏸️  Alertas normais pausados (em lateralização)")
-                        continue  
-                    
-                    should_alert, alert_msg, new_state = evaluate_combined_anomaly(
-                        price_z=price_z,
-                        volume_z=volume_z,
-                        current_price=price,
-                        current_volume=volume,
-                        mean_price=price_stats['mean'],
-                        mean_volume=volume_stats['mean'],
-                        std_price=price_stats['std_dev'],
-                        std_volume=volume_stats['std_dev'],
-                        alert_state=alert_state,
-                        min_volume_z=MIN_VOLUME_Z,
-                        extreme_threshold=EXTREME_THRESHOLD,
-                        cooldown_minutes=ALERT_COOLDOWN_MINUTES
-                    )
-                    
-                    if should_alert:
-                        print(f"   🚨 ALERTA COMBINADO!")
                         
                         context_lines = []
-                        
                         if trend['trend_direction'] == 'bullish':
-                            context_lines.append(f"📈 Tendência: {trend['positive_percentage']:.0f}% alta (últimos 60min)")
+                            context_lines.append(f"📈 Tendência: {trend['positive_percentage']:.0f}% alta")
                         elif trend['trend_direction'] == 'bearish':
-                            context_lines.append(f"📉 Tendência: {trend['positive_percentage']:.0f}% baixa (últimos 60min)")
-                        
-                        if recency['atl_recent']:
-                            context_lines.append(f"🔄 Saindo de ATL (há {recency['atl_minutes_ago']:.0f}min)")
-                        elif recency['ath_recent']:
-                            context_lines.append(f"🔄 Saindo de ATH (há {recency['ath_minutes_ago']:.0f}min)")
+                            context_lines.append(f"📉 Tendência: {trend['positive_percentage']:.0f}% baixa")
                         
                         if pattern['pattern'] == 'bullish_reversal':
-                            context_lines.append(f"✅ Higher lows confirmados (reversão de alta)")
+                            context_lines.append(f"✅ Higher lows confirmados")
                         elif pattern['pattern'] == 'bearish_continuation':
-                            context_lines.append(f"⚠️ Lower highs confirmados (continuação de baixa)")
-                        
-                        if momentum['strength'] != 'weak':
-                            emoji_mom = "⚡" if momentum['direction'] == 'positive' else "⚡"
-                            context_lines.append(f"{emoji_mom} Momentum {momentum['strength']}: {momentum['rate_of_change']:+.2f}%")
+                            context_lines.append(f"⚠️ Lower highs confirmados")
                         
                         if context_lines:
-                            context_section = "\n\n📊 *Contexto:*\n" + "\n".join(context_lines)
-                            alert_msg += context_section
+                            alert_msg += "\n\n📊 *Contexto:*\n" + "\n".join(context_lines)
                         
-                        send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, f"{symbol}\n{alert_msg}")
-                        save_alert_state(S3_BUCKET, symbol, new_state)
+                        logger.debug("🚨 BREAKOUT {}!", direction_text)
+                        notify(f"{symbol}\n{alert_msg}", 'breakout')
                     else:
-                        print(f"   ✅ Normal ou em cooldown")
-
-                    if abs(price_z) >= 1.5 or volume_z >= 1.0:
-                        print(f"   🤖 Iniciando análise de sentimento (CoinGecko)...")
-                        
-                        rsi = calculate_rsi([h['price'] for h in recent])
-                        vwap = calculate_vwap(recent, period_hours=1)
-                        
-                        tech_metrics = {
-                            "volume_change_1h": 0, 
-                            "rsi": rsi if rsi else 50
-                        }
+                        logger.debug("🔄 Fim de lateralização (voltou a oscilar normalmente)")
+                    
+                    alert_state['was_sideways'] = False
+                    alert_state['sideways_start_ts'] = 0
+                    alert_state['last_sideways_alert_ts'] = 0
+                
+                elif sideways['is_sideways']:
+                    sideways_duration = (current_ts - sideways_start_ts) / 60 if sideways_start_ts > 0 else 0
+                    time_since_last_sideways_alert = (current_ts - last_sideways_alert_ts) / 60 if last_sideways_alert_ts > 0 else 999
+                    
+                    if sideways_duration >= params['SIDEWAYS_MIN_DURATION'] and time_since_last_sideways_alert >= params['SIDEWAYS_ALERT_INTERVAL']:
+                        alert_msg = (
+                            f"⏸️ *LATERALIZAÇÃO DETECTADA*\n"
+                            f"Preço oscilando: `${sideways['price_min']:,.2f}` - `${sideways['price_max']:,.2f}` ({sideways['volatility_pct']:.1f}%)\n"
+                            f"Duração: {sideways_duration:.0f} minutos\n"
+                            f"Volume: `${volume:,.0f}` ({volume_z:+.1f}σ)\n"
+                            f"\n💡 *Ação:* AGUARDAR rompimento com volume"
+                        )
                         
-                        sentiment_data = get_sentiment_data(symbol, previous_volume=volume_stats['mean'])
+                        logger.debug("⏸️  ALERTA DE LATERALIZAÇÃO ({:.0f}min)", sideways_duration)
+                        notify(f"{symbol}\n{alert_msg}", 'sideways')
                         
-                        pump_analysis = calculate_pump_score(sentiment_data, tech_metrics)
+                        alert_state['last_sideways_alert_ts'] = current_ts
+                    
+                    alert_state['was_sideways'] = True
+                    if sideways_start_ts == 0:
+                        alert_state['sideways_start_ts'] = current_ts
+                    
+                    logger.debug("⏸️  Alertas normais pausados (em lateralização)")
+                    return 'sideways'
+                
+                should_alert, alert_msg, new_state = evaluate_combined_anomaly(
+                    price_z=price_z,
+                    volume_z=volume_z,
+                    current_price=price,
+                    current_volume=volume,
+                    mean_price=price_stats['mean'],
+                    mean_volume=volume_stats['mean'],
+                    std_price=price_stats['std_dev'],
+                    std_volume=volume_stats['std_dev'],
+                    alert_state=alert_state,
+                    min_volume_z=params['MIN_VOLUME_Z'],
+                    extreme_threshold=params['EXTREME_THRESHOLD'],
+                    cooldown_minutes=params['ALERT_COOLDOWN_MINUTES'],
+                    current_timestamp=ts
+                )
+                
+                if should_alert:
+                    logger.debug("🚨 ALERTA COMBINADO!")
+                    
+                    context_lines = []
+                    
+                    if trend['trend_direction'] == 'bullish':
+                        context_lines.append(f"📈 Tendência: {trend['positive_percentage']:.0f}% alta (últimos 60min)")
+                    elif trend['trend_direction'] == 'bearish':
+                        context_lines.append(f"📉 Tendência: {trend['positive_percentage']:.0f}% baixa (últimos 60min)")
+                    
+                    if recency['atl_recent']:
+                        context_lines.append(f"🔄 Saindo de ATL (há {recency['atl_minutes_ago']:.0f}min)")
+                    elif recency['ath_recent']:
+                        context_lines.append(f"🔄 Saindo de ATH (há {recency['ath_minutes_ago']:.0f}min)")
+                    
+                    if pattern['pattern'] == 'bullish_reversal':
+                        context_lines.append(f"✅ Higher lows confirmados (reversão de alta)")
+                    elif pattern['pattern'] == 'bearish_continuation':
+                        context_lines.append(f"⚠️ Lower highs confirmados (continuação de baixa)")
+                    
+                    if momentum['strength'] != 'weak':
+                        emoji_mom = "⚡" if momentum['direction'] == 'positive' else "⚡"
+                        context_lines.append(f"{emoji_mom} Momentum {momentum['strength']}: {momentum['rate_of_change']:+.2f}%")
+                    
+                    if context_lines:
+                        context_section = "\n\n📊 *Contexto:*\n" + "\n".join(context_lines)
+                        alert_msg += context_section
+                    
+                    notify(f"{symbol}\n{alert_msg}", 'combined')
+                else:
+                    logger.debug("✅ Normal ou em cooldown")
+                
+                state['alert'] = new_state
+
+                if abs(price_z) >= 1.5 or volume_z >= 1.0:
+                    logger.debug("🤖 Iniciando análise de sentimento (CoinGecko)...")
+                    
+                    rsi = indicators['rsi']
+                    
+                    tech_metrics = {
+                        "volume_change_1h": 0, 
+                        "rsi": rsi if rsi else 50
+                    }
+                    
+                    sentiment_data = sentiment(symbol, previous_volume=volume_stats['mean'], current_volume=volume)
+                    
+                    pump_analysis = calculate_pump_score(sentiment_data, tech_metrics)
+                    
+                    if pump_analysis:
+                        score = pump_analysis.get('score_pump_15_60min', 0)
+                        reason = pump_analysis.get('razao_curta', 'Sem razão')
+                        rec = pump_analysis.get('recomendacao', 'N/A')
                         
-                        if pump_analysis:
-                            score = pump_analysis.get('score_pump_15_60min', 0)
-                            reason = pump_analysis.get('razao_curta', 'Sem razão')
-                            rec = pump_analysis.get('recomendacao', 'N/A')
-                            
-                            print(f"   🤖 Score Pump: {score}/100 - {reason}")
-                            
-                            if score >= 75:
-                                emoji_ai = "🧠"
-                                alert_msg_ai = (
-                                    f"{emoji_ai} *ALERTA DE SENTIMENTO*\n"
-                                    f"Score de Pump: *{score}/100*\n"
-                                    f"💡 {reason}\n"
-                                    f"🎯 Recomendação: {rec}\n"
-                                    f"\n📊 *Dados Sociais:*\n"
-                                    f"Menções 30min: {sentiment_data['menções_30min']}\n"
-                                    f"Sentimento: {sentiment_data['sentimento_atual']}/100"
-                                )
-                                send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, f"{symbol}\n{alert_msg_ai}")
+                        summary['pump_score'] = score
+                        logger.debug("🤖 Score Pump: {}/100 - {}", score, reason)
                         
-                        if abs(price_z) >= 2.5 and volume_z >= 2.0:
-                            direction = "ALTA" if price_z > 0 else "BAIXA"
-                            emoji_extreme = "🔥" if price_z > 0 else "❄️"
-                            extreme_msg = (
-                                f"{emoji_extreme} *MOVIMENTO EXTREMO DE {direction}!*\n"
-                                f"Preço: `{price_z:+.1f}σ` | Volume: `{volume_z:+.1f}σ`\n"
-                                f"Preço atual: `${price:,.2f}`\n"
-                                f"Volume 24h: `${volume:,.0f}`\n"
-                                f"\n⚠️ *AÇÃO IMEDIATA RECOMENDADA*\n"
-                                f"Movimento {direction.lower()} muito forte detectado!"
+                        if score >= 75:
+                            emoji_ai = "🧠"
+                            alert_msg_ai = (
+                                f"{emoji_ai} *ALERTA DE SENTIMENTO*\n"
+                                f"Score de Pump: *{score}/100*\n"
+                                f"💡 {reason}\n"
+                                f"🎯 Recomendação: {rec}\n"
+                                f"\n📊 *Dados Sociais:*\n"
+                                f"Menções 30min: {sentiment_data['menções_30min']}\n"
+                                f"Sentimento: {sentiment_data['sentimento_atual']}/100"
                             )
-                            send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, f"{symbol}\n{extreme_msg}")
-                            print(f"   🔥 MOVIMENTO EXTREMO DE {direction}!")
-            
+                            notify(f"{symbol}\n{alert_msg_ai}", 'sentiment')
+                    
+                    if abs(price_z) >= 2.5 and volume_z >= 2.0:
+                        direction = "ALTA" if price_z > 0 else "BAIXA"
+                        emoji_extreme = "🔥" if price_z > 0 else "❄️"
+                        extreme_msg = (
+                            f"{emoji_extreme} *MOVIMENTO EXTREMO DE {direction}!*\n"
+                            f"Preço: `{price_z:+.1f}σ` | Volume: `{volume_z:+.1f}σ`\n"
+                            f"Preço atual: `${price:,.2f}`\n"
+                            f"Volume 24h: `${volume:,.0f}`\n"
+                            f"\n⚠️ *AÇÃO IMEDIATA RECOMENDADA*\n"
+                            f"Movimento {direction.lower()} muito forte detectado!"
+                        )
+                        notify(f"{symbol}\n{extreme_msg}", 'extreme')
+                        logger.debug("🔥 MOVIMENTO EXTREMO DE {}!", direction)
         
-        if ALERT_STRATEGY in ['records', 'both']:
+    
+    if params['ALERT_STRATEGY'] in ['records', 'both']:
 
-            stats_data = get_stats(S3_BUCKET, symbol)
-            
-            previous_high = stats_data.get('all_time_high', 0)
-            previous_low = stats_data.get('all_time_low', float('inf'))
-            
-            updated_stats, is_new_high, is_new_low = update_records(stats_data, price, ts)
-            
-            if is_new_high:
-                print(f"   🚀 NOVO RECORDE HISTÓRICO!")
-                send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                             f"🚀 *RECORDE {symbol}*\n"
-                             f"Novo topo histórico: `${price:,.2f}`\n"
-                             f"Anterior: `${previous_high:,.2f}`")
-            
-            if is_new_low:
-                print(f"   📉 NOVO FUNDO HISTÓRICO!")
-                previous_low_display = "N/A" if previous_low == float('inf') else f"${previous_low:,.2f}"
-                send_message(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-                             f"📉 *FUNDO {symbol}*\n"
-                             f"Menor preço histórico: `${price:,.2f}`\n"
-                             f"Anterior: `{previous_low_display}`")
-            
-            if is_new_high or is_new_low:
-                save_stats(S3_BUCKET, symbol, updated_stats)
+        stats_data = state['stats']
+        
+        previous_high = stats_data.get('all_time_high', 0)
+        previous_low = stats_data.get('all_time_low', float('inf'))
+        
+        updated_stats, is_new_high, is_new_low = update_records(stats_data, price, ts)
+        
+        if is_new_high:
+            logger.debug("🚀 NOVO RECORDE HISTÓRICO!")
+            notify(f"🚀 *RECORDE {symbol}*\n"
+                   f"Novo topo histórico: `${price:,.2f}`\n"
+                   f"Anterior: `${previous_high:,.2f}`", 'record_high')
+        
+        if is_new_low:
+            logger.debug("📉 NOVO FUNDO HISTÓRICO!")
+            previous_low_display = "N/A" if previous_low == float('inf') else f"${previous_low:,.2f}"
+            notify(f"📉 *FUNDO {symbol}*\n"
+                   f"Menor preço histórico: `${price:,.2f}`\n"
+                   f"Anterior: `{previous_low_display}`", 'record_low')
+        
+        if is_new_high or is_new_low:
+            state['stats'] = updated_stats
 
-    print(f"\n{'='*60}")
-    print("✅ Execução concluída com sucesso!")
-    print(f"{'='*60}\n")
-    return {"status": "ok"}
+    return 'ok'
+
+
+def _accumulator(live, name, load):
+    """Acumulador live[name], carregado do estado (load) na primeira vez; sem live, sempre do estado."""
+    if live is None:
+        return load()
+    if name not in live:
+        live[name] = load()
+    return live[name]
 
 
 def get_price_and_volume(symbol):
     """
-    Busca preço e volume via CoinGecko, com fallback para CryptoCompare.
+    Busca preço e volume via CoinGecko, com hedge para o CryptoCompare
+    (ver get_market_snapshot). Retorna None se nenhum provedor responder.
     """
-    coin_id = get_coingecko_id(symbol)
-    url_cg = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&ids={coin_id}"
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; CryptoMonitor/1.0)'}
-
-    try:
-        req = urllib.request.Request(url_cg, headers=headers)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
-        if not data:
-            raise ValueError("CoinGecko retornou vazio")
-        market_data = data[0]
-        return {
-            'price': float(market_data["current_price"]),
-            'volume': float(market_data["total_volume"])
-        }
-    except Exception as e:
-        print(f"⚠️ Erro CoinGecko: {e} — tentando fallback...")
-
-        # Fallback: CryptoCompare
-        try:
-            url_cc = f"https://min-api.cryptocompare.com/data/pricemultifull?fsyms={symbol.replace('USDT','')}&tsyms=USD"
-            req_cc = urllib.request.Request(url_cc, headers=headers)
-            with urllib.request.urlopen(req_cc, timeout=10) as response:
-                data_cc = json.loads(response.read().decode("utf-8"))
-            coin = symbol.replace('USDT','')
-            price = data_cc["RAW"][coin]["USD"]["PRICE"]
-            volume = data_cc["RAW"][coin]["USD"]["TOTALVOLUME24H"]
-            return {
-                'price': float(price),
-                'volume': float(volume)
-            }
-        except Exception as e2:
-            print(f"❌ Erro no fallback CryptoCompare: {e2}")
-            return None
+    return get_market_snapshot([symbol]).get(symbol)
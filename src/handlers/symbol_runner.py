@@ -0,0 +1,159 @@
+"""
+Execução do pipeline por símbolo, sequencial ou em um pool limitado de threads.
+
+As mensagens do Telegram de um símbolo são entregues juntas, numa chamada de
+send, quando o pipeline dele termina. No modo concorrente cada símbolo roda em uma thread própria, mas a
+saída (prints e mensagens) é acumulada por símbolo e liberada na ordem de
+SYMBOLS, então o resultado é o mesmo do modo sequencial.
+
+Com commit, as mensagens são retidas até o estado de todos os símbolos ser
+gravado: se outra execução gravou o mesmo símbolo ao mesmo tempo e já
+enviou um alerta do mesmo tipo, ele não é enviado de novo.
+"""
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.config.services import logger
+
+
+class _ThreadLocalStdout:
+    """Redireciona print() para o buffer da thread atual, se houver."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def run_per_symbol(
+    symbols: List[str],
+    process: Callable,
+    send: Callable[[str, List[str]], None],
+    max_workers: int = 1,
+    commit: Optional[Callable[[], Dict[str, Set[str]]]] = None
+) -> List[Tuple[str, object]]:
+    """
+    Executa process(symbol, notify) para cada símbolo, isolando erros.
+
+    Args:
+        symbols: Lista de símbolos, na ordem em que a saída deve aparecer
+        process: Pipeline de um símbolo; recebe (symbol, notify), sendo
+            notify(text, kind=None)
+        send: Recebe (symbol, textos) com os alertas do símbolo no tick
+            (ex: NotificationQueue.submit); não é chamado se não houver alertas
+        max_workers: Limite de símbolos processados ao mesmo tempo (1 = sequencial)
+        commit: Grava o estado de todos os símbolos e retorna
+            {symbol: tipos de alerta a suprimir}; as mensagens só são enviadas
+            depois dele
+
+    Returns:
+        Lista de (symbol, resultado) na ordem de symbols. Se o pipeline do
+        símbolo lançar exceção, o resultado é a própria exceção.
+    """
+    held = []
+
+    def deliver(symbol, outbox):
+        if commit is not None:
+            held.append((symbol, outbox))
+            return
+        _send_isolated(send, symbol, [text for _, text in outbox])
+
+    if max_workers <= 1 or len(symbols) <= 1:
+        results = []
+        for symbol in symbols:
+            outbox = []
+            results.append((symbol, _run_isolated(process, symbol, _notifier(outbox))))
+            deliver(symbol, outbox)
+        _deliver_committed(held, commit, send)
+        return results
+
+    stdout = _ThreadLocalStdout(sys.stdout)
+
+    def run_buffered(symbol):
+        output = io.StringIO()
+        outbox = []
+        stdout.capture(output)
+        try:
+            result = _run_isolated(process, symbol, _notifier(outbox))
+        finally:
+            stdout.release()
+        return result, output.getvalue(), outbox
+
+    results = []
+    original_stdout = sys.stdout
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(run_buffered, symbol) for symbol in symbols]
+            for symbol, future in zip(symbols, futures):
+                result, output, outbox = future.result()
+                original_stdout.write(output)
+                deliver(symbol, outbox)
+                results.append((symbol, result))
+    finally:
+        sys.stdout = original_stdout
+
+    _deliver_committed(held, commit, send)
+    return results
+
+
+def _notifier(outbox):
+    def notify(text, kind=None):
+        outbox.append((kind, text))
+    return notify
+
+
+def _deliver_committed(held, commit, send):
+    """Chama commit e envia as mensagens retidas, exceto os tipos suprimidos."""
+    if commit is None:
+        return
+    try:
+        suppressed = commit() or {}
+    except Exception as e:
+        logger.warning("⚠️ Erro ao gravar estado: {}", e)
+        suppressed = {}
+    for symbol, outbox in held:
+        skip = suppressed.get(symbol, set())
+        texts = []
+        for kind, text in outbox:
+            if kind in skip:
+                logger.info("🔁 Alerta '{}' de {} já enviado por outra execução", kind, symbol)
+                continue
+            texts.append(text)
+        _send_isolated(send, symbol, texts)
+
+
+def _run_isolated(process, symbol, notify):
+    """Roda o pipeline de um símbolo sem deixar a exceção afetar os demais."""
+    try:
+        return process(symbol, notify)
+    except Exception as e:
+        logger.error("❌ Erro ao processar {}: {}", symbol, e)
+        return e
+
+
+def _send_isolated(send, symbol, texts):
+    if not texts:
+        return
+    try:
+        send(symbol, texts)
+    except Exception as e:
+        logger.warning("⚠️ Erro ao enviar alerta de {}: {}", symbol, e)
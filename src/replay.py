@@ -0,0 +1,312 @@
+"""
+Replay (backtest) offline das estratégias de alerta.
+
+Passa um histórico gravado (ou uma série sintética), amostra por amostra,
+pelo mesmo evaluate_symbol do lambda_handler: uma única janela em memória
+recebe cada amostra (append) e solta as que saíram dela (drop_before), os
+acumuladores incrementais ficam vivos entre as amostras (live) em vez de
+irem e voltarem de state['indicators'], o relógio é o timestamp de cada
+amostra e não há I/O (storage, Telegram ou CoinGecko; o sentimento usa o
+mock). Uma grade de parâmetros
+roda em paralelo, uma configuração por processo.
+
+Para cada configuração sai a contagem de alertas por tipo, o tempo e a taxa
+de acerto: um alerta acerta se o preço se move pelo menos --hit-pct % (para
+qualquer lado) nos --horizon minutos seguintes.
+
+Uso:
+    python src/replay.py --symbols BTCUSDT,ETHUSDT --days 7
+    python src/replay.py --synthetic 200000 --grid MIN_VOLUME_Z=0.5,1,1.5 --grid ALERT_COOLDOWN_MINUTES=15,30
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# O replay não envia nada: só precisa das variáveis para importar settings.py
+os.environ.setdefault("S3_BUCKET", "replay")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "replay")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "replay")
+
+from src.config.services.history_codec import HistoryColumns
+from src.config.services.history_window import HistoryWindow
+from src.config.services.s3_service import get_price_columns, _default_symbol_state
+from src.config.services.sentiment_service import _get_mock_sentiment_data
+from src.handlers.price_monitor import ALERT_PARAMS, evaluate_symbol, history_hours
+
+REPLAY_HORIZON_MINUTES = 60
+REPLAY_HIT_PCT = 1.0
+
+# Séries carregadas uma vez por processo do pool (ver _init_worker)
+_series: Dict[str, HistoryColumns] = {}
+
+
+def replay(
+    columns: HistoryColumns,
+    symbol: str,
+    params: Optional[Dict] = None,
+    horizon_minutes: float = REPLAY_HORIZON_MINUTES,
+    hit_pct: float = REPLAY_HIT_PCT
+) -> Dict:
+    """
+    Roda evaluate_symbol em cada amostra da série, em ordem.
+
+    Args:
+        columns: Série (timestamps, prices, volumes) ordenada por timestamp
+        symbol: Símbolo (VARIATION_DICT é por símbolo)
+        params: Parâmetros de alerta (default: ALERT_PARAMS)
+        horizon_minutes, hit_pct: Critério de acerto de um alerta
+
+    Returns:
+        Dict com ticks, elapsed_s, ticks_per_s, alerts {tipo: n}, hits {tipo: n},
+        total_alerts, total_hits e hit_rate
+    """
+    params = params or ALERT_PARAMS
+    timestamps, prices, volumes = columns.timestamps, columns.prices, columns.volumes
+    hours = history_hours(params)
+    state = _default_symbol_state()
+    live = {}
+    fired = []
+    window = HistoryWindow() if hours is not None else None
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(len(timestamps)):
+            ts = timestamps[i]
+            if window is not None:
+                # Recorte exato a cada amostra, como a janela que o handler
+                # carrega; del numa array só desloca as colunas, sem alocar
+                start_ts = ts - hours * 3600
+                window.append(prices[i], volumes[i], ts)
+                window.drop_before(start_ts)
+                window.start_ts = start_ts
+            evaluate_symbol(
+                symbol, prices[i], volumes[i], ts, state, window,
+                lambda text, kind=None: fired.append((i, kind)),
+                params=params, sentiment=_replay_sentiment, live=live
+            )
+    elapsed = time.perf_counter() - start
+
+    alerts, hits = {}, {}
+    for i, kind in fired:
+        alerts[kind] = alerts.get(kind, 0) + 1
+        if _is_hit(timestamps, prices, i, horizon_minutes, hit_pct):
+            hits[kind] = hits.get(kind, 0) + 1
+    total_hits = sum(hits.values())
+    return {
+        'ticks': len(timestamps),
+        'elapsed_s': elapsed,
+        'ticks_per_s': len(timestamps) / elapsed if elapsed else 0.0,
+        'alerts': alerts,
+        'hits': hits,
+        'total_alerts': len(fired),
+        'total_hits': total_hits,
+        'hit_rate': total_hits / len(fired) if fired else 0.0
+    }
+
+
+def run_grid(
+    series: Dict[str, HistoryColumns],
+    grid: List[Dict],
+    workers: Optional[int] = None,
+    horizon_minutes: float = REPLAY_HORIZON_MINUTES,
+    hit_pct: float = REPLAY_HIT_PCT
+) -> List[Dict]:
+    """
+    Roda cada configuração da grade sobre todas as séries.
+
+    Args:
+        series: {símbolo: colunas}
+        grid: Lista de overrides sobre ALERT_PARAMS (ver parse_grid)
+        workers: Processos (default: os.cpu_count(); 1 roda no próprio processo)
+
+    Returns:
+        Um resultado por configuração, na ordem da grade: 'params' (os
+        overrides), 'symbols' {símbolo: resultado de replay()} e os totais
+        somados (ticks, elapsed_s, alerts, hits, total_alerts, total_hits, hit_rate)
+    """
+    tasks = [(index, symbol, overrides, horizon_minutes, hit_pct)
+             for index, overrides in enumerate(grid) for symbol in series]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+
+    if workers == 1:
+        _init_worker(series)
+        outputs = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+            outputs = list(pool.map(_run_task, tasks))
+
+    results = [{'params': overrides, 'symbols': {}} for overrides in grid]
+    for index, symbol, result in outputs:
+        results[index]['symbols'][symbol] = result
+    for result in results:
+        result.update(_totals(result['symbols'].values()))
+    return results
+
+
+def parse_grid(specs: List[str]) -> List[Dict]:
+    """
+    ["MIN_VOLUME_Z=0.5,1", "ALERT_COOLDOWN_MINUTES=15,30"] -> produto cartesiano
+    de overrides, com os valores convertidos para o tipo de ALERT_PARAMS.
+
+    Raises:
+        ValueError: Parâmetro desconhecido ou que não é escalar
+    """
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        if name not in ALERT_PARAMS or isinstance(ALERT_PARAMS[name], (dict, list)):
+            raise ValueError(f"Parâmetro de grade inválido: {name}")
+        kind = type(ALERT_PARAMS[name])
+        axes.append([(name, kind(value.strip())) for value in values.split(",") if value.strip()])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def synthetic_series(n: int, seed: int = 42, interval_s: float = 300, start_ts: float = 1_700_000_000.0) -> HistoryColumns:
+    """
+    Série sintética reprodutível: passeio aleatório com trechos laterais e
+    picos de preço/volume, para medir throughput e testar a grade sem dados reais.
+    """
+    rng = random.Random(seed)
+    timestamps, prices, volumes = array('d'), array('d'), array('d')
+    price, base_volume = 100.0, 1e9
+    regime, remaining = 'walk', 0
+    for i in range(n):
+        if remaining <= 0:
+            regime = rng.choices(['walk', 'sideways', 'spike'], weights=[70, 25, 5])[0]
+            remaining = rng.randint(3, 12) if regime == 'spike' else rng.randint(24, 288)
+        remaining -= 1
+        if regime == 'sideways':
+            price *= 1 + rng.gauss(0, 0.0008)
+            volume = base_volume * rng.uniform(0.8, 1.1)
+        elif regime == 'spike':
+            price *= 1 + rng.gauss(0.006, 0.004) * rng.choice((1, -1))
+            volume = base_volume * rng.uniform(2.0, 4.0)
+        else:
+            price *= 1 + rng.gauss(0, 0.003)
+            volume = base_volume * rng.uniform(0.7, 1.4)
+        timestamps.append(start_ts + i * interval_s)
+        prices.append(price)
+        volumes.append(volume)
+    return HistoryColumns(timestamps, prices, volumes)
+
+
+def _replay_sentiment(symbol, previous_volume=None, current_volume=None):
+    return _get_mock_sentiment_data(symbol, reason="replay")
+
+
+def _is_hit(timestamps, prices, index, horizon_minutes, hit_pct):
+    end = bisect_right(timestamps, timestamps[index] + horizon_minutes * 60)
+    base = prices[index]
+    if end <= index + 1 or not base:
+        return False
+    future = prices[index + 1:end]
+    return max(max(future) / base - 1, 1 - min(future) / base) * 100 >= hit_pct
+
+
+def _totals(results):
+    results = list(results)
+    alerts, hits = {}, {}
+    for result in results:
+        for kind, count in result['alerts'].items():
+            alerts[kind] = alerts.get(kind, 0) + count
+        for kind, count in result['hits'].items():
+            hits[kind] = hits.get(kind, 0) + count
+    total_alerts = sum(alerts.values())
+    total_hits = sum(hits.values())
+    ticks = sum(result['ticks'] for result in results)
+    elapsed = sum(result['elapsed_s'] for result in results)
+    return {
+        'ticks': ticks,
+        'elapsed_s': elapsed,
+        'ticks_per_s': ticks / elapsed if elapsed else 0.0,
+        'alerts': alerts,
+        'hits': hits,
+        'total_alerts': total_alerts,
+        'total_hits': total_hits,
+        'hit_rate': total_hits / total_alerts if total_alerts else 0.0
+    }
+
+
+def _init_worker(series):
+    _series.clear()
+    _series.update(series)
+
+
+def _run_task(task):
+    index, symbol, overrides, horizon_minutes, hit_pct = task
+    params = dict(ALERT_PARAMS, **overrides)
+    return index, symbol, replay(_series[symbol], symbol, params, horizon_minutes, hit_pct)
+
+
+def _load_series(args):
+    if args.synthetic:
+        return {symbol: synthetic_series(args.synthetic, seed=args.seed + n) for n, symbol in enumerate(args.symbols)}
+
+    from src.config.settings import S3_BUCKET
+    end = args.end or time.time()
+    series = {}
+    for symbol in args.symbols:
+        columns = get_price_columns(S3_BUCKET, symbol, hours=args.days * 24, now=end)
+        if len(columns):
+            series[symbol] = columns
+        else:
+            print(f"⚠️  Sem histórico para {symbol}")
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay offline das estratégias de alerta")
+    parser.add_argument("--symbols", default=os.getenv("SYMBOLS", "BTCUSDT"),
+                        type=lambda raw: [s.strip() for s in raw.split(",") if s.strip()])
+    parser.add_argument("--days", type=float, default=7, help="Dias de histórico lidos do storage")
+    parser.add_argument("--end", type=float, default=None, help="Fim do histórico (timestamp Unix; default: agora)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Usa N amostras sintéticas por símbolo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--grid", action="append", default=[], help="PARAM=v1,v2 (repetível)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--horizon", type=float, default=REPLAY_HORIZON_MINUTES, help="Minutos para o acerto")
+    parser.add_argument("--hit-pct", type=float, default=REPLAY_HIT_PCT, help="Movimento mínimo (%%) para o acerto")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    series = _load_series(args)
+    if not series:
+        print("❌ Nenhuma série para o replay")
+        return 1
+    grid = parse_grid(args.grid) or [{}]
+    ticks = sum(len(columns) for columns in series.values())
+    print(f"🔁 Replay: {len(series)} símbolos, {ticks:,} amostras, {len(grid)} configurações")
+
+    start = time.perf_counter()
+    results = run_grid(series, grid, workers=args.workers, horizon_minutes=args.horizon, hit_pct=args.hit_pct)
+    wall = time.perf_counter() - start
+
+    print(f"\n{'configuração':<48} {'alertas':>8} {'acertos':>8} {'taxa':>6} {'ticks/s':>9}")
+    for result in sorted(results, key=lambda r: r['hit_rate'], reverse=True):
+        label = " ".join(f"{name}={value}" for name, value in result['params'].items()) or "(settings atuais)"
+        print(f"{label:<48} {result['total_alerts']:>8} {result['total_hits']:>8} "
+              f"{result['hit_rate']:>6.1%} {result['ticks_per_s']:>9,.0f}")
+        print(f"{'':<4}{', '.join(f'{kind}: {count}' for kind, count in sorted(result['alerts'].items()))}")
+    print(f"\n⏱️  {ticks * len(grid):,} ticks em {wall:.1f}s ({ticks * len(grid) / wall * 60:,.0f} ticks/min)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultados em {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
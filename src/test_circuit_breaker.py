@@ -0,0 +1,241 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+
+from src.config.services import circuit_breaker, http_client, rate_limiter, sentiment_service
+from src.config.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.config.services.providers import Provider, hedged_fetch
+from src.config.services.rate_limiter import RateLimited, TokenBucket
+from src.config.services.ttl_cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class StubServer:
+    """Servidor HTTP local que responde self.status e conta as requisições."""
+
+    def __init__(self):
+        self.status = 200
+        self.headers = {}
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                payload = json.dumps({"ok": True}).encode()
+                self.send_response(stub.status)
+                for name, value in stub.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def _fresh_registries():
+    circuit_breaker._breakers.clear()
+    rate_limiter._limiters.clear()
+
+def test_breaker_states():
+    print("🧪 Circuit breaker: closed -> open -> half_open -> closed/open...")
+
+    clock = FakeClock()
+    breaker = CircuitBreaker("Teste", failure_threshold=3, reset_timeout=60, clock=clock)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == circuit_breaker.CLOSED
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.CLOSED, "sucesso zera a contagem de falhas"
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    try:
+        breaker.before_call()
+        assert False, "circuito aberto deveria recusar"
+    except CircuitOpenError:
+        pass
+    assert breaker.rejected == 1
+
+    clock.now += 60
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    breaker.before_call()
+    try:
+        breaker.before_call()
+        assert False, "half-open deixa passar só uma chamada de teste"
+    except CircuitOpenError:
+        pass
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN, "falha no teste reabre"
+
+    clock.now += 59
+    assert breaker.state == circuit_breaker.OPEN, "timeout recomeça ao reabrir"
+    clock.now += 1
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == circuit_breaker.CLOSED
+
+def test_token_bucket_max_wait():
+    print("🧪 Rate limiter: max_wait falha sem consumir token; limites por provedor...")
+
+    clock = FakeClock()
+    bucket = TokenBucket(0.5, 2, clock=clock, sleep=lambda seconds: None)
+    assert bucket.acquire(max_wait=0) == 0
+    assert bucket.acquire(max_wait=0) == 0
+    try:
+        bucket.acquire(max_wait=1)
+        assert False, "próximo token só em 2s"
+    except RateLimited:
+        pass
+    assert bucket.acquire(max_wait=2) == 2.0, "a recusa não pode ter consumido o token"
+
+    original = rate_limiter.API_RATE_LIMITS
+    rate_limiter.API_RATE_LIMITS = "CoinGecko=0.5:5, CryptoCompare=5"
+    rate_limiter._limiters.clear()
+    try:
+        assert (rate_limiter.limiter_for("CoinGecko").rate, rate_limiter.limiter_for("CoinGecko").capacity) == (0.5, 5)
+        assert rate_limiter.limiter_for("CryptoCompare").capacity == 1
+        assert rate_limiter.limiter_for("Telegram").rate == 0
+        assert rate_limiter.limiter_for("CoinGecko") is rate_limiter.limiter_for("CoinGecko")
+    finally:
+        rate_limiter.API_RATE_LIMITS = original
+        rate_limiter._limiters.clear()
+
+def test_http_client_fails_fast_when_open():
+    print("🧪 http_client: 5xx seguidos abrem o circuito e as próximas chamadas nem saem...")
+
+    _fresh_registries()
+    stub = StubServer()
+    try:
+        assert http_client.provider_for(stub.url) == "127.0.0.1"
+        assert http_client.provider_for("https://api.coingecko.com/api/v3/ping") == "CoinGecko"
+
+        stub.status = 503
+        for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD):
+            assert http_client.get(stub.url).status_code == 503
+        assert circuit_breaker.states()["127.0.0.1"] == circuit_breaker.OPEN
+
+        start = time.monotonic()
+        for _ in range(20):
+            try:
+                http_client.get_json(stub.url)
+                assert False, "circuito aberto deveria recusar"
+            except CircuitOpenError:
+                pass
+        assert time.monotonic() - start < 0.1
+        assert stub.hits == circuit_breaker.BREAKER_FAILURE_THRESHOLD
+    finally:
+        stub.close()
+        _fresh_registries()
+
+def test_http_client_429_pauses_provider():
+    print("🧪 http_client: 429 suspende o bucket do provedor pelo Retry-After...")
+
+    _fresh_registries()
+    stub = StubServer()
+    try:
+        stub.status = 429
+        stub.headers = {"Retry-After": "30"}
+        assert http_client.get(stub.url).status_code == 429
+        assert circuit_breaker.states()["127.0.0.1"] == circuit_breaker.CLOSED, "429 não é queda do provedor"
+
+        stub.status = 200
+        try:
+            http_client.get(stub.url)
+            assert False, "deveria falhar na hora em vez de esperar 30s"
+        except RateLimited:
+            pass
+        assert stub.hits == 1
+
+        rate_limiter.limiter_for("127.0.0.1")._paused_until = 0.0
+        assert http_client.get_json(stub.url) == {"ok": True}
+
+        session = http_client.get_session()
+        http_client.close()
+        assert http_client._session is None, "close() descarta a sessão fechada"
+        assert http_client.get_session() is not session
+    finally:
+        stub.close()
+        _fresh_registries()
+
+def test_open_provider_routes_to_fallback():
+    print("🧪 Hedge: provedor com circuito aberto passa a vez na hora, sem sujar a latência...")
+
+    def open_circuit(symbols):
+        raise CircuitOpenError("circuito de CoinGecko aberto")
+
+    primary = Provider("CoinGecko", open_circuit)
+    secondary = Provider("CryptoCompare", lambda symbols: {s: {"price": 1.0, "volume": 2.0} for s in symbols})
+
+    start = time.monotonic()
+    snapshot = hedged_fetch(["BTCUSDT"], [primary, secondary])
+    assert snapshot == {"BTCUSDT": {"price": 1.0, "volume": 2.0}}
+    assert time.monotonic() - start < 0.1
+    assert primary.latency.count == 0 and primary.errors == 0
+
+def test_sentiment_skips_request_when_open():
+    print("🧪 Sentimento: circuito do CoinGecko aberto usa o cache vencido sem requisição...")
+
+    _fresh_registries()
+    original = sentiment_service._cache
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = FakeClock()
+        sentiment_service._cache = TTLCache(Path(tmp) / "sentiment_cache.json", clock=clock)
+        try:
+            profile = {"sentiment_votes_up": 80.0, "public_interest": 1.0,
+                       "twitter_followers": 10, "reddit_subscribers": 1}
+            sentiment_service._cache.put("bitcoin:profile", profile)
+            clock.now += sentiment_service.SENTIMENT_TTL + 1
+
+            breaker = circuit_breaker.breaker_for("CoinGecko")
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+
+            start = time.monotonic()
+            sentiment = sentiment_service.get_sentiment_data("BTCUSDT", current_volume=5e9)
+            assert time.monotonic() - start < 0.1
+            assert sentiment["sentimento_atual"] == 80.0
+            assert breaker.rejected == 1
+        finally:
+            sentiment_service._cache = original
+            _fresh_registries()
+
+if __name__ == "__main__":
+    test_breaker_states()
+    test_token_bucket_max_wait()
+    test_http_client_fails_fast_when_open()
+    test_http_client_429_pauses_provider()
+    test_open_provider_routes_to_fallback()
+    test_sentiment_skips_request_when_open()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,198 @@
+import sys
+import os
+import json
+import io
+import contextlib
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+os.environ.setdefault("HISTORY_FORMAT", "columnar")
+
+import boto3
+from botocore.stub import Stubber
+
+from src.config.services import storage
+from src.testing import local_data_dir
+from src.config.services.s3_service import (
+    save_price_to_history, get_price_history, load_symbol_state, save_symbol_state,
+    merge_symbol_state, _default_symbol_state
+)
+from src.handlers.symbol_runner import run_per_symbol
+
+BASE_TS = 1_700_000_000.0
+
+def _concurrent_invocation(action):
+    """Roda action() como outra execução, gravando direto no backend."""
+    session = storage._session
+    storage._session = None
+    try:
+        action()
+    finally:
+        storage._session = session
+
+def test_conflict_merges_samples():
+    print("🧪 Duas execuções gravando o mesmo segmento: nenhuma amostra perdida...")
+    
+    with local_data_dir():
+        save_price_to_history("bucket", "BTCUSDT", 100.0, 1e9, BASE_TS)
+        
+        storage.begin_invocation()
+        save_price_to_history("bucket", "BTCUSDT", 102.0, 1e9, BASE_TS + 600)
+        _concurrent_invocation(lambda: save_price_to_history("bucket", "BTCUSDT", 101.0, 1e9, BASE_TS + 300))
+        counters = storage.flush()
+        
+        assert counters['conflicts'] == 1 and counters['errors'] == 0
+        prices = [h['price'] for h in get_price_history("bucket", "BTCUSDT", now=BASE_TS + 600)]
+        assert prices == [100.0, 101.0, 102.0], prices
+
+def test_conflict_without_merge_keeps_ours():
+    print("🧪 Objeto criado por outra execução, sem merge: a nossa versão prevalece...")
+    
+    with local_data_dir():
+        storage.begin_invocation()
+        assert storage.read_object("bucket", "k/a") is None
+        storage.write_object("bucket", "k/a", b"nosso")
+        _concurrent_invocation(lambda: storage.write_object("bucket", "k/a", b"deles"))
+        counters = storage.flush()
+        
+        assert counters['conflicts'] == 1
+        assert storage.read_object("bucket", "k/a") == b"nosso"
+
+def test_duplicate_alert_is_suppressed():
+    print("🧪 Alerta combinado já enviado pela outra execução não é repetido...")
+    
+    with local_data_dir():
+        save_symbol_state("bucket", "ETHUSDT", _default_symbol_state())
+        
+        def their_invocation():
+            state = load_symbol_state("bucket", "ETHUSDT")
+            state['last_price'] = {'price': 3000.0, 'timestamp': BASE_TS}
+            state['alert'].update(last_alert_ts=BASE_TS, last_price_z=2.6)
+            save_symbol_state("bucket", "ETHUSDT", state)
+        
+        reports = {}
+        sent = []
+        
+        def process(symbol, notify):
+            state = load_symbol_state("bucket", symbol)
+            _concurrent_invocation(their_invocation)
+            state['last_price'] = {'price': 3001.0, 'timestamp': BASE_TS + 1}
+            state['alert'].update(last_alert_ts=BASE_TS + 1, last_price_z=2.4)
+            reports[symbol] = save_symbol_state("bucket", symbol, state)
+            notify("alerta combinado", 'combined')
+            notify("erro", 'error')
+        
+        def commit():
+            storage.flush()
+            return {symbol: report['suppressed'] for symbol, report in reports.items()}
+        
+        storage.begin_invocation()
+        run_per_symbol(["ETHUSDT"], process, send=lambda symbol, texts: sent.extend(texts), commit=commit)
+        
+        assert sent == ["erro"], sent
+        state = json.loads(storage.read_object("bucket", "state/ETHUSDT.json"))
+        assert state['last_price']['price'] == 3001.0
+        assert state['alert']['last_alert_ts'] == BASE_TS + 1
+
+def test_merge_symbol_state_records():
+    print("🧪 Merge de estado: maior topo, menor fundo, recorde repetido suprimido...")
+    
+    base = _default_symbol_state()
+    base['stats'] = {'all_time_high': 100.0, 'all_time_low': 50.0}
+    ours = json.loads(json.dumps(base))
+    theirs = json.loads(json.dumps(base))
+    ours['stats'].update(all_time_high=110.0, last_ath_timestamp=BASE_TS)
+    theirs['stats'].update(all_time_high=105.0, all_time_low=45.0, last_atl_timestamp=BASE_TS - 1)
+    
+    merged, suppressed = merge_symbol_state(base, ours, theirs)
+    assert merged['stats']['all_time_high'] == 110.0 and merged['stats']['last_ath_timestamp'] == BASE_TS
+    assert merged['stats']['all_time_low'] == 45.0 and merged['stats']['last_atl_timestamp'] == BASE_TS - 1
+    assert 'record_high' not in suppressed and 'record_low' in suppressed
+    assert 'combined' not in suppressed and 'error' not in suppressed
+
+def test_s3_precondition_failed():
+    print("🧪 S3: If-Match com o ETag lido, 412 vira conflito e a escrita é refeita...")
+    
+    client = boto3.client("s3", region_name="us-east-1",
+                          aws_access_key_id="test", aws_secret_access_key="test")
+    previous = storage.ENABLE_S3, storage.s3
+    storage.ENABLE_S3, storage.s3 = True, client
+    storage.clear_cache()
+    key = "state/SOLUSDT.json"
+    try:
+        with Stubber(client) as stub:
+            stub.add_response("get_object", {"Body": _body(b"base"), "ETag": '"v1"'},
+                              {"Bucket": "bucket", "Key": key})
+            stub.add_client_error("put_object", service_error_code="PreconditionFailed", http_status_code=412,
+                                  expected_params={"Bucket": "bucket", "Key": key, "Body": b"nosso",
+                                                   "ContentType": "application/json", "IfMatch": '"v1"'})
+            stub.add_response("get_object", {"Body": _body(b"deles"), "ETag": '"v2"'},
+                              {"Bucket": "bucket", "Key": key, "IfNoneMatch": '"v1"'})
+            stub.add_response("put_object", {"ETag": '"v3"'},
+                              {"Bucket": "bucket", "Key": key, "Body": b"deles+nosso",
+                               "ContentType": "application/json", "IfMatch": '"v2"'})
+            
+            storage.begin_invocation()
+            assert storage.read_object("bucket", key) == b"base"
+            storage.write_object("bucket", key, b"nosso", merge=lambda base, ours, theirs: theirs + b"+" + ours)
+            counters = storage.flush()
+            assert counters['conflicts'] == 1 and counters['errors'] == 0
+            stub.assert_no_pending_responses()
+    finally:
+        storage.ENABLE_S3, storage.s3 = previous
+        storage.clear_cache()
+
+def test_s3_without_conditional_put():
+    print("🧪 S3: botocore sem If-Match no PutObject grava sem condição, em vez de perder a escrita...")
+    
+    from botocore.exceptions import ClientError, ParamValidationError
+    
+    class OldClient:
+        exceptions = types.SimpleNamespace(ClientError=ClientError, NoSuchKey=type("NoSuchKey", (Exception,), {}))
+        
+        def __init__(self):
+            self.puts = []
+        
+        def get_object(self, **kwargs):
+            return {"Body": _body(b"base"), "ETag": '"v1"'}
+        
+        def put_object(self, Bucket, Key, Body, ContentType, **conditions):
+            if conditions:
+                raise ParamValidationError(report=f'Unknown parameter in input: "{next(iter(conditions))}"')
+            self.puts.append((Key, Body))
+            return {"ETag": '"v2"'}
+    
+    client = OldClient()
+    previous = storage.ENABLE_S3, storage.s3, storage._conditional_puts
+    storage.ENABLE_S3, storage.s3 = True, client
+    storage.clear_cache()
+    try:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            storage.begin_invocation()
+            for symbol in ("BTCUSDT", "ETHUSDT"):
+                storage.read_object("bucket", f"state/{symbol}.json")
+                storage.write_object("bucket", f"state/{symbol}.json", symbol.encode())
+            counters = storage.flush()
+        
+        assert counters['errors'] == 0 and counters['put'] == 2, counters
+        assert sorted(client.puts) == [("state/BTCUSDT.json", b"BTCUSDT"), ("state/ETHUSDT.json", b"ETHUSDT")]
+        assert output.getvalue().count("sem PutObject condicional") == 1, output.getvalue()
+    finally:
+        storage.ENABLE_S3, storage.s3, storage._conditional_puts = previous
+        storage.clear_cache()
+
+def _body(data):
+    from io import BytesIO
+    from botocore.response import StreamingBody
+    return StreamingBody(BytesIO(data), len(data))
+
+if __name__ == "__main__":
+    test_conflict_merges_samples()
+    test_conflict_without_merge_keeps_ours()
+    test_duplicate_alert_is_suppressed()
+    test_merge_symbol_state_records()
+    test_s3_precondition_failed()
+    test_s3_without_conditional_put()
+    print("\n✅ Todos os testes passaram")
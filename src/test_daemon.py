@@ -0,0 +1,188 @@
+import sys
+import os
+import contextlib
+import io
+import json
+import random
+import tempfile
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+os.environ.setdefault("S3_BUCKET", "test-bucket")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "test-chat")
+
+from src.config.settings import S3_BUCKET
+from src.config.services import storage, telegram_queue
+from src.config.services.rate_limiter import TokenBucket
+from src.config.services.s3_service import get_price_columns, load_symbol_state
+from src.config.services.sentiment_service import _get_mock_sentiment_data
+from src.config.services.telegram_queue import NotificationQueue
+from src.handlers import price_monitor, price_daemon
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+START = 1_700_000_000.0
+
+def _series(ticks, step):
+    """Passeio aleatório com um salto de preço e volume no fim."""
+    rng = random.Random(7)
+    prices = {symbol: 100.0 * (i + 1) for i, symbol in enumerate(SYMBOLS)}
+    series = []
+    for i in range(ticks):
+        snapshot = {}
+        for symbol in SYMBOLS:
+            prices[symbol] *= 1 + rng.gauss(0, 0.002)
+            spike = i == ticks - 1
+            snapshot[symbol] = {
+                "price": prices[symbol] * (1.09 if spike else 1.0),
+                "volume": 1e6 * (3.0 if spike else 1 + rng.random() * 0.1)
+            }
+        series.append((START + i * step, snapshot))
+    return series
+
+@contextlib.contextmanager
+def _sandbox(patches):
+    """Diretório local_data temporário, Telegram sem limite e sentimento sem rede."""
+    patches = {(price_monitor, "get_sentiment_data"): lambda symbol, *args, **kwargs: _get_mock_sentiment_data(symbol, "teste"),
+               (telegram_queue, "_limiter"): TokenBucket(0, 1), **patches}
+    originals = {target: getattr(*target) for target in patches}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        storage.clear_cache()
+        for (module, name), value in patches.items():
+            setattr(module, name, value)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            for (module, name), value in originals.items():
+                setattr(module, name, value)
+            os.chdir(cwd)
+            storage.clear_cache()
+
+def _stored(now=START + 86400):
+    return {symbol: (load_symbol_state(S3_BUCKET, symbol), get_price_columns(S3_BUCKET, symbol, now=now))
+            for symbol in SYMBOLS}
+
+def test_same_alerts_as_lambda_handler():
+    print("🧪 Daemon e lambda_handler enviam os mesmos alertas e gravam o mesmo estado...")
+
+    series = _series(340, 300)
+    current = {}
+
+    lambda_sent = []
+    with _sandbox({
+        (price_monitor, "SYMBOLS"): SYMBOLS,
+        (price_monitor, "get_market_snapshot"): lambda requested: current["snapshot"],
+        (price_monitor, "send_message"): lambda token, chat, text: lambda_sent.append(text),
+        (price_monitor, "time"): types.SimpleNamespace(time=lambda: current["ts"], strftime=lambda *args: "")
+    }):
+        for ts, snapshot in series:
+            current.update(ts=ts, snapshot=snapshot)
+            price_monitor.lambda_handler({}, {})
+        lambda_stored = _stored()
+
+    daemon_sent = []
+    with _sandbox({(price_daemon, "get_market_snapshot"): lambda requested: current["snapshot"]}):
+        daemon = price_daemon.PriceDaemon(SYMBOLS, notifications=NotificationQueue(daemon_sent.append))
+        daemon.restore(now=START)
+        for ts, snapshot in series:
+            current["snapshot"] = snapshot
+            daemon.tick(ts)
+            if ts % 1800 == 0:
+                daemon.checkpoint()
+        daemon.checkpoint()
+        daemon.notifications.close()
+        daemon_stored = _stored()
+
+    assert lambda_sent, "o salto final deveria gerar alertas"
+    assert daemon_sent == lambda_sent
+    for symbol in SYMBOLS:
+        assert daemon_stored[symbol][0] == lambda_stored[symbol][0], symbol
+        assert daemon_stored[symbol][1].timestamps == lambda_stored[symbol][1].timestamps
+        assert daemon_stored[symbol][1].prices == lambda_stored[symbol][1].prices
+
+def test_restore_and_checkpoint_retry():
+    print("🧪 Checkpoint que falha mantém as amostras; um daemon novo retoma o estado...")
+
+    series = _series(40, 15)
+    current = {}
+    with _sandbox({(price_daemon, "get_market_snapshot"): lambda requested: current["snapshot"]}):
+        daemon = price_daemon.PriceDaemon(SYMBOLS, notifications=NotificationQueue(lambda text: None))
+        daemon.restore(now=START)
+        for ts, snapshot in series[:20]:
+            current["snapshot"] = snapshot
+            daemon.tick(ts)
+
+        original = price_daemon.append_prices_to_history
+        price_daemon.append_prices_to_history = lambda *args: (_ for _ in ()).throw(OSError("disco cheio"))
+        try:
+            daemon.checkpoint()
+        finally:
+            price_daemon.append_prices_to_history = original
+        assert all(len(entry["pending"]) == 20 for entry in daemon._entries.values())
+
+        for ts, snapshot in series[20:]:
+            current["snapshot"] = snapshot
+            daemon.tick(ts)
+        daemon.checkpoint()
+        assert not any(entry["pending"] for entry in daemon._entries.values())
+
+        restored = price_daemon.PriceDaemon(SYMBOLS, notifications=NotificationQueue(lambda text: None))
+        restored.restore(now=series[-1][0])
+        for symbol in SYMBOLS:
+            ours, theirs = daemon._entries[symbol], restored._entries[symbol]
+            assert json.dumps(theirs["state"]) == json.dumps(ours["state"]), symbol
+            assert theirs["window"].timestamps == ours["window"].timestamps
+            assert len(theirs["window"]) == 40
+
+def test_window_trimmed_in_batches():
+    print("🧪 A janela em memória é recortada no lugar, em lotes...")
+
+    series = _series(2400, 60)
+    current = {}
+    with _sandbox({(price_daemon, "get_market_snapshot"): lambda requested: current["snapshot"]}):
+        daemon = price_daemon.PriceDaemon(SYMBOLS[:1], notifications=NotificationQueue(lambda text: None))
+        daemon.restore(now=START)
+        window = daemon._entries[SYMBOLS[0]]["window"]
+        columns = window.timestamps
+        trims = 0
+        for ts, snapshot in series:
+            current["snapshot"] = snapshot
+            before = len(window)
+            daemon.tick(ts)
+            trims += len(window) <= before
+            start_ts = ts - price_monitor.history_hours() * 3600
+            assert window.timestamps[0] >= start_ts - (len(window) // 8 + 1) * 60
+
+    assert daemon._entries[SYMBOLS[0]]["window"] is window and window.timestamps is columns
+    assert 0 < trims < 2400 // 64, trims
+
+def test_run_stops_with_final_checkpoint():
+    print("🧪 run() amostra até o stop e grava um último checkpoint...")
+
+    stop = threading.Event()
+    snapshot = _series(1, 15)[0][1]
+    with _sandbox({(price_daemon, "get_market_snapshot"): lambda requested: snapshot}):
+        daemon = price_daemon.PriceDaemon(SYMBOLS, interval=0.01, checkpoint_interval=0.05,
+                                          notifications=NotificationQueue(lambda text: None))
+        timer = threading.Timer(0.3, stop.set)
+        timer.start()
+        daemon.run(stop)
+        stored = _stored(now=time.time())
+
+    assert daemon.ticks >= 5
+    for symbol in SYMBOLS:
+        assert len(stored[symbol][1]) == daemon.ticks, "todas as amostras gravadas"
+        assert stored[symbol][0]["last_price"]["price"] == snapshot[symbol]["price"]
+
+if __name__ == "__main__":
+    test_same_alerts_as_lambda_handler()
+    test_restore_and_checkpoint_retry()
+    test_window_trimmed_in_batches()
+    test_run_stops_with_final_checkpoint()
+    print("\n✅ Todos os testes passaram")
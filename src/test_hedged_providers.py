@@ -0,0 +1,191 @@
+import sys
+import os
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services import binance_service, circuit_breaker, providers
+from src.config.services.providers import LatencyHistogram, Provider
+
+class StubMarkets:
+    """Servidor HTTP local com CoinGecko e CryptoCompare falsos, com atraso/erro configuráveis."""
+    
+    def __init__(self):
+        self.delay = {"coingecko": 0.0, "cryptocompare": 0.0}
+        self.status = {"coingecko": 200, "cryptocompare": 200}
+        self.omit = set()
+        self.hits = {"coingecko": 0, "cryptocompare": 0}
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                name = "coingecko" if url.path.startswith("/coingecko") else "cryptocompare"
+                stub.hits[name] += 1
+                time.sleep(stub.delay[name])
+                if name == "coingecko":
+                    body = [{"id": coin_id, "current_price": 100.0, "total_volume": 1e9}
+                            for coin_id in query["ids"][0].split(",") if coin_id not in stub.omit]
+                else:
+                    body = {"RAW": {coin: {"USD": {"PRICE": 200.0, "TOTALVOLUME24H": 2e9}}
+                                    for coin in query["fsyms"][0].split(",")}}
+                payload = json.dumps(body).encode()
+                self.send_response(stub.status[name])
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+@contextmanager
+def _stub_markets(primary_samples=None):
+    """Aponta os provedores para o servidor local, com histogramas e circuit breakers novos."""
+    stub = StubMarkets()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    original = (binance_service.COINGECKO_MARKETS_URL, binance_service.CRYPTOCOMPARE_PRICEMULTI_URL,
+                binance_service.PROVIDERS)
+    binance_service.COINGECKO_MARKETS_URL = f"{stub.base}/coingecko/coins/markets"
+    binance_service.CRYPTOCOMPARE_PRICEMULTI_URL = f"{stub.base}/cryptocompare/data/pricemultifull"
+    binance_service.PROVIDERS = [
+        Provider("CoinGecko", binance_service._fetch_coingecko_snapshot),
+        Provider("CryptoCompare", binance_service._fetch_cryptocompare_prices)
+    ]
+    for seconds in primary_samples or []:
+        binance_service.PROVIDERS[0].latency.record(seconds)
+    circuit_breaker._breakers.clear()
+    try:
+        yield stub
+    finally:
+        stub.server.shutdown()
+        stub.server.server_close()
+        (binance_service.COINGECKO_MARKETS_URL, binance_service.CRYPTOCOMPARE_PRICEMULTI_URL,
+         binance_service.PROVIDERS) = original
+        circuit_breaker._breakers.clear()
+
+def _timed_snapshot(symbols):
+    start = time.monotonic()
+    snapshot = binance_service.get_market_snapshot(symbols)
+    return snapshot, time.monotonic() - start
+
+def test_fast_primary_is_not_hedged():
+    print("🧪 Primário rápido: secundário nunca é chamado...")
+    
+    with _stub_markets() as stub:
+        snapshot, _ = _timed_snapshot(["BTCUSDT", "ETHUSDT"])
+        assert snapshot["BTCUSDT"] == {"price": 100.0, "volume": 1e9}
+        assert stub.hits == {"coingecko": 1, "cryptocompare": 0}
+
+def test_slow_primary_is_hedged():
+    print("🧪 Primário lento: secundário disparado após o p95 e vence...")
+    
+    with _stub_markets(primary_samples=[0.05] * 50) as stub:
+        delay = binance_service.PROVIDERS[0].hedge_delay()
+        assert delay == max(providers.HEDGE_MIN_DELAY, binance_service.PROVIDERS[0].latency.percentile(95)), delay
+        
+        stub.delay["coingecko"] = 1.5
+        snapshot, elapsed = _timed_snapshot(["BTCUSDT"])
+        assert snapshot["BTCUSDT"] == {"price": 200.0, "volume": 2e9}
+        assert elapsed < 1.0, elapsed
+        assert stub.hits == {"coingecko": 1, "cryptocompare": 1}
+
+def test_primary_error_fires_secondary_immediately():
+    print("🧪 Erro no primário: secundário na hora, sem esperar o atraso de hedge...")
+    
+    with _stub_markets() as stub:
+        stub.status["coingecko"] = 500
+        snapshot, elapsed = _timed_snapshot(["SOLUSDT"])
+        assert snapshot["SOLUSDT"]["price"] == 200.0
+        assert elapsed < providers.HEDGE_DEFAULT_DELAY, elapsed
+
+def test_partial_answer_is_completed():
+    print("🧪 Resposta parcial do vencedor é completada pelo outro provedor...")
+    
+    with _stub_markets() as stub:
+        stub.omit.add("solana")
+        snapshot, _ = _timed_snapshot(["BTCUSDT", "SOLUSDT"])
+        assert snapshot["BTCUSDT"]["price"] == 100.0
+        assert snapshot["SOLUSDT"]["price"] == 200.0
+        
+        stub.status["cryptocompare"] = 500
+        stub.status["coingecko"] = 500
+        assert binance_service.get_market_snapshot(["BTCUSDT"]) == {}
+
+def test_hung_primary_times_out():
+    print("🧪 Primário travado: a resposta do hedge sai no PROVIDER_TIMEOUT, com o travamento contado como erro...")
+    
+    release = threading.Event()
+    
+    def hung(symbols):
+        release.wait()
+        return {symbol: {"price": 1.0, "volume": 1.0} for symbol in symbols}
+    
+    primary = Provider("travado", hung)
+    secondary = Provider("parcial", lambda symbols: {"BTCUSDT": {"price": 2.0, "volume": 2.0}})
+    previous = providers.PROVIDER_TIMEOUT, providers.HEDGE_DEFAULT_DELAY
+    providers.PROVIDER_TIMEOUT, providers.HEDGE_DEFAULT_DELAY = 0.5, 0.05
+    try:
+        start = time.monotonic()
+        snapshot = providers.hedged_fetch(["BTCUSDT", "ETHUSDT"], [primary, secondary])
+        elapsed = time.monotonic() - start
+    finally:
+        providers.PROVIDER_TIMEOUT, providers.HEDGE_DEFAULT_DELAY = previous
+        release.set()
+    
+    assert snapshot == {"BTCUSDT": {"price": 2.0, "volume": 2.0}}, snapshot
+    assert 0.5 <= elapsed < 1.5, elapsed
+    assert primary.stats()["errors"] == 1 and secondary.stats()["errors"] == 0
+
+def test_error_count_is_thread_safe():
+    print("🧪 Contador de erros do provedor sob threads concorrentes...")
+    
+    provider = Provider("instável", lambda symbols: {})
+    
+    def fail():
+        for _ in range(10000):
+            provider.record_error()
+    
+    threads = [threading.Thread(target=fail) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.stats()["errors"] == 80000
+
+def test_latency_histogram():
+    print("🧪 Histograma de latência: percentis e limites do atraso de hedge...")
+    
+    histogram = LatencyHistogram()
+    assert histogram.percentile(95) is None
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert 0.09 <= histogram.percentile(95) <= 0.12
+    assert 0.045 <= histogram.percentile(50) <= 0.065
+    
+    provider = Provider("lento", lambda symbols: {})
+    assert provider.hedge_delay() == providers.HEDGE_DEFAULT_DELAY
+    for _ in range(providers.HEDGE_MIN_SAMPLES):
+        provider.latency.record(30.0)
+    assert provider.hedge_delay() == providers.HEDGE_MAX_DELAY
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_slow_primary_is_hedged()
+    test_primary_error_fires_secondary_immediately()
+    test_partial_answer_is_completed()
+    test_hung_primary_times_out()
+    test_error_count_is_thread_safe()
+    test_latency_histogram()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,72 @@
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services import indicator_engine
+from src.config.services.indicator_engine import compute_indicators, numpy_available
+from src.config.services.statistics import detect_higher_lows, detect_sideways_movement, calculate_rsi
+
+STATISTICS_FUNCTIONS = ('calculate_trend_score', 'detect_higher_lows', 'calculate_momentum',
+                        'detect_sideways_movement', 'calculate_rsi', 'calculate_vwap')
+
+def _random_window(n, seed):
+    rng = random.Random(seed)
+    window = HistoryWindow()
+    price = 95000.0
+    ts = 1_700_000_000.0
+    for _ in range(n):
+        if rng.random() > 0.2:
+            price *= 1 + rng.gauss(0, 0.003)
+        ts += rng.choice([60, 290, 300, 300, 310])
+        volume = 0.0 if rng.random() < 0.05 else rng.uniform(2e10, 4e10)
+        window.append(price, volume, ts)
+    return window
+
+def _numpy_only(params, window):
+    """Motor numpy com as funções de statistics.py bloqueadas: nada pode cair nelas."""
+    def blocked(*args, **kwargs):
+        raise AssertionError("motor numpy chamou statistics.py")
+    originals = {name: getattr(indicator_engine, name) for name in STATISTICS_FUNCTIONS}
+    for name in originals:
+        setattr(indicator_engine, name, blocked)
+    try:
+        return compute_indicators(window, engine='numpy', **params)
+    finally:
+        for name, fn in originals.items():
+            setattr(indicator_engine, name, fn)
+
+def test_numpy_engine_matches_python():
+    if not numpy_available():
+        print("⚠️  numpy não instalado, pulando")
+        return
+    
+    print("🧪 Comparando motor numpy com statistics.py...")
+    
+    rng = random.Random(1)
+    cases = 0
+    for seed, n in enumerate([0, 1, 2, 5, 6, 7, 13, 50, 300, 2000] * 5):
+        window = _random_window(n, seed)
+        for minutes in (30, 60, 600):
+            params = dict(
+                recent_hours=rng.choice([1, 24]),
+                minutes=minutes,
+                sideways_threshold_pct=rng.choice([0.5, 1.0, 5.0]),
+                rsi_period=rng.choice([6, 14]),
+                vwap_hours=rng.choice([0.5, 1, 48])
+            )
+            expected = compute_indicators(window, engine='python', **params)
+            result = _numpy_only(params, window)
+            assert result == expected, (n, params)
+            assert result['pattern'] == detect_higher_lows(window, minutes=minutes)
+            assert result['sideways'] == detect_sideways_movement(window, minutes=minutes, threshold_pct=params['sideways_threshold_pct'])
+            assert result['rsi'] == calculate_rsi(window.last_hours(params['recent_hours']), period=params['rsi_period'])
+            cases += 1
+    
+    print(f"   {cases} combinações idênticas")
+
+if __name__ == "__main__":
+    test_numpy_engine_matches_python()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("boto3", "botocore", "requests", "numpy")
+
+def _loaded_after(code, enable_s3):
+    """Roda code num processo novo e retorna quais módulos pesados ficaram carregados."""
+    env = dict(os.environ, PYTHONPATH=ROOT, ENABLE_S3=enable_s3,
+               S3_BUCKET="test-bucket", TELEGRAM_BOT_TOKEN="test-token", TELEGRAM_CHAT_ID="test-chat")
+    script = f"import sys, json\n{code}\nprint(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_handler_import_is_lazy():
+    print("🧪 Importar o handler não carrega boto3, requests nem numpy...")
+    
+    for enable_s3 in ("true", "false"):
+        loaded = _loaded_after("from src.handlers import price_monitor", enable_s3)
+        assert loaded == [], (enable_s3, loaded)
+
+def test_modules_load_on_first_use():
+    print("🧪 Cada módulo pesado é carregado só no primeiro uso...")
+    
+    loaded = _loaded_after(
+        "from src.config.services import storage\n"
+        "client = storage._client()\n"
+        "assert storage._client() is client",
+        "true"
+    )
+    assert "boto3" in loaded and "requests" not in loaded
+    
+    loaded = _loaded_after(
+        "from src.config.services import http_client\n"
+        "http_client.get_session()",
+        "false"
+    )
+    assert loaded == ["requests"], loaded
+    
+    loaded = _loaded_after(
+        "from src.config.services.indicator_engine import compute_indicators\n"
+        "from src.config.services.history_window import HistoryWindow\n"
+        "compute_indicators(HistoryWindow(), recent_hours=1, engine='python')",
+        "false"
+    )
+    assert loaded == [], loaded
+
+if __name__ == "__main__":
+    test_handler_import_is_lazy()
+    test_modules_load_on_first_use()
+    print("\n✅ Todos os testes passaram")
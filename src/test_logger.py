@@ -0,0 +1,121 @@
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+os.environ.setdefault("S3_BUCKET", "test-bucket")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "test-chat")
+
+from src.config.services import logger, storage
+from src.handlers import price_monitor
+
+class Explodes:
+    """Argumento que falha se alguém tentar formatá-lo."""
+
+    def __format__(self, spec):
+        raise AssertionError("linha desligada não deveria ser formatada")
+
+@contextlib.contextmanager
+def _level(level, fmt="json"):
+    original = (logger.LOG_LEVEL, logger.LOG_FORMAT)
+    logger.LOG_LEVEL, logger.LOG_FORMAT = level, fmt
+    try:
+        yield
+    finally:
+        logger.LOG_LEVEL, logger.LOG_FORMAT = original
+
+def _lines(fn):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        fn()
+    return output.getvalue().splitlines()
+
+def test_level_gating_is_lazy():
+    print("🧪 Linhas abaixo do nível não são formatadas nem gravadas...")
+
+    with _level(logger.INFO):
+        lines = _lines(lambda: (logger.debug("{}", Explodes()), logger.info("{:.1f}%", 12.345)))
+        assert [json.loads(line) for line in lines] == [{"level": "INFO", "msg": "12.3%"}]
+        assert not logger.enabled(logger.DEBUG) and logger.enabled(logger.WARNING)
+
+    with _level(logger.ERROR):
+        assert _lines(lambda: (logger.warning("x"), logger.event("symbol", price=1.0))) == []
+
+def test_json_records_and_context():
+    print("🧪 JSON compacto com os campos do contexto; formato texto para uso local...")
+
+    def emit():
+        with logger.context(symbol="BTCUSDT"):
+            logger.debug("z {:+.2f}σ", 1.5)
+            logger.event("symbol", result="ok", alerts=["combined"])
+        logger.warning("fora do contexto")
+
+    with _level(logger.DEBUG):
+        records = [json.loads(line) for line in _lines(emit)]
+    assert records == [
+        {"level": "DEBUG", "msg": "z +1.50σ", "symbol": "BTCUSDT"},
+        {"level": "INFO", "symbol": "BTCUSDT", "event": "symbol", "result": "ok", "alerts": ["combined"]},
+        {"level": "WARNING", "msg": "fora do contexto"}
+    ]
+
+    with _level(logger.DEBUG, fmt="text"):
+        assert _lines(emit) == ["z +1.50σ symbol=BTCUSDT",
+                                "symbol=BTCUSDT event=symbol result=ok alerts=['combined']",
+                                "fora do contexto"]
+
+def test_handler_logs_one_record_per_symbol():
+    print("🧪 No nível INFO, o handler grava um evento por símbolo e um da invocação...")
+
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    clock = {"now": 1_700_000_000.0}
+    patched = {
+        "SYMBOLS": symbols,
+        "get_market_snapshot": lambda requested: {s: {"price": 100.0 + clock["now"] % 11, "volume": 1e6} for s in requested},
+        "send_message": lambda *args: None,
+        "time": types.SimpleNamespace(time=lambda: clock["now"], strftime=lambda *args: "")
+    }
+    originals = {name: getattr(price_monitor, name) for name in patched}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        storage.clear_cache()
+        os.environ["LOCAL_MODE"] = "true"
+        for name, value in patched.items():
+            setattr(price_monitor, name, value)
+        try:
+            def run():
+                for _ in range(15):
+                    clock["now"] += 300
+                    price_monitor.lambda_handler({}, {})
+            with _level(logger.INFO):
+                lines = [line for line in _lines(run) if line.startswith("{")]
+            with _level(logger.DEBUG):
+                verbose = _lines(lambda: price_monitor.lambda_handler({}, {}))
+        finally:
+            for name, value in originals.items():
+                setattr(price_monitor, name, value)
+            os.environ.pop("LOCAL_MODE", None)
+            os.chdir(cwd)
+            storage.clear_cache()
+
+    records = [json.loads(line) for line in lines]
+    assert all(record["level"] == "INFO" for record in records), records
+    per_symbol = [record for record in records if record["event"] == "symbol"]
+    assert len(per_symbol) == 15 * len(symbols)
+    assert len([record for record in records if record["event"] == "invocation"]) == 15
+    last = per_symbol[-1]
+    assert last["symbol"] == "SOLUSDT" and last["result"] == "ok"
+    assert {"price", "volume", "price_z", "volume_z", "trend", "vwap", "alerts"} <= set(last)
+    assert len(verbose) > 3 * len(symbols), "DEBUG traz a narrativa completa"
+
+if __name__ == "__main__":
+    test_level_gating_is_lazy()
+    test_json_records_and_context()
+    test_handler_logs_one_record_per_symbol()
+    print("\n✅ Todos os testes passaram")
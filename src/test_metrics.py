@@ -0,0 +1,135 @@
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import types
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+os.environ.setdefault("S3_BUCKET", "test-bucket")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "test-chat")
+
+from src.config.services import metrics, storage
+from src.handlers import price_monitor
+
+def test_timers_only_inside_invocation():
+    print("🧪 Fora de uma invocação os cronômetros não medem nada...")
+
+    with metrics.timer("fora"):
+        pass
+    metrics.count("fora")
+    assert "fora" not in metrics.summary()
+
+    metrics.begin_invocation()
+    with metrics.timer("dentro"):
+        pass
+    assert metrics.summary()["dentro"]["n"] == 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics.emit()
+    with metrics.timer("depois"):
+        pass
+    assert "depois" not in metrics.summary()
+
+def test_per_symbol_aggregation_across_threads():
+    print("🧪 Etapas agregadas por símbolo, cada thread no seu escopo...")
+
+    metrics.begin_invocation()
+
+    def work(symbol, repeats):
+        with metrics.symbol_scope(symbol):
+            for _ in range(repeats):
+                with metrics.timer("history_read"):
+                    pass
+                metrics.count("sentiment_cache_hits")
+
+    threads = [threading.Thread(target=work, args=(s, n)) for s, n in (("BTCUSDT", 3), ("ETHUSDT", 5))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with metrics.timer("market"):
+        pass
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        document = metrics.emit(dimensions={"Service": "teste"}, timestamp=1_700_000_000)
+
+    line = json.loads(output.getvalue().strip())
+    assert line == json.loads(json.dumps(document, ensure_ascii=False))
+    assert line["_aws"]["Timestamp"] == 1_700_000_000_000
+    directive = line["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Dimensions"] == [["Service"]] and line["Service"] == "teste"
+    names = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+    assert names == {"history_read": "Milliseconds", "market": "Milliseconds", "sentiment_cache_hits": "Count"}
+
+    assert len(line["history_read"]) == 8 and line["sentiment_cache_hits"] == 8
+    assert line["symbols"]["BTCUSDT"]["sentiment_cache_hits"] == 3
+    assert line["symbols"]["ETHUSDT"]["sentiment_cache_hits"] == 5
+    assert "market" not in line["symbols"]["BTCUSDT"], "etapa fora do escopo não é do símbolo"
+    assert line["stages"]["history_read"]["n"] == 8
+
+def test_emf_value_limit():
+    print("🧪 Mais de 100 valores: estatísticas de ordem com mínimo e máximo...")
+
+    values = [i / 1000 for i in range(1000)]
+    sampled = metrics._downsample(values, metrics.EMF_MAX_VALUES)
+    assert len(sampled) == 100
+    assert sampled[0] == values[0] and sampled[-1] == values[-1]
+    assert sampled == sorted(sampled)
+    assert metrics._downsample(values[:10], 100) == values[:10]
+
+def test_handler_writes_one_line_in_local_mode():
+    print("🧪 lambda_handler em LOCAL_MODE grava uma linha EMF por invocação...")
+
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    clock = {"now": 1_700_000_000.0}
+    patched = {
+        "SYMBOLS": symbols,
+        "get_market_snapshot": lambda requested: {s: {"price": 100.0 + clock["now"] % 7, "volume": 1e6} for s in requested},
+        "send_message": lambda *args: None,
+        "time": types.SimpleNamespace(time=lambda: clock["now"], strftime=lambda *args: "")
+    }
+    originals = {name: getattr(price_monitor, name) for name in patched}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        storage.clear_cache()
+        original_file = metrics.METRICS_FILE
+        metrics.METRICS_FILE = Path(tmp) / "metrics.jsonl"
+        os.environ["LOCAL_MODE"] = "true"
+        for name, value in patched.items():
+            setattr(price_monitor, name, value)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for tick in range(3):
+                    clock["now"] += 300 * tick
+                    price_monitor.lambda_handler({}, {})
+            lines = metrics.METRICS_FILE.read_text().splitlines()
+        finally:
+            for name, value in originals.items():
+                setattr(price_monitor, name, value)
+            os.environ.pop("LOCAL_MODE", None)
+            metrics.METRICS_FILE = original_file
+            os.chdir(cwd)
+            storage.clear_cache()
+
+    assert len(lines) == 3
+    last = json.loads(lines[-1])
+    for stage in ("invocation", "market", "prefetch", "flush", "symbol",
+                  "state_read", "history_read", "history_write", "state_write"):
+        assert stage in last["stages"], stage
+    assert last["stages"]["symbol"]["n"] == 2
+    assert set(last["symbols"]) == set(symbols)
+    assert last["s3_put"] >= 2 and last["symbol_errors"] == 0
+
+if __name__ == "__main__":
+    test_timers_only_inside_invocation()
+    test_per_symbol_aggregation_across_threads()
+    test_emf_value_limit()
+    test_handler_writes_one_line_in_local_mode()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,145 @@
+import sys
+import os
+import contextlib
+import io
+import tempfile
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+os.environ.setdefault("S3_BUCKET", "test-bucket")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "test-chat")
+
+from src import replay
+from src.config.services import storage
+from src.handlers import price_monitor
+
+def test_replay_matches_live_pipeline():
+    print("🧪 Replay gera os mesmos alertas que process_symbol com storage local...")
+
+    series = replay.synthetic_series(400, seed=7)
+    live = []
+    cwd = os.getcwd()
+    original = price_monitor.get_sentiment_data
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        storage.clear_cache()
+        price_monitor.get_sentiment_data = replay._replay_sentiment
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(len(series)):
+                    storage.begin_invocation()
+                    price_monitor.process_symbol(
+                        "BTCUSDT",
+                        {"price": series.prices[i], "volume": series.volumes[i]},
+                        series.timestamps[i],
+                        lambda text, kind=None: live.append(kind)
+                    )
+                    storage.flush()
+        finally:
+            price_monitor.get_sentiment_data = original
+            os.chdir(cwd)
+            storage.clear_cache()
+
+    result = replay.replay(series, "BTCUSDT")
+    counts = {}
+    for kind in live:
+        counts[kind] = counts.get(kind, 0) + 1
+
+    assert result['ticks'] == 400
+    assert result['total_alerts'] > 0, "a série sintética deveria gerar alertas"
+    assert result['alerts'] == counts, (result['alerts'], counts)
+
+def test_live_accumulators_match_state():
+    print("🧪 Acumuladores vivos (live) = recriados de state['indicators'] a cada tick...")
+
+    series = replay.synthetic_series(1500, seed=5)
+    hours = price_monitor.history_hours()
+    runs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for live in (None, {}):
+            state = replay._default_symbol_state()
+            fired = []
+            window = replay.HistoryWindow()
+            for i in range(len(series)):
+                ts = series.timestamps[i]
+                window.append(series.prices[i], series.volumes[i], ts)
+                window.drop_before(ts - hours * 3600)
+                window.start_ts = ts - hours * 3600
+                summary = {}
+                result = price_monitor.evaluate_symbol(
+                    "BTCUSDT", series.prices[i], series.volumes[i], ts, state, window,
+                    lambda text, kind=None: fired.append((i, text)),
+                    sentiment=replay._replay_sentiment, summary=summary, live=live
+                )
+                fired.append((i, result, sorted(summary.items())))
+            runs.append((fired, state, live))
+
+    (fired, state, _), (live_fired, live_state, live) = runs
+    assert live_fired == fired
+    assert set(live) == {'rolling', 'extremes', 'rsi'}
+    assert live_state['indicators'] == {} and state['indicators'], "com live, o estado não recebe os acumuladores"
+
+def test_clock_is_injected():
+    print("🧪 Cooldown do alerta combinado usa o relógio da amostra, não time.time()...")
+
+    series = replay.synthetic_series(2000, seed=3)
+    short = replay.replay(series, "BTCUSDT", dict(price_monitor.ALERT_PARAMS, ALERT_COOLDOWN_MINUTES=5))
+    long = replay.replay(series, "BTCUSDT", dict(price_monitor.ALERT_PARAMS, ALERT_COOLDOWN_MINUTES=600))
+    assert short['alerts'].get('combined', 0) > long['alerts'].get('combined', 0) > 0
+
+    first, second = replay.replay(series, "BTCUSDT"), replay.replay(series, "BTCUSDT")
+    assert (first['alerts'], first['hits']) == (second['alerts'], second['hits']), "replay deve ser determinístico"
+
+def test_hit_rate():
+    print("🧪 Acerto: movimento >= hit_pct dentro do horizonte...")
+
+    ts = array('d', [0, 60, 120, 180, 3600 * 3])
+    prices = array('d', [100, 100.5, 99.2, 100, 150])
+    assert replay._is_hit(ts, prices, 0, horizon_minutes=5, hit_pct=0.5)
+    assert not replay._is_hit(ts, prices, 0, horizon_minutes=5, hit_pct=1.0)
+    assert not replay._is_hit(ts, prices, 3, horizon_minutes=60, hit_pct=1.0), "o pico está fora do horizonte"
+    assert not replay._is_hit(ts, prices, 4, horizon_minutes=60, hit_pct=0.1), "sem amostras depois"
+
+def test_parse_grid():
+    print("🧪 Grade: produto cartesiano com os tipos de ALERT_PARAMS...")
+
+    grid = replay.parse_grid(["MIN_VOLUME_Z=0.5,1", "ALERT_COOLDOWN_MINUTES=15,30,60"])
+    assert len(grid) == 6
+    assert grid[0] == {"MIN_VOLUME_Z": 0.5, "ALERT_COOLDOWN_MINUTES": 15}
+    assert isinstance(grid[-1]["ALERT_COOLDOWN_MINUTES"], int)
+    assert replay.parse_grid([]) == [{}]
+
+    for bad in ["NAO_EXISTE=1", "VARIATION_DICT=1"]:
+        try:
+            replay.parse_grid([bad])
+            assert False, bad
+        except ValueError:
+            pass
+
+def test_grid_in_parallel_matches_sequential():
+    print("🧪 Grade em processos paralelos = grade no próprio processo...")
+
+    series = {
+        "BTCUSDT": replay.synthetic_series(600, seed=1),
+        "ETHUSDT": replay.synthetic_series(600, seed=2)
+    }
+    grid = replay.parse_grid(["MIN_VOLUME_Z=0.5,2"])
+    sequential = replay.run_grid(series, grid, workers=1)
+    parallel = replay.run_grid(series, grid, workers=2)
+
+    assert [r['params'] for r in parallel] == grid
+    for a, b in zip(sequential, parallel):
+        assert (a['alerts'], a['hits'], a['ticks']) == (b['alerts'], b['hits'], b['ticks'])
+        assert a['ticks'] == 1200
+        assert a['total_alerts'] == sum(r['total_alerts'] for r in a['symbols'].values())
+
+if __name__ == "__main__":
+    test_replay_matches_live_pipeline()
+    test_live_accumulators_match_state()
+    test_clock_is_injected()
+    test_hit_rate()
+    test_parse_grid()
+    test_grid_in_parallel_matches_sequential()
+    print("\n✅ Todos os testes passaram")
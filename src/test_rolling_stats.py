@@ -0,0 +1,86 @@
+import sys
+import os
+import random
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.incremental import RollingWindowStats
+from src.config.services.statistics import (
+    filter_recent_history, get_price_statistics, get_volume_statistics, check_anomaly
+)
+
+def _random_walk(n, seed):
+    rng = random.Random(seed)
+    price = 95000.0
+    ts = 1_700_000_000.0
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.003)
+        ts += rng.choice([290, 300, 300, 310])
+        yield price, rng.uniform(2e10, 4e10), ts
+
+def test_rolling_matches_statistics_module():
+    print("🧪 Comparando acumulador incremental com statistics.mean/stdev...")
+    
+    hours = 24
+    window = HistoryWindow()
+    rolling = RollingWindowStats()
+    max_rel_error = 0.0
+    max_z_error = 0.0
+    
+    for i, (price, volume, ts) in enumerate(_random_walk(3000, seed=42)):
+        window.append(price, volume, ts)
+        loaded = window.since(ts - (hours + 1) * 3600)
+        loaded.start_ts = ts - (hours + 1) * 3600
+        rolling.sync(loaded, hours)
+        
+        recent = filter_recent_history(window, hours)
+        if len(recent) < 10:
+            continue
+        
+        for exact, fast, value in (
+            (get_price_statistics(recent), rolling.price_statistics(), price),
+            (get_volume_statistics(recent), rolling.volume_statistics(), volume),
+        ):
+            assert fast['count'] == exact['count']
+            max_rel_error = max(max_rel_error,
+                                abs(fast['mean'] - exact['mean']) / exact['mean'],
+                                abs(fast['std_dev'] - exact['std_dev']) / exact['std_dev'])
+            _, z_exact = check_anomaly(value, exact['mean'], exact['std_dev'])
+            _, z_fast = check_anomaly(value, fast['mean'], fast['std_dev'])
+            max_z_error = max(max_z_error, abs(z_fast - z_exact))
+    
+    print(f"   Erro relativo máximo (média/desvio): {max_rel_error:.2e}")
+    print(f"   Erro absoluto máximo no z-score: {max_z_error:.2e}")
+    assert max_rel_error < 1e-9
+    assert max_z_error < 1e-6
+
+def test_rolling_survives_persistence_and_gaps():
+    print("🧪 Estado persistido, lacunas e janela constante...")
+    
+    hours = 1
+    window = HistoryWindow()
+    state = None
+    for i, (price, volume, ts) in enumerate(_random_walk(200, seed=7)):
+        if 80 <= i < 100:
+            continue
+        if i >= 150:
+            price = 100.0
+        window.append(price, volume, ts)
+        rolling = RollingWindowStats.from_dict(state)
+        rolling.sync(window, hours)
+        state = rolling.to_dict()
+        
+        exact = get_price_statistics(filter_recent_history(window, hours))
+        assert rolling.price.count == exact['count']
+        assert abs(rolling.price.mean - exact['mean']) <= 1e-9 * exact['mean']
+        assert abs(rolling.price.std_dev - exact['std_dev']) <= 1e-6 * exact['mean']
+    
+    assert rolling.price_statistics()['std_dev'] == 0.0
+    print("   ✅ OK")
+
+if __name__ == "__main__":
+    test_rolling_matches_statistics_module()
+    test_rolling_survives_persistence_and_gaps()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,125 @@
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services import sentiment_service
+from src.config.services.ttl_cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+    
+    def __call__(self):
+        return self.now
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.text = "erro"
+        self._payload = payload
+    
+    def json(self):
+        return self._payload
+
+def _coin_document(volume, votes=72.0):
+    return {
+        "sentiment_votes_up_percentage": votes,
+        "public_interest_score": 3.5,
+        "market_data": {"total_volume": {"usd": volume}},
+        "community_data": {"twitter_followers": 1000, "reddit_subscribers": 10}
+    }
+
+class FakeCoinGecko:
+    """Substitui http_client.get: conta chamadas e responde o que estiver em self.response."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.response = FakeResponse(200, _coin_document(6e9))
+    
+    def get(self, url):
+        self.calls += 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+def _with_cache(test):
+    def run():
+        clock = FakeClock()
+        api = FakeCoinGecko()
+        original = sentiment_service._cache, sentiment_service.http_client.get
+        with tempfile.TemporaryDirectory() as tmp:
+            sentiment_service._cache = TTLCache(Path(tmp) / "sentiment_cache.json", clock=clock)
+            sentiment_service.http_client.get = api.get
+            try:
+                test(clock, api, Path(tmp) / "sentiment_cache.json")
+            finally:
+                sentiment_service._cache, sentiment_service.http_client.get = original
+    run.__name__ = test.__name__
+    return run
+
+@_with_cache
+def test_profile_ttl_and_volume_ttl(clock, api, path):
+    print("🧪 Perfil em cache por SENTIMENT_TTL, volume por SENTIMENT_VOLUME_TTL...")
+    
+    first = sentiment_service.get_sentiment_data("SOLUSDT", previous_volume=5e9)
+    assert api.calls == 1 and first["menções_30min"] == 6000 and first["sentimento_atual"] == 72.0
+    
+    clock.now += 60
+    assert sentiment_service.get_sentiment_data("SOLUSDT", previous_volume=5e9) == first
+    assert api.calls == 1
+    
+    clock.now += sentiment_service.SENTIMENT_VOLUME_TTL
+    sentiment_service.get_sentiment_data("SOLUSDT", previous_volume=5e9)
+    assert api.calls == 2
+    
+    clock.now += sentiment_service.SENTIMENT_VOLUME_TTL + 1
+    with_snapshot = sentiment_service.get_sentiment_data("SOLUSDT", previous_volume=5e9, current_volume=7e9)
+    assert api.calls == 2
+    assert with_snapshot["menções_30min"] == 7000 and with_snapshot["percent_aumento"] == 40.0
+    
+    clock.now += sentiment_service.SENTIMENT_TTL + 1
+    sentiment_service.get_sentiment_data("SOLUSDT", current_volume=7e9)
+    assert api.calls == 3
+
+@_with_cache
+def test_stale_on_failure(clock, api, path):
+    print("🧪 API fora do ar: dado antigo do cache em vez do mock...")
+    
+    sentiment_service.get_sentiment_data("ETHUSDT")
+    clock.now += sentiment_service.SENTIMENT_TTL * 3
+    
+    api.response = FakeResponse(429)
+    stale = sentiment_service.get_sentiment_data("ETHUSDT", current_volume=6e9)
+    assert stale["sentimento_atual"] == 72.0 and stale["lista_kols"] == ["CoinGecko Community"]
+    
+    api.response = ConnectionError("timeout")
+    assert sentiment_service.get_sentiment_data("ETHUSDT")["sentimento_atual"] == 72.0
+    
+    clock.now += sentiment_service.SENTIMENT_STALE_MAX_AGE
+    assert sentiment_service.get_sentiment_data("ETHUSDT")["lista_kols"] == ["Mock"]
+    assert sentiment_service.get_sentiment_data("BTCUSDT")["lista_kols"] == ["Mock"]
+
+@_with_cache
+def test_persistence_and_lru(clock, api, path):
+    print("🧪 Cache persistido em arquivo (invocação quente) com despejo LRU...")
+    
+    sentiment_service.get_sentiment_data("SOLUSDT")
+    reloaded = TTLCache(path, clock=clock)
+    assert reloaded.get("solana:profile")[0]["twitter_followers"] == 1000
+    
+    small = TTLCache(path, max_entries=2, clock=clock)
+    small.put("a", 1)
+    small.put("b", 2)
+    small.get("a")
+    small.put("c", 3)
+    assert small.get("b") is None and small.get("a") == (1, 0.0)
+    assert TTLCache(path, clock=clock).get("c") == (3, 0.0)
+
+if __name__ == "__main__":
+    test_profile_ttl_and_volume_ttl()
+    test_stale_on_failure()
+    test_persistence_and_lru()
+    print("\n✅ Todos os testes passaram")
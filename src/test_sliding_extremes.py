@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.incremental import SlidingExtremes, WindowExtremes
+from src.config.services.statistics import detect_sideways_movement, detect_higher_lows
+
+def _ticks(n, rng):
+    price = 95000.0
+    ts = 1_700_000_000.0
+    for _ in range(n):
+        ts += rng.choice([1, 30, 60, 300, 300, 900, 4000]) if rng.random() > 0.02 else 0
+        if rng.random() > 0.3:
+            price = round(price * (1 + rng.gauss(0, 0.003)), rng.choice([2, 8]))
+        yield price, ts
+
+def test_window_extremes_match_statistics_module():
+    print("🧪 Propriedade: extremos deslizantes == detect_sideways_movement/detect_higher_lows...")
+    
+    rng = random.Random(2024)
+    checks = 0
+    for case in range(150):
+        minutes = rng.choice([10, 60, 180])
+        threshold = rng.choice([0.1, 1.0, 5.0])
+        window = HistoryWindow()
+        state = None
+        for price, ts in _ticks(rng.randint(1, 400), rng):
+            window.append(price, 1.0, ts)
+            
+            extremes = WindowExtremes.from_dict(json.loads(json.dumps(state)) if state else None)
+            extremes.sync(window, minutes)
+            state = extremes.to_dict()
+            
+            assert extremes.pattern() == detect_higher_lows(window, minutes=minutes), (case, ts)
+            
+            expected = detect_sideways_movement(window, minutes=minutes, threshold_pct=threshold)
+            result = extremes.sideways(threshold)
+            expected_vol = expected.pop('volatility_pct')
+            result_vol = result.pop('volatility_pct')
+            assert abs(result_vol - expected_vol) <= 1e-9 * max(1.0, expected_vol), (case, ts)
+            if abs(expected_vol - threshold) > 1e-9:
+                assert result == expected, (case, ts)
+            checks += 1
+    
+    print(f"   {checks} ticks verificados")
+
+def test_sliding_extremes_range_moves():
+    print("🧪 Intervalo que avança, pula e recua...")
+    
+    rng = random.Random(7)
+    window = HistoryWindow()
+    for i in range(500):
+        window.append(rng.uniform(90, 110), 1.0, 1_700_000_000.0 + i * 60)
+    
+    extremes = SlidingExtremes()
+    lo, hi = 0, 1
+    for _ in range(2000):
+        step = rng.random()
+        if step < 0.05:
+            lo = rng.randrange(0, 499)
+            hi = rng.randrange(lo + 1, 501)
+        else:
+            hi = min(500, hi + rng.randint(0, 3))
+            lo = min(hi - 1, lo + rng.randint(0, 3))
+        extremes.update(window, lo, hi)
+        
+        assert extremes.min == min(window.prices[lo:hi])
+        assert extremes.max == max(window.prices[lo:hi])
+        assert extremes.count == hi - lo
+        if hi == 500 and lo == 499:
+            lo, hi = 0, 1
+
+if __name__ == "__main__":
+    test_window_extremes_match_statistics_module()
+    test_sliding_extremes_range_moves()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+
+import boto3
+from botocore.stub import Stubber
+
+from src.config.services import storage
+from src.testing import local_data_dir
+
+def test_warm_reads_are_revalidated():
+    print("🧪 Cache quente: hit sem download, miss quando o objeto muda...")
+    
+    with local_data_dir():
+        storage.write_object("bucket", "state/BTCUSDT.json", b'{"v": 1}')
+        
+        storage.begin_invocation()
+        assert storage.read_object("bucket", "state/BTCUSDT.json") == b'{"v": 1}'
+        counters = storage.flush()
+        assert counters['cache_hits'] == 1 and counters['bytes_read'] == 0
+        
+        (storage.LOCAL_DATA_DIR / "state" / "BTCUSDT.json").write_bytes(b'{"v": 22}')
+        
+        storage.begin_invocation()
+        assert storage.read_object("bucket", "state/BTCUSDT.json") == b'{"v": 22}'
+        counters = storage.flush()
+        assert counters['cache_misses'] == 1 and counters['bytes_read'] == 9
+        
+        storage.delete_object("bucket", "state/BTCUSDT.json")
+        assert storage.get_counters()['cache_objects'] == 0
+        assert storage.read_object("bucket", "state/BTCUSDT.json") is None
+
+def test_lru_byte_budget():
+    print("🧪 Orçamento de bytes com despejo LRU...")
+    
+    budget = storage.S3_CACHE_MAX_BYTES
+    storage.S3_CACHE_MAX_BYTES = 250
+    try:
+        with local_data_dir():
+            for name in ("a", "b", "c"):
+                storage.write_object("bucket", f"k/{name}", name.encode() * 100)
+            counters = storage.get_counters()
+            assert counters['cache_objects'] == 2 and counters['cache_bytes'] == 200
+            
+            storage.read_object("bucket", "k/b")
+            storage.write_object("bucket", "k/d", b"d" * 100)
+            storage.begin_invocation()
+            for name in ("b", "d", "c"):
+                storage.read_object("bucket", f"k/{name}")
+            counters = storage.flush()
+            assert counters['cache_hits'] == 2 and counters['cache_misses'] == 1
+            
+            storage.write_object("bucket", "k/big", b"x" * 300)
+            assert storage.get_counters()['cache_bytes'] <= 250
+    finally:
+        storage.S3_CACHE_MAX_BYTES = budget
+
+def test_s3_not_modified():
+    print("🧪 S3: IfNoneMatch com o ETag guardado e resposta 304...")
+    
+    client = boto3.client("s3", region_name="us-east-1",
+                          aws_access_key_id="test", aws_secret_access_key="test")
+    previous = storage.ENABLE_S3, storage.s3
+    storage.ENABLE_S3, storage.s3 = True, client
+    storage.clear_cache()
+    try:
+        with Stubber(client) as stub:
+            stub.add_response("put_object", {"ETag": '"v1"'},
+                              {"Bucket": "bucket", "Key": "state/ETHUSDT.json", "Body": b"{}",
+                               "ContentType": "application/json"})
+            stub.add_client_error("get_object", service_error_code="304", http_status_code=304,
+                                  expected_params={"Bucket": "bucket", "Key": "state/ETHUSDT.json",
+                                                   "IfNoneMatch": '"v1"'})
+            
+            storage.write_object("bucket", "state/ETHUSDT.json", b"{}")
+            storage.begin_invocation()
+            assert storage.read_object("bucket", "state/ETHUSDT.json") == b"{}"
+            counters = storage.flush()
+            assert counters['get'] == 1 and counters['cache_hits'] == 1 and counters['bytes_read'] == 0
+            stub.assert_no_pending_responses()
+    finally:
+        storage.ENABLE_S3, storage.s3 = previous
+        storage.clear_cache()
+
+if __name__ == "__main__":
+    test_warm_reads_are_revalidated()
+    test_lru_byte_budget()
+    test_s3_not_modified()
+    print("\n✅ Todos os testes passaram")
@@ -0,0 +1,57 @@
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENABLE_S3"] = "false"
+
+from src.config.services import storage
+from src.testing import local_data_dir
+from src.config.services.s3_service import load_symbol_state, save_symbol_state
+
+def test_migrates_legacy_files():
+    print("🧪 Migração de stats/alert_state/last_prices para state/...")
+    
+    with local_data_dir():
+        data = storage.LOCAL_DATA_DIR
+        data.mkdir()
+        (data / "BTCUSDT_stats.json").write_text(json.dumps({'all_time_high': 110.0, 'all_time_low': 90.0}))
+        (data / "BTCUSDT_alert_state.json").write_text(json.dumps({
+            'last_alert_ts': 1700000000.0, 'was_sideways': True, 'rolling': {'updates': 3}
+        }))
+        (data / "last_prices.json").write_text(json.dumps({'BTCUSDT': {'price': 100.0, 'timestamp': 1700000300.0}}))
+        
+        state = load_symbol_state("bucket", "BTCUSDT")
+        
+        assert state['stats']['all_time_high'] == 110.0
+        assert state['alert']['last_alert_ts'] == 1700000000.0
+        assert state['alert']['was_sideways'] is True
+        assert state['alert']['last_sideways_alert_ts'] == 0
+        assert 'rolling' not in state['alert']
+        assert state['indicators'] == {'rolling': {'updates': 3}}
+        assert state['last_price'] == {'price': 100.0, 'timestamp': 1700000300.0}
+        
+        assert (data / "state" / "BTCUSDT.json").exists()
+        assert not (data / "BTCUSDT_stats.json").exists()
+        assert not (data / "BTCUSDT_alert_state.json").exists()
+        assert load_symbol_state("bucket", "BTCUSDT") == state
+
+def test_round_trip_and_defaults():
+    print("🧪 Estado novo, gravação e leitura...")
+    
+    with local_data_dir():
+        state = load_symbol_state("bucket", "ETHUSDT")
+        assert state['last_price'] is None
+        assert state['stats']['all_time_low'] == float('inf')
+        assert not (storage.LOCAL_DATA_DIR / "state").exists()
+        
+        state['last_price'] = {'price': 2000.0, 'timestamp': 1700000000.0}
+        state['alert']['was_sideways'] = True
+        save_symbol_state("bucket", "ETHUSDT", state)
+        
+        assert load_symbol_state("bucket", "ETHUSDT") == state
+
+if __name__ == "__main__":
+    test_migrates_legacy_files()
+    test_round_trip_and_defaults()
+    print("\n✅ Todos os testes passaram")
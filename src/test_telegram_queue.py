@@ -0,0 +1,148 @@
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services import telegram_queue, telegram_service
+from src.config.services.rate_limiter import TokenBucket
+from src.config.services.telegram_queue import (
+    NotificationQueue, coalesce_messages, split_message, SYMBOL_SEPARATOR
+)
+from src.config.services.telegram_service import RetryAfter
+
+class FakeClock:
+    """Relógio manual: sleep() só avança o tempo."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_token_bucket():
+    print("🧪 Token bucket: rajada, reposição e pausa por retry_after...")
+    
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 1.0]
+    
+    clock.now += 10
+    bucket.pause(5)
+    assert bucket.acquire() == 5.0
+    assert bucket.acquire() == 1.0
+    
+    unlimited = TokenBucket(rate=0, clock=clock, sleep=clock.sleep)
+    assert sum(unlimited.acquire() for _ in range(100)) == 0.0
+
+def test_coalesce_and_split():
+    print("🧪 Alertas do símbolo juntados em mensagens de até 4096 caracteres...")
+    
+    alerts = [f"BTCUSDT\n{'*Alerta*'} {i}\n" + "linha\n" * 300 for i in range(5)]
+    messages = coalesce_messages(alerts, SYMBOL_SEPARATOR)
+    assert all(len(m) <= 4096 for m in messages)
+    assert len(messages) < len(alerts)
+    assert SYMBOL_SEPARATOR.join(messages) == SYMBOL_SEPARATOR.join(alerts)
+    
+    huge = "cabeçalho\n" + "x" * 9000 + "\nrodapé"
+    parts = split_message(huge)
+    assert all(len(p) <= 4096 for p in parts)
+    assert "".join(parts).replace("\n", "") == huge.replace("\n", "")
+    
+    assert coalesce_messages(["a", "b"], "\n\n") == ["a\n\nb"]
+
+def test_queue_retry_after_and_drop():
+    print("🧪 Fila: 429 com retry_after, descarte após esgotar tentativas...")
+    
+    clock = FakeClock()
+    limiter = TokenBucket(rate=0, clock=clock, sleep=clock.sleep)
+    sent = []
+    attempts = {"BTC": 0}
+    
+    def send(text):
+        if text.startswith("BTC"):
+            attempts["BTC"] += 1
+            if attempts["BTC"] == 1:
+                raise RetryAfter(7)
+        if text.startswith("SOL"):
+            raise RetryAfter(1)
+        sent.append(text)
+    
+    notifications = NotificationQueue(send, coalesce='symbol', limiter=limiter, max_retries=2, clock=clock)
+    notifications.submit("BTCUSDT", ["BTC variação", "BTC recorde"])
+    notifications.submit("ETHUSDT", ["ETH combinado"])
+    notifications.submit("SOLUSDT", ["SOL extremo"])
+    counters = notifications.close(timeout=5)
+    
+    assert sent == ["BTC variação\n\nBTC recorde", "ETH combinado"], sent
+    assert clock.sleeps[0] == 7
+    assert counters['alerts'] == 4 and counters['messages'] == 3
+    assert counters['sent'] == 2 and counters['dropped'] == 1 and counters['retries'] == 4
+
+def test_queue_drain_timeout():
+    print("🧪 Fila: mensagens não enviadas no timeout contam como descartadas...")
+    
+    release = threading.Event()
+    
+    def slow_send(text):
+        release.wait(5)
+    
+    notifications = NotificationQueue(slow_send, coalesce='none', limiter=TokenBucket(rate=0))
+    notifications.submit("BTCUSDT", ["a", "b", "c"])
+    counters = notifications.close(timeout=0.05)
+    release.set()
+    assert counters['messages'] == 3 and counters['sent'] == 0 and counters['dropped'] == 3
+
+def test_queue_drain_budget_covers_rate_limit():
+    print("🧪 Fila: o timeout padrão cobre a espera do limite de taxa...")
+    
+    original = telegram_queue.TELEGRAM_DRAIN_TIMEOUT
+    telegram_queue.TELEGRAM_DRAIN_TIMEOUT = 0.05
+    try:
+        sent = []
+        notifications = NotificationQueue(sent.append, coalesce='none', limiter=TokenBucket(rate=20, capacity=1))
+        notifications.submit("BTCUSDT", [str(i) for i in range(10)])
+        counters = notifications.close()
+    finally:
+        telegram_queue.TELEGRAM_DRAIN_TIMEOUT = original
+    assert counters['sent'] == 10 and counters['dropped'] == 0, counters
+
+def test_send_message_retry_after():
+    print("🧪 send_message converte HTTP 429 em RetryAfter...")
+    
+    class Response:
+        status_code = 429
+        headers = {}
+        
+        def json(self):
+            return {"ok": False, "error_code": 429, "parameters": {"retry_after": 12}}
+    
+    class HTTPError(Exception):
+        response = Response()
+    
+    def post(url, data=None):
+        raise HTTPError("429 Too Many Requests")
+    
+    original = telegram_service.http_client.post
+    telegram_service.http_client.post = post
+    try:
+        telegram_service.send_message("token", "chat", "oi")
+        raise AssertionError("esperava RetryAfter")
+    except RetryAfter as e:
+        assert e.seconds == 12
+    finally:
+        telegram_service.http_client.post = original
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_coalesce_and_split()
+    test_queue_retry_after_and_drop()
+    test_queue_drain_timeout()
+    test_queue_drain_budget_covers_rate_limit()
+    test_send_message_retry_after()
+    print("\n✅ Todos os testes passaram")
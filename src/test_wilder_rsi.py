@@ -0,0 +1,79 @@
+import sys
+import os
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.services.history_window import HistoryWindow
+from src.config.services.incremental import WilderRSI
+
+def _wilder_reference(prices, period):
+    """RSI de Wilder recalculado da lista inteira."""
+    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
+    if len(deltas) < period:
+        return None
+    avg_gain = sum(max(d, 0.0) for d in deltas[:period]) / period
+    avg_loss = sum(max(-d, 0.0) for d in deltas[:period]) / period
+    for d in deltas[period:]:
+        avg_gain = (avg_gain * (period - 1) + max(d, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-d, 0.0)) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def test_incremental_matches_full_recompute():
+    print("🧪 RSI incremental (6/14/24) vs. recálculo completo...")
+    
+    rng = random.Random(11)
+    window = HistoryWindow()
+    state = None
+    price = 95000.0
+    max_error = 0.0
+    for i in range(600):
+        price *= 1 + rng.gauss(0, 0.003)
+        window.append(price, 1.0, 1_700_000_000.0 + i * 300)
+        
+        rsi = WilderRSI.from_dict(json.loads(json.dumps(state)) if state else None, periods=(6, 14, 24))
+        rsi.sync(window)
+        state = rsi.to_dict()
+        
+        for period, value in rsi.values().items():
+            expected = _wilder_reference(list(window.prices), period)
+            if expected is None:
+                assert value is None
+            else:
+                max_error = max(max_error, abs(value - expected))
+    
+    print(f"   Erro absoluto máximo: {max_error:.2e}")
+    assert max_error < 1e-9
+
+def test_cold_start_and_gaps():
+    print("🧪 Semente a partir do histórico e lacunas...")
+    
+    window = HistoryWindow()
+    for i in range(50):
+        window.append(100.0 + (i % 7) - (i % 3), 1.0, 1_700_000_000.0 + i * 300)
+    
+    rsi = WilderRSI(periods=(14,))
+    assert rsi.sync(window) is True
+    assert abs(rsi.value(14) - _wilder_reference(list(window.prices), 14)) < 1e-9
+    
+    assert rsi.sync(window) is False
+    
+    later = window[30:]
+    later.start_ts = later.timestamps[0]
+    later.append(150.0, 1.0, later.timestamps[-1] + 300)
+    assert rsi.sync(later) is False
+    
+    gap = HistoryWindow()
+    gap.append(100.0, 1.0, 1_800_000_000.0)
+    assert rsi.sync(gap) is True
+    assert rsi.value(14) is None
+    
+    assert WilderRSI.from_dict(rsi.to_dict(), periods=(6, 14)).last_ts is None
+
+if __name__ == "__main__":
+    test_incremental_matches_full_recompute()
+    test_cold_start_and_gaps()
+    print("\n✅ Todos os testes passaram")
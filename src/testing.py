@@ -0,0 +1,21 @@
+"""
+Utilitários compartilhados pelos testes em src/test_*.py.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+from src.config.services import storage
+
+@contextmanager
+def local_data_dir():
+    """Roda o teste num diretório temporário (local_data/ relativo ao cwd), com o cache do storage limpo."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        storage.clear_cache()
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+            storage.clear_cache()